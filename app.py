@@ -1,8 +1,30 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import numpy as np
+import functools
+import io
+import os
+import uuid
 from datetime import datetime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from credito.banco import BACKEND
+from credito.busca import IndiceTexto, destacar, termos_consulta
+from credito.cache_figuras import CacheFiguras, chave_filtros
+from credito.cache_upload import CacheUploads, hash_conteudo
+from credito.carga import PASTA_PLANILHAS, abrir_origem, candidatas_origem, ler_upload
+from credito.conclusoes import CONCLUSOES_POR_PAGINA
+from credito.cubo import meses_periodo
+from credito.exportacao import FORMATOS as FORMATOS_EXPORTACAO, exportar
+from credito.instrumentacao import Medidor
+from credito.memoria import RegistroSessoes, formatar_bytes, tamanho_objeto
+from credito.tabela import (
+    COLUNAS_TABELA, TAMANHO_PAGINA_PADRAO, TAMANHOS_PAGINA, OrdensTabela, html_tabela, total_paginas
+)
+from credito.ranking import AGREGACOES_RANKING
+from credito.vista import VistaPandas
+from caches import abrir_fonte, cubo_mensal, indice_filtros, linha_tempo_empresas, memoria_base
+from graficos import figura_empresas, figura_faixa, figura_opiniao, figuras_mensais
 
 # ============================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -17,187 +39,103 @@ st.set_page_config(
 # ============================================================
 # ESTILOS CSS CUSTOMIZADOS - PADRÃO AVIN
 # ============================================================
-st.markdown("""
-<style>
-    /* Importar fonte */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    /* Reset e base */
-    .stApp {
-        background-color: #FAFAFA;
-        font-family: 'Inter', sans-serif;
-    }
-    
-    /* Ajuste do container principal */
-    .block-container {
-        padding-top: 3rem !important;
-    }
-    
-    /* Header principal */
-    .main-header {
-        font-size: 2rem;
-        font-weight: 600;
-        color: #8B7355;
-        margin-bottom: 0.25rem;
-        letter-spacing: -0.5px;
-        margin-top: 0.5rem;
-    }
-    
-    .sub-header {
-        font-size: 0.95rem;
-        color: #6B7280;
-        margin-bottom: 1.5rem;
-        font-weight: 400;
-    }
-    
-    /* Cards de métricas */
-    div[data-testid="stMetric"] {
-        background: white;
-        padding: 1.25rem;
-        border-radius: 8px;
-        border: 1px solid #E5E7EB;
-        box-shadow: 0 1px 3px rgba(0,0,0,0.04);
-    }
-    
-    div[data-testid="stMetricLabel"] {
-        font-size: 0.8rem;
-        color: #6B7280;
-        font-weight: 500;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-    
-    div[data-testid="stMetricValue"] {
-        font-size: 1.75rem;
-        font-weight: 600;
-        color: #2D2D2D;
-    }
-    
-    /* Sidebar */
-    section[data-testid="stSidebar"] {
-        background-color: #FFFFFF;
-        border-right: 1px solid #E5E7EB;
-    }
-    
-    section[data-testid="stSidebar"] .stMarkdown h2 {
-        color: #8B7355;
-        font-weight: 600;
-    }
-    
-    /* Títulos de seção */
-    .stMarkdown h3 {
-        color: #8B7355;
-        font-weight: 600;
-        font-size: 1.1rem;
-        margin-top: 1.5rem;
-        margin-bottom: 1rem;
-        padding-bottom: 0.5rem;
-        border-bottom: 2px solid #E5E7EB;
-    }
-    
-    /* Expanders */
-    .streamlit-expanderHeader {
-        background-color: white;
-        border: 1px solid #E5E7EB;
-        border-radius: 8px;
-        font-weight: 500;
-        color: #2D2D2D;
-    }
-    
-    /* Dataframe */
-    .stDataFrame {
-        border: 1px solid #E5E7EB;
-        border-radius: 8px;
-    }
-    
-    /* Dividers */
-    hr {
-        border: none;
-        border-top: 1px solid #E5E7EB;
-        margin: 1.5rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+# CSS (com o da tabela) e logo servidos como arquivos de
+# static/ (server.enableStaticServing em .streamlit/config.toml). O navegador
+# baixa cada arquivo uma vez e o guarda em cache; cada execução envia só a
+# referência, que não muda entre execuções (o elemento não é recriado).
+PASTA_ESTATICOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+def url_estatico(nome):
+    """URL de um arquivo de static/, com a versão (mtime) para renovar o cache do navegador a cada deploy"""
+    return f"app/static/{nome}?v={int(os.path.getmtime(os.path.join(PASTA_ESTATICOS, nome)))}"
+
+st.markdown(f'<link rel="stylesheet" href="{url_estatico("estilos.css")}">', unsafe_allow_html=True)
 
 # ============================================================
 # FUNÇÕES DE TRATAMENTO DE DADOS
 # ============================================================
-@st.cache_data
-def carregar_dados(arquivo):
-    """Carrega e trata os dados da planilha"""
-    df = pd.read_excel(arquivo, sheet_name='Relatórios de Crédito')
-    
-    # Renomear colunas de forma flexível (mapeia nomes antigos para novos)
-    colunas_map = {
-        '##': 'ID',
-        'Nome da Empresa na Base': 'Empresa_Base',
-        'Relatórios Enviados': 'Relatorio',
-        'Empresa / Emissão': 'Tipo',
-        'Data de Envio': 'Data',
-        'Rating - X/100': 'Rating',
-        'Rating Escala': 'Rating_Escala',
-        'Opinião - Independente de pontuação de Rating': 'Opiniao',
-        'Conclusão': 'Conclusao'
-    }
-    df = df.rename(columns=colunas_map)
-    
-    # Preencher nome da empresa quando vazio
-    if 'Relatorio' in df.columns and 'Empresa_Base' in df.columns:
-        df['Empresa'] = df['Relatorio'].fillna(df['Empresa_Base'])
-    elif 'Relatorio' in df.columns:
-        df['Empresa'] = df['Relatorio']
-    else:
-        df['Empresa'] = df.iloc[:, 1].fillna(df.iloc[:, 0])
-    
-    # Criar faixas de rating
-    def faixa_rating(r):
-        if pd.isna(r): return 'Sem Rating'
-        if r >= 80: return 'Alto (≥80)'
-        if r >= 65: return 'Médio (65-79)'
-        return 'Baixo (<65)'
-    
-    df['Faixa_Rating'] = df['Rating'].apply(faixa_rating)
-    
-    # Agregar opiniões em categorias principais
-    def agregar_opiniao(op):
-        if pd.isna(op): return 'Não Avaliado'
-        op_lower = str(op).lower()
-        if 'positivo' in op_lower: return 'Positivo'
-        if 'negativo' in op_lower or 'default' in op_lower: return 'Negativo'
-        if 'neutro' in op_lower: return 'Neutro'
-        if 'atenção' in op_lower or 'requer' in op_lower: return 'Atenção'
-        return 'Outros'
-    
-    df['Opiniao_Agregada'] = df['Opiniao'].apply(agregar_opiniao)
-    
-    # Extrair mês/ano
-    df['Mes_Ano'] = pd.to_datetime(df['Data']).dt.to_period('M').astype(str)
-    
-    # Resumo da conclusão para tooltip
-    df['Resumo'] = df['Conclusao'].apply(
-        lambda x: (str(x)[:300] + '...') if pd.notna(x) and len(str(x)) > 300 else x
+# Orçamento de memória e validade do cache de uploads
+LIMITE_CACHE_UPLOADS_MB = float(os.environ.get('DASHBOARD_CACHE_UPLOADS_MB', 512))
+TTL_CACHE_UPLOADS_MIN = float(os.environ.get('DASHBOARD_CACHE_UPLOADS_TTL_MIN', 60))
+
+@st.cache_resource
+def cache_uploads():
+    """Cache de uploads compartilhado pelas sessões (hash do conteúdo, LRU, TTL)"""
+    return CacheUploads(
+        limite_bytes=int(LIMITE_CACHE_UPLOADS_MB * 1024 * 1024),
+        ttl_segundos=TTL_CACHE_UPLOADS_MIN * 60
     )
-    
-    return df
+
+def carregar_upload(arquivo_upload):
+    """DataFrame de um upload, reaproveitado se o mesmo conteúdo já foi enviado
+
+    O hash do conteúdo é calculado uma vez por arquivo enviado (``file_id``)
+    e guardado na sessão. Um DataFrame maior que o orçamento do cache de
+    uploads fica só nesta sessão, para não ser relido a cada execução.
+    """
+    file_id, chave, df_sessao = st.session_state.get('upload_atual', (None, None, None))
+    if file_id != arquivo_upload.file_id:
+        conteudo = arquivo_upload.getvalue()
+        chave, df_sessao = hash_conteudo(conteudo), None
+    df = cache_uploads().obter(chave) if df_sessao is None else df_sessao
+    if df is None:
+        conteudo = arquivo_upload.getvalue()
+        df = ler_upload(io.BytesIO(conteudo), len(conteudo))
+        df_sessao = None if cache_uploads().guardar(chave, df) else df
+    st.session_state['upload_atual'] = (arquivo_upload.file_id, chave, df_sessao)
+    registrar_memoria('upload', df_sessao)
+    return df, chave
+
+@st.cache_resource
+def registro_sessoes():
+    """Memória materializada por cada sessão ativa"""
+    return RegistroSessoes()
+
+def registrar_memoria(secao, *objetos):
+    """Anota o que esta sessão materializou numa seção (posições, fatias visíveis)"""
+    st.session_state.setdefault('memoria_sessao', {})[secao] = sum(tamanho_objeto(o) for o in objetos)
+
+@st.cache_resource(max_entries=4)
+def indice_texto(_df, versao_dados):
+    """Índice invertido de Opinião/Conclusão, construído na primeira busca de cada versão"""
+    return IndiceTexto(_df)
+
+@st.cache_resource(max_entries=4)
+def ordens_tabela(_df, versao_dados):
+    """Ordens das linhas por coluna da tabela, compartilhadas pelas sessões (uma por versão)"""
+    return OrdensTabela()
+
+# ============================================================
+# FUNÇÕES DOS GRÁFICOS
+# ============================================================
+# Número de figuras prontas guardadas (todas as sessões)
+MAX_FIGURAS_CACHE = int(os.environ.get('DASHBOARD_CACHE_FIGURAS', 64))
+
+@st.cache_resource
+def cache_figuras():
+    """Figuras prontas por (versão dos dados, filtros, gráfico), compartilhadas entre sessões"""
+    return CacheFiguras(MAX_FIGURAS_CACHE)
 
 # ============================================================
 # CARREGAR DADOS
 # ============================================================
-# Possíveis nomes do arquivo no repositório
-ARQUIVOS_POSSIVEIS = [
-    'data/0 - Compilado Relatórios de Crédito.xlsx',
-    'data/0_-_Compilado_Relatórios_de_Crédito.xlsx',
-    'data/0-Compilado Relatórios de Crédito.xlsx',
-    'data/base_credito.xlsx',
-    '0 - Compilado Relatórios de Crédito.xlsx',
-    '0_-_Compilado_Relatórios_de_Crédito.xlsx'
-]
+# Origem dos dados (ARQUIVOS_POSSIVEIS, DASHBOARD_PASTA_PLANILHAS e
+# DASHBOARD_ABAS) configurada em credito.carga
+
+# Instrumentação opcional (tempo e memória por etapa): pela variável de
+# ambiente ou por um toggle na sidebar que só aparece com ?debug na URL
+INSTRUMENTACAO = os.environ.get('DASHBOARD_INSTRUMENTACAO', '').strip().lower() in ('1', 'true', 'sim')
+LOG_INSTRUMENTACAO = os.environ.get('DASHBOARD_LOG_INSTRUMENTACAO', 'instrumentacao.jsonl')
 
 # Sidebar
 with st.sidebar:
     st.markdown("## Dashboard de Crédito")
     st.markdown("---")
     
+    if 'debug' in st.query_params:
+        st.toggle("Instrumentação", key='instrumentacao')
+    
+
     # Opção de upload alternativo
     usar_upload = st.checkbox("Carregar outra planilha", value=False)
     
@@ -209,41 +147,88 @@ with st.sidebar:
             help="Faça upload de uma planilha alternativa"
         )
 
-# Carregar dados
+ctx_execucao = get_script_run_ctx()
+medidor = Medidor(
+    ativo=INSTRUMENTACAO or st.session_state.get('instrumentacao', False),
+    arquivo_log=LOG_INSTRUMENTACAO,
+    contexto={
+        'sessao': ctx_execucao.session_id if ctx_execucao is not None else None,
+        'execucao': uuid.uuid4().hex[:12],
+        'backend': BACKEND,
+    }
+)
+# As seções em fragmento medem pelo medidor da sessão (o da última execução completa)
+st.session_state['medidor'] = medidor
+
+def medir(etapa):
+    return st.session_state['medidor'].etapa(etapa)
+
+# Carregar dados (com o backend 'sqlite', planilha e pasta vão para o banco; uploads ficam em memória)
 df = None
+banco = None
 erro_msg = None
+versao_dados = None
 
 if arquivo_upload:
     try:
-        df = carregar_dados(arquivo_upload)
+        with medir('carregar_dados'):
+            df, hash_upload = carregar_upload(arquivo_upload)
+        versao_dados = ('upload', hash_upload)
         st.sidebar.success("✅ Planilha alternativa carregada!")
     except Exception as e:
         erro_msg = f"Erro no upload: {e}"
 else:
-    # Tentar carregar de diferentes caminhos possíveis
-    import os
-    for arquivo in ARQUIVOS_POSSIVEIS:
-        if os.path.exists(arquivo):
-            try:
-                df = carregar_dados(arquivo)
-                st.sidebar.success(f"✅ Dados carregados!")
-                break
-            except Exception as e:
-                erro_msg = f"Arquivo encontrado mas erro ao ler: {e}"
-    
-    if df is None and erro_msg is None:
-        # Listar arquivos disponíveis para debug
-        arquivos_encontrados = []
-        if os.path.exists('data'):
-            arquivos_encontrados = os.listdir('data')
-        elif os.path.exists('.'):
-            arquivos_encontrados = [f for f in os.listdir('.') if f.endswith('.xlsx')]
-        erro_msg = f"Arquivo não encontrado. Arquivos na pasta: {arquivos_encontrados}"
+    # Upload removido: solta o que a sessão guardava dele
+    st.session_state.pop('upload_atual', None)
+    st.session_state.get('memoria_sessao', {}).pop('upload', None)
+    # Mesma resolução (preferência e fallback) do aquecimento e da linha de comando
+    try:
+        with medir('descoberta_arquivos'):
+            candidatas = candidatas_origem()
+        with medir('carregar_dados'):
+            origem = abrir_origem(candidatas, abrir_fonte)
+    except Exception as e:
+        origem = None
+        if PASTA_PLANILHAS:
+            erro_msg = f"Erro ao ler as planilhas de {PASTA_PLANILHAS}: {e}"
+        else:
+            erro_msg = f"Arquivo encontrado mas erro ao ler: {e}"
+    if origem is not None:
+        versao_dados, fonte = origem
+        if BACKEND == 'sqlite':
+            banco = fonte
+        else:
+            df = fonte
+        if PASTA_PLANILHAS:
+            st.sidebar.success(f"✅ {len(versao_dados[1])} planilhas carregadas!")
+        else:
+            st.sidebar.success(f"✅ Dados carregados!")
+    elif erro_msg is None:
+        if PASTA_PLANILHAS:
+            erro_msg = f"Nenhuma planilha encontrada em {PASTA_PLANILHAS}"
+        else:
+            # Listar arquivos disponíveis para debug
+            arquivos_encontrados = []
+            if os.path.exists('data'):
+                arquivos_encontrados = os.listdir('data')
+            elif os.path.exists('.'):
+                arquivos_encontrados = [f for f in os.listdir('.') if f.endswith('.xlsx')]
+            erro_msg = f"Arquivo não encontrado. Arquivos na pasta: {arquivos_encontrados}"
+
+# Preenchido no fim da execução, depois que as seções anotaram o que materializaram
+painel_memoria = st.sidebar.empty()
+
+if usar_upload:
+    entradas_cache, bytes_cache = cache_uploads().estatisticas()
+    st.sidebar.caption(
+        f"Cache de uploads: {entradas_cache} planilha(s), "
+        f"{bytes_cache / 1024 / 1024:.1f} de {LIMITE_CACHE_UPLOADS_MB:.0f} MB"
+    )
 
 # ============================================================
 # VERIFICAR SE HÁ DADOS
 # ============================================================
-if df is None:
+if df is None and banco is None:
     st.markdown('<p class="main-header">Dashboard de Avaliações de Crédito</p>', unsafe_allow_html=True)
     st.markdown('<p class="sub-header">Análise de Risco</p>', unsafe_allow_html=True)
     st.error(f"Não foi possível carregar os dados.")
@@ -255,49 +240,83 @@ if df is None:
 # ============================================================
 # FILTROS NA SIDEBAR
 # ============================================================
+# O banco SQLite tem a mesma interface do índice para as opções dos filtros
+indice = banco if banco is not None else indice_filtros(df, versao_dados)
+
 with st.sidebar:
     st.markdown("### Filtros")
     
     # Filtro por tipo
-    tipos = ['Todos'] + list(df['Tipo'].dropna().unique())
+    tipos = ['Todos'] + indice.valores.get('Tipo', [])
     tipo_selecionado = st.selectbox("Tipo de Análise", tipos)
     
     # Filtro por opinião agregada
-    opinioes = ['Todas'] + list(df['Opiniao_Agregada'].unique())
+    opinioes = ['Todas'] + indice.valores.get('Opiniao_Agregada', [])
     opiniao_selecionada = st.selectbox("Opinião", opinioes)
     
     # Filtro por faixa de rating
-    faixas = ['Todas'] + list(df['Faixa_Rating'].unique())
+    faixas = ['Todas'] + indice.valores.get('Faixa_Rating', [])
     faixa_selecionada = st.selectbox("Faixa de Rating", faixas)
     
     # Filtro por período
-    if df['Data'].notna().any():
-        min_data = df['Data'].min().date()
-        max_data = df['Data'].max().date()
+    periodo = None
+    if indice.tem_datas:
+        min_data, max_data = (pd.Timestamp(d).date() for d in indice.intervalo_datas())
         periodo = st.date_input(
             "Período",
             value=(min_data, max_data),
             min_value=min_data,
             max_value=max_data
         )
+    
+    # Busca de texto (sem acentos) em opiniões e conclusões
+    busca_texto = st.text_input(
+        "Buscar em opiniões e conclusões",
+        placeholder="Ex.: covenant, setor elétrico",
+        key='busca_texto'
+    )
 
-# Aplicar filtros
-df_filtrado = df.copy()
-
-if tipo_selecionado != 'Todos':
-    df_filtrado = df_filtrado[df_filtrado['Tipo'] == tipo_selecionado]
-
-if opiniao_selecionada != 'Todas':
-    df_filtrado = df_filtrado[df_filtrado['Opiniao_Agregada'] == opiniao_selecionada]
-
-if faixa_selecionada != 'Todas':
-    df_filtrado = df_filtrado[df_filtrado['Faixa_Rating'] == faixa_selecionada]
+# Aplicar filtros (posições de linha resolvidas pelo índice, sem copiar a base)
+selecoes = {
+    'Tipo': None if tipo_selecionado == 'Todos' else tipo_selecionado,
+    'Opiniao_Agregada': None if opiniao_selecionada == 'Todas' else opiniao_selecionada,
+    'Faixa_Rating': None if faixa_selecionada == 'Todas' else faixa_selecionada,
+}
+periodo_filtro = tuple(periodo) if periodo is not None and len(periodo) == 2 else None
+with medir('filtros'):
+    if banco is not None:
+        # Backend SQLite: filtros e busca viram o WHERE das consultas
+        vista = banco.vista(selecoes, periodo_filtro, busca_texto)
+        if termos_consulta(busca_texto):
+            st.sidebar.caption(f"{vista.n_linhas} análise(s) encontrada(s) na busca.")
+    else:
+        linhas_filtradas = indice.filtrar(selecoes=selecoes, periodo=periodo_filtro)
+        if busca_texto.strip():
+            linhas_busca = indice_texto(df, versao_dados).buscar(busca_texto)
+            if linhas_busca is not None:
+                linhas_filtradas = np.intersect1d(linhas_filtradas, linhas_busca, assume_unique=True)
+                st.sidebar.caption(f"{len(linhas_filtradas)} análise(s) encontrada(s) na busca.")
+        registrar_memoria('filtros', linhas_filtradas)
+        vista = VistaPandas(df, linhas_filtradas, ordens_tabela(df, versao_dados))
+
+# Agregados dos gráficos: do cubo mensal quando os filtros cabem nele
+# (sem busca de texto e período sem cortar meses); senão, das linhas filtradas.
+# Calculados só se algum gráfico não estiver no cache de figuras.
+@functools.cache
+def celulas_filtradas():
+    if banco is not None:
+        return vista.celulas()
+    usar_cubo = not busca_texto.strip() and (
+        periodo_filtro is None or indice.periodo_em_meses_inteiros(*periodo_filtro)
+    )
+    if usar_cubo:
+        return cubo_mensal(df, versao_dados).fatia(
+            selecoes, meses_periodo(*periodo_filtro) if periodo_filtro else None
+        )
+    return vista.celulas()
 
-if 'periodo' in dir() and len(periodo) == 2:
-    df_filtrado = df_filtrado[
-        (df_filtrado['Data'].dt.date >= periodo[0]) & 
-        (df_filtrado['Data'].dt.date <= periodo[1])
-    ]
+# Chave das figuras: versão dos dados + estado normalizado dos filtros
+chave_graficos = (versao_dados, chave_filtros(selecoes, periodo_filtro, busca_texto))
 
 # ============================================================
 # CABEÇALHO PRINCIPAL
@@ -310,41 +329,41 @@ with col_header1:
 # ============================================================
 # MÉTRICAS PRINCIPAIS (KPIs)
 # ============================================================
+# Todos os KPIs numa única passada sobre as linhas filtradas
+with medir('kpis'):
+    kpis = vista.kpis()
+
 col1, col2, col3, col4, col5 = st.columns(5)
 
 with col1:
     st.metric(
         label="TOTAL DE ANÁLISES",
-        value=len(df_filtrado)
+        value=kpis.total
     )
 
 with col2:
-    empresas = len(df_filtrado[df_filtrado['Tipo'] == 'Empresa'])
     st.metric(
         label="EMPRESAS",
-        value=empresas
+        value=kpis.empresas
     )
 
 with col3:
-    emissoes = len(df_filtrado[df_filtrado['Tipo'] == 'Emissão'])
     st.metric(
         label="EMISSÕES",
-        value=emissoes
+        value=kpis.emissoes
     )
 
 with col4:
-    rating_medio = df_filtrado['Rating'].mean()
+    rating_medio = kpis.rating_medio
     st.metric(
         label="RATING MÉDIO",
         value=f"{rating_medio:.1f}" if pd.notna(rating_medio) else "N/A"
     )
 
 with col5:
-    negativos = len(df_filtrado[df_filtrado['Opiniao_Agregada'] == 'Negativo'])
-    pct_neg = (negativos / len(df_filtrado) * 100) if len(df_filtrado) > 0 else 0
     st.metric(
         label="% NEGATIVOS",
-        value=f"{pct_neg:.1f}%"
+        value=f"{kpis.pct_negativos:.1f}%"
     )
 
 st.markdown("---")
@@ -352,158 +371,193 @@ st.markdown("---")
 # ============================================================
 # GRÁFICOS - LINHA 1
 # ============================================================
+# Figuras montadas uma vez por (versão dos dados, filtros) e reaproveitadas
+figuras = cache_figuras()
+
 col_graf1, col_graf2 = st.columns(2)
 
 # Gráfico 1: Distribuição por Opinião
 with col_graf1:
     st.markdown("### Distribuição por Opinião")
-    
-    opiniao_counts = df_filtrado['Opiniao_Agregada'].value_counts().reset_index()
-    opiniao_counts.columns = ['Opinião', 'Quantidade']
-    
-    cores_opiniao = {
-        'Positivo': '#4A7C59',      # Verde escuro profissional
-        'Neutro': '#8B7355',        # Dourado AVIN
-        'Negativo': '#A85454',      # Vermelho sóbrio
-        'Atenção': '#C9A227',       # Amarelo mostarda
-        'Não Avaliado': '#9CA3AF',  # Cinza neutro
-        'Outros': '#6B7280'         # Cinza escuro
-    }
-    
-    fig_opiniao = px.pie(
-        opiniao_counts,
-        values='Quantidade',
-        names='Opinião',
-        color='Opinião',
-        color_discrete_map=cores_opiniao,
-        hole=0.5
-    )
-    fig_opiniao.update_traces(
-        textposition='outside', 
-        textinfo='percent+label',
-        textfont_size=11,
-        marker=dict(line=dict(color='#FFFFFF', width=2))
-    )
-    fig_opiniao.update_layout(
-        showlegend=False,
-        margin=dict(t=30, b=30, l=30, r=30),
-        height=350,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(family='Inter', color='#2D2D2D')
-    )
-    st.plotly_chart(fig_opiniao, use_container_width=True)
+    with medir('figura_opiniao'):
+        fig_opiniao = figuras.obter(chave_graficos + ('opiniao',), lambda: figura_opiniao(celulas_filtradas()))
+        st.plotly_chart(fig_opiniao, width='stretch')
 
 # Gráfico 2: Distribuição por Faixa de Rating
 with col_graf2:
     st.markdown("### Distribuição por Faixa de Rating")
+    with medir('figura_faixa'):
+        fig_faixa = figuras.obter(chave_graficos + ('faixa',), lambda: figura_faixa(celulas_filtradas()))
+        st.plotly_chart(fig_faixa, width='stretch')
+
+# ============================================================
+# GRÁFICOS - EVOLUÇÃO MENSAL
+# ============================================================
+with medir('figuras_mensais'):
+    figs_mensais = figuras.obter(chave_graficos + ('mensal',), lambda: figuras_mensais(celulas_filtradas()))
+
+if figs_mensais is not None:
+    fig_mensal, fig_mix = figs_mensais
+    col_graf3, col_graf4 = st.columns(2)
     
-    faixa_counts = df_filtrado['Faixa_Rating'].value_counts().reset_index()
-    faixa_counts.columns = ['Faixa', 'Quantidade']
-    
-    cores_faixa = {
-        'Alto (≥80)': '#4A7C59',     # Verde escuro
-        'Médio (65-79)': '#8B7355',  # Dourado AVIN
-        'Baixo (<65)': '#A85454',    # Vermelho sóbrio
-        'Sem Rating': '#D1D5DB'      # Cinza claro
-    }
-    
-    # Calcular valor máximo do eixo Y (maior valor + 5)
-    max_valor = faixa_counts['Quantidade'].max()
-    eixo_y_max = max_valor + 5
+    # Gráfico 3: Volume e rating médio por mês
+    with col_graf3:
+        st.markdown("### Evolução Mensal")
+        with medir('figura_mensal'):
+            st.plotly_chart(fig_mensal, width='stretch')
     
-    fig_faixa = px.bar(
-        faixa_counts,
-        x='Faixa',
-        y='Quantidade',
-        color='Faixa',
-        color_discrete_map=cores_faixa,
-        text='Quantidade'
-    )
-    fig_faixa.update_traces(
-        textposition='outside',
-        textfont_size=12,
-        marker_line_color='#FFFFFF',
-        marker_line_width=1
-    )
-    fig_faixa.update_layout(
-        showlegend=False,
-        xaxis_title="",
-        yaxis_title="",
-        margin=dict(t=30, b=30, l=30, r=30),
-        height=350,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(family='Inter', color='#2D2D2D'),
-        xaxis=dict(showgrid=False, showline=True, linecolor='#E5E7EB'),
-        yaxis=dict(showgrid=True, gridcolor='#F3F4F6', showline=False, range=[0, eixo_y_max])
-    )
-    st.plotly_chart(fig_faixa, use_container_width=True)
+    # Gráfico 4: Participação das opiniões por mês
+    with col_graf4:
+        st.markdown("### Opiniões por Mês")
+        with medir('figura_mix_opiniao'):
+            st.plotly_chart(fig_mix, width='stretch')
 
 # ============================================================
 # GRÁFICO - RATING POR EMPRESA (LARGURA TOTAL)
 # ============================================================
 st.markdown("### Rating por Empresa")
 
-df_com_rating = df_filtrado[df_filtrado['Rating'].notna()].copy()
+# Acima deste número de análises com rating o gráfico passa ao modo escalável
+# (top/bottom N, agregação por empresa, altura limitada com rolagem)
+LIMITE_GRAFICO_EMPRESAS = int(os.environ.get('DASHBOARD_LIMITE_GRAFICO_EMPRESAS', 150))
+# Acima deste número de barras o gráfico usa pontos em WebGL (Scattergl)
+LIMITE_WEBGL = int(os.environ.get('DASHBOARD_LIMITE_WEBGL', 300))
+ALTURA_MAXIMA_GRAFICO = 800
+OPCOES_N_RANKING = [25, 50, 100, 250, 500, 1000, 2500]
+
+# Seção isolada: trocar a quantidade/agregação do ranking reexecuta só ela
+@st.fragment
+def secao_rating_empresas(vista, chave_graficos):
+    n_com_rating = vista.n_com_rating()
+    modo_escalavel = n_com_rating > LIMITE_GRAFICO_EMPRESAS
+
+    if n_com_rating > 0:
+        if modo_escalavel:
+            col_rank1, col_rank2, col_rank3 = st.columns(3)
+            with col_rank1:
+                extremo = st.radio("Mostrar", ['Maiores ratings', 'Menores ratings'], horizontal=True, key='ranking_extremo')
+            with col_rank2:
+                n_ranking = st.selectbox("Quantidade", OPCOES_N_RANKING, index=1, key='ranking_n')
+            with col_rank3:
+                agregacao = st.selectbox(
+                    "Agregar por empresa",
+                    list(AGREGACOES_RANKING),
+                    format_func=AGREGACOES_RANKING.get,
+                    key='ranking_agregacao'
+                )
+            opcoes_ranking = (n_ranking, extremo == 'Maiores ratings', agregacao)
+        else:
+            opcoes_ranking = None
+    
+        def montar_figura_empresas():
+            if modo_escalavel:
+                n, maiores, agregacao = opcoes_ranking
+                df_com_rating = vista.ranking(n=n, maiores=maiores, agregacao=agregacao)
+                altura_grafico = max(500, len(df_com_rating) * 22)
+            else:
+                df_com_rating = vista.ranking()
+                # Calcular altura dinâmica baseada no número de empresas
+                altura_grafico = max(500, len(df_com_rating) * 40)
+            return figura_empresas(df_com_rating, altura_grafico, LIMITE_WEBGL), len(df_com_rating), altura_grafico
+    
+        with medir('figura_empresas'):
+            fig_scatter, n_exibidas, altura_grafico = figuras.obter(
+                chave_graficos + ('empresas', opcoes_ranking, LIMITE_WEBGL), montar_figura_empresas
+            )
+            if modo_escalavel:
+                st.caption(f"Exibindo {n_exibidas} de {n_com_rating} análises com rating.")
+
+            if modo_escalavel and altura_grafico > ALTURA_MAXIMA_GRAFICO:
+                with st.container(height=ALTURA_MAXIMA_GRAFICO):
+                    st.plotly_chart(fig_scatter, width='stretch')
+            else:
+                st.plotly_chart(fig_scatter, width='stretch')
+    else:
+        st.info("Nenhum dado com rating disponível para os filtros selecionados.")
 
-if len(df_com_rating) > 0:
-    # Calcular altura dinâmica baseada no número de empresas
-    num_empresas = len(df_com_rating)
-    altura_grafico = max(500, num_empresas * 40)
-    
-    # Cores do padrão AVIN
-    cores_opiniao_grafico = {
-        'Positivo': '#4A7C59',
-        'Neutro': '#8B7355',
-        'Negativo': '#A85454',
-        'Atenção': '#C9A227',
-        'Não Avaliado': '#9CA3AF',
-        'Outros': '#6B7280'
-    }
-    
-    fig_scatter = px.bar(
-        df_com_rating.sort_values('Rating', ascending=True),
-        x='Rating',
-        y='Empresa',
-        color='Opiniao_Agregada',
-        color_discrete_map=cores_opiniao_grafico,
-        orientation='h',
-        hover_data=['Tipo', 'Opiniao', 'Data']
-    )
-    fig_scatter.update_traces(
-        marker_line_color='#FFFFFF',
-        marker_line_width=1
-    )
-    fig_scatter.update_layout(
-        yaxis_title="",
-        xaxis_title="Rating (0-100)",
-        legend_title="",
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1,
-            font=dict(size=10)
-        ),
-        margin=dict(t=50, b=30, l=20, r=20),
-        height=altura_grafico,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(family='Inter', color='#2D2D2D'),
-        xaxis=dict(
-            showgrid=True, 
-            gridcolor='#F3F4F6', 
-            showline=True, 
-            linecolor='#E5E7EB',
-            range=[0, 100]
-        ),
-        yaxis=dict(showgrid=False, showline=False)
-    )
-    st.plotly_chart(fig_scatter, use_container_width=True)
-else:
-    st.info("Nenhum dado com rating disponível para os filtros selecionados.")
+secao_rating_empresas(vista, chave_graficos)
+
+# ============================================================
+# RATING POR EMPRESA AO LONGO DO TEMPO
+# ============================================================
+st.markdown("### Rating por Empresa ao Longo do Tempo")
+
+# Linhas exibidas em cada tabela (as consultas cobrem todas as empresas)
+LIMITE_LINHAS_LINHA_TEMPO = 500
+
+COLUNAS_POSICAO = {
+    'Empresa': 'Empresa',
+    'Rating': 'Rating',
+    'Rating_Escala': 'Escala',
+    'Data_Rating': 'Data do Rating',
+    'Opiniao_Agregada': 'Opinião',
+    'Data': 'Última Análise',
+}
+COLUNAS_REBAIXAMENTOS = {
+    'Empresa': 'Empresa',
+    'Rating_Inicio': 'Rating Anterior',
+    'Rating_Fim': 'Rating Atual',
+    'Variacao': 'Variação',
+    'Escala_Inicio': 'Escala Anterior',
+    'Escala_Fim': 'Escala Atual',
+    'Data_Rating_Fim': 'Data do Rating',
+}
+
+def tabela_linha_tempo(df_linha_tempo, colunas):
+    """Primeiras linhas com títulos e datas no formato da tabela principal"""
+    df_exibir = df_linha_tempo.head(LIMITE_LINHAS_LINHA_TEMPO)[list(colunas)].copy()
+    for coluna in df_exibir.columns:
+        if coluna.startswith('Data'):
+            df_exibir[coluna] = df_exibir[coluna].dt.strftime('%d/%m/%Y')
+    return df_exibir.rename(columns=colunas)
+
+# Seção isolada: trocar as datas consulta só a linha do tempo (busca binária, sem groupby)
+@st.fragment
+def secao_linha_tempo(linha_tempo):
+    intervalo = linha_tempo.intervalo_datas()
+    if intervalo is None:
+        st.info("Nenhuma análise com empresa e data para montar a linha do tempo.")
+        return
+    min_data, max_data = (pd.Timestamp(d).date() for d in intervalo)
+
+    col_posicao, col_rebaixamentos = st.columns(2)
+    with col_posicao:
+        data_posicao = st.date_input(
+            "Posição em", value=max_data, min_value=min_data, max_value=max_data,
+            help="Último rating e opinião de cada empresa até esta data"
+        )
+        with medir('linha_tempo_posicao'):
+            posicao = linha_tempo.na_data(data_posicao)
+        st.dataframe(tabela_linha_tempo(posicao, COLUNAS_POSICAO), hide_index=True, width='stretch')
+        st.caption(
+            f"{len(posicao)} empresa(s) com análise até {data_posicao.strftime('%d/%m/%Y')}"
+            + (f" (exibindo as {LIMITE_LINHAS_LINHA_TEMPO} primeiras)" if len(posicao) > LIMITE_LINHAS_LINHA_TEMPO else "")
+        )
+
+    with col_rebaixamentos:
+        data_desde = st.date_input(
+            "Rebaixamentos desde",
+            value=max(min_data, data_posicao - pd.Timedelta(days=365)),
+            min_value=min_data,
+            max_value=data_posicao,
+            help="Empresas cujo rating vigente caiu entre esta data e a data da posição"
+        )
+        with medir('linha_tempo_rebaixamentos'):
+            rebaixamentos = linha_tempo.rebaixamentos(data_desde, data_posicao)
+        st.dataframe(
+            tabela_linha_tempo(rebaixamentos, COLUNAS_REBAIXAMENTOS), hide_index=True, width='stretch'
+        )
+        st.caption(
+            f"{len(rebaixamentos)} rebaixamento(s) entre {data_desde.strftime('%d/%m/%Y')} "
+            f"e {data_posicao.strftime('%d/%m/%Y')}"
+            + (f" (exibindo os {LIMITE_LINHAS_LINHA_TEMPO} maiores)" if len(rebaixamentos) > LIMITE_LINHAS_LINHA_TEMPO else "")
+        )
+
+# A linha do tempo segue o filtro de tipo; opinião, faixa e período mudam ao
+# longo do tempo de cada empresa e não se aplicam a ela
+with medir('linha_tempo'):
+    linha_tempo = linha_tempo_empresas(banco if banco is not None else df, versao_dados, selecoes['Tipo'])
+secao_linha_tempo(linha_tempo)
 
 st.markdown("---")
 
@@ -512,88 +566,217 @@ st.markdown("---")
 # ============================================================
 st.markdown("### Detalhamento das Análises")
 
-# Preparar dados para tabela
-df_tabela = df_filtrado[['Empresa', 'Tipo', 'Data', 'Rating', 'Rating_Escala', 'Faixa_Rating', 'Opiniao_Agregada', 'Opiniao']].copy()
-df_tabela['Data'] = pd.to_datetime(df_tabela['Data']).dt.strftime('%d/%m/%Y')
-df_tabela['Rating'] = df_tabela['Rating'].apply(lambda x: int(x) if pd.notna(x) else '-')
-df_tabela['Rating_Escala'] = df_tabela['Rating_Escala'].fillna('-')
-df_tabela.columns = ['Empresa', 'Tipo', 'Data', 'Rating', 'Escala', 'Faixa', 'Opinião', 'Opinião Detalhada']
-
-# Configurar exibição com estilo centralizado
-st.markdown("""
-<style>
-    .styled-table {
-        width: 100%;
-        border-collapse: collapse;
-        font-size: 13px;
-        font-family: 'Inter', sans-serif;
-    }
-    .styled-table thead tr {
-        background-color: #F9FAFB;
-        text-align: center;
-    }
-    .styled-table th {
-        padding: 12px;
-        text-align: center;
-        font-weight: 600;
-        color: #6B7280;
-        font-size: 11px;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-        border-bottom: 2px solid #E5E7EB;
-    }
-    .styled-table td {
-        padding: 10px 12px;
-        text-align: center;
-        border-bottom: 1px solid #F3F4F6;
-        color: #2D2D2D;
-    }
-    .styled-table tbody tr:hover {
-        background-color: #F9FAFB;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Seção isolada: ordenar e paginar a tabela não reexecuta KPIs nem gráficos
+@st.fragment
+def secao_tabela(vista):
+    # Controles de ordenação e paginação (feitas no servidor, só a página visível é formatada)
+    col_ord1, col_ord2, col_pag1, col_pag2 = st.columns([2, 1, 1, 1])
+    with col_ord1:
+        ordenar_por = st.selectbox(
+            "Ordenar por",
+            [None] + list(COLUNAS_TABELA),
+            format_func=lambda c: 'Ordem da planilha' if c is None else COLUNAS_TABELA[c],
+            key='tabela_ordenar_por'
+        )
+    with col_ord2:
+        ordem_tabela = st.selectbox("Ordem", ['Crescente', 'Decrescente'], key='tabela_ordem')
+    with col_pag1:
+        tamanho_pagina = st.selectbox(
+            "Linhas por página",
+            TAMANHOS_PAGINA,
+            index=TAMANHOS_PAGINA.index(TAMANHO_PAGINA_PADRAO),
+            key='tabela_tamanho_pagina'
+        )
 
-# Converter para HTML com classe customizada
-st.markdown(
-    df_tabela.to_html(classes='styled-table', index=False, na_rep='-', escape=False),
-    unsafe_allow_html=True
-)
+    n_paginas = total_paginas(vista.n_linhas, tamanho_pagina)
+    if st.session_state.get('tabela_pagina', 1) > n_paginas:
+        st.session_state['tabela_pagina'] = 1
+    with col_pag2:
+        pagina = st.number_input("Página", min_value=1, max_value=n_paginas, step=1, key='tabela_pagina')
+
+    with medir('tabela_html'):
+        df_tabela = vista.pagina_tabela(
+            pagina=pagina,
+            tamanho_pagina=tamanho_pagina,
+            ordenar_por=ordenar_por,
+            crescente=ordem_tabela == 'Crescente'
+        )
+
+        registrar_memoria('tabela', df_tabela)
+
+        # Converter para HTML com classe customizada
+        st.markdown(html_tabela(df_tabela), unsafe_allow_html=True)
+
+    inicio_pagina = (pagina - 1) * tamanho_pagina
+    st.caption(
+        f"Mostrando {min(inicio_pagina + 1, vista.n_linhas)}–"
+        f"{min(inicio_pagina + tamanho_pagina, vista.n_linhas)} de {vista.n_linhas} análises"
+    )
+
+secao_tabela(vista)
+
+# Exportação do recorte filtrado: cada arquivo só é montado quando o botão é
+# clicado, lote a lote, numa thread do servidor (sem bloquear as sessões).
+# O Streamlit entrega o download a partir da memória: o arquivo pronto inteiro
+# fica no servidor enquanto o botão existir. Acima deste número de linhas os
+# botões ficam desativados e o recorte sai por `python -m credito exportar`.
+LIMITE_LINHAS_DOWNLOAD = int(os.environ.get('DASHBOARD_LIMITE_LINHAS_DOWNLOAD', 200_000))
+
+@st.fragment
+def secao_exportacao(vista):
+    col_conclusao, *cols_formatos = st.columns([2] + [1] * len(FORMATOS_EXPORTACAO))
+    with col_conclusao:
+        com_conclusao = st.checkbox("Incluir conclusões completas na exportação", key='exportar_conclusoes')
+    acima_limite = vista.n_linhas > LIMITE_LINHAS_DOWNLOAD
+
+    medidor_sessao = st.session_state['medidor']
+    nome_arquivo = f"analises_credito_{datetime.now().strftime('%Y%m%d')}"
+    for col, (formato, (rotulo, extensao, mime)) in zip(cols_formatos, FORMATOS_EXPORTACAO.items()):
+        def gerar_arquivo(formato=formato):
+            with medidor_sessao.etapa(f'exportar_{formato}'), exportar(vista, formato, com_conclusao) as arquivo:
+                return arquivo.read()
+
+        with col:
+            st.download_button(
+                f"Baixar {rotulo}",
+                data=gerar_arquivo,
+                file_name=f"{nome_arquivo}.{extensao}",
+                mime=mime,
+                on_click='ignore',
+                key=f'exportar_{formato}',
+                disabled=vista.n_linhas == 0 or acima_limite,
+                width='stretch'
+            )
+    if acima_limite:
+        st.caption(
+            f"{vista.n_linhas} análises passam do limite de {LIMITE_LINHAS_DOWNLOAD} para download pelo painel: "
+            "refine os filtros ou exporte pela linha de comando (`python -m credito exportar`)."
+        )
+
+secao_exportacao(vista)
 
 # ============================================================
 # DETALHES EXPANDÍVEIS
 # ============================================================
 st.markdown("### Conclusões Detalhadas")
 
-for idx, row in df_filtrado.iterrows():
-    if pd.notna(row['Conclusao']):
-        rating_escala = row['Rating_Escala'] if 'Rating_Escala' in row and pd.notna(row['Rating_Escala']) else 'N/A'
-        with st.expander(f"**{row['Empresa']}** | Rating: {row['Rating'] if pd.notna(row['Rating']) else 'N/A'} ({rating_escala}) | {row['Opiniao_Agregada']}"):
-            col_info1, col_info2, col_info3, col_info4 = st.columns(4)
-            with col_info1:
-                st.markdown(f"**Tipo:** {row['Tipo']}")
-            with col_info2:
-                st.markdown(f"**Data:** {row['Data'].strftime('%d/%m/%Y') if pd.notna(row['Data']) else 'N/A'}")
-            with col_info3:
-                st.markdown(f"**Escala:** {rating_escala}")
-            with col_info4:
-                st.markdown(f"**Opinião:** {row['Opiniao']}")
-            st.markdown("---")
-            st.markdown(row['Conclusao'])
+# Seção isolada: filtrar, paginar e abrir conclusões reexecuta só ela
+@st.fragment
+def secao_conclusoes(vista, busca_texto):
+    # Filtro de texto e paginação: só os itens da página viram expanders
+    busca_conclusoes = st.text_input(
+        "Filtrar conclusões",
+        placeholder="Empresa, opinião ou trecho da conclusão",
+        key='conclusoes_busca'
+    )
+    n_conclusoes = vista.contar_conclusoes(busca_conclusoes)
+
+    n_paginas_conclusoes = total_paginas(n_conclusoes, CONCLUSOES_POR_PAGINA)
+    if st.session_state.get('conclusoes_pagina', 1) > n_paginas_conclusoes:
+        st.session_state['conclusoes_pagina'] = 1
+    if n_paginas_conclusoes > 1:
+        pagina_conclusoes = st.number_input(
+            f"Página (de {n_paginas_conclusoes})",
+            min_value=1,
+            max_value=n_paginas_conclusoes,
+            step=1,
+            key='conclusoes_pagina'
+        )
+    else:
+        pagina_conclusoes = 1
+
+    inicio_conclusoes = (pagina_conclusoes - 1) * CONCLUSOES_POR_PAGINA
+    posicoes_pagina, df_pagina_conclusoes = vista.pagina_conclusoes(
+        busca_conclusoes, inicio_conclusoes, CONCLUSOES_POR_PAGINA
+    )
+
+    if n_conclusoes == 0:
+        st.info("Nenhuma conclusão encontrada para os filtros selecionados.")
+
+    registrar_memoria('conclusoes', posicoes_pagina, df_pagina_conclusoes)
+
+    with medir('conclusoes_expanders'):
+        for pos, row in zip(posicoes_pagina, df_pagina_conclusoes.itertuples(index=False)):
+            rating_escala = row.Rating_Escala if pd.notna(row.Rating_Escala) else 'N/A'
+            with st.expander(f"**{row.Empresa}** | Rating: {row.Rating if pd.notna(row.Rating) else 'N/A'} ({rating_escala}) | {row.Opiniao_Agregada}"):
+                col_info1, col_info2, col_info3, col_info4 = st.columns(4)
+                with col_info1:
+                    st.markdown(f"**Tipo:** {row.Tipo}")
+                with col_info2:
+                    st.markdown(f"**Data:** {row.Data.strftime('%d/%m/%Y') if pd.notna(row.Data) else 'N/A'}")
+                with col_info3:
+                    st.markdown(f"**Escala:** {rating_escala}")
+                with col_info4:
+                    st.markdown(f"**Opinião:** {destacar(row.Opiniao, busca_texto)}")
+                st.markdown("---")
+                # Conclusões longas mostram o resumo; o texto completo só é enviado quando pedido
+                if row.Resumo == row.Conclusao:
+                    st.markdown(destacar(row.Conclusao, busca_texto))
+                elif st.toggle("Ver conclusão completa", key=f"conclusao_completa_{pos}"):
+                    st.markdown(destacar(row.Conclusao, busca_texto))
+                else:
+                    st.markdown(destacar(row.Resumo, busca_texto))
+
+secao_conclusoes(vista, busca_texto)
+
+# ============================================================
+# MEMÓRIA POR SESSÃO
+# ============================================================
+bytes_sessao = sum(st.session_state.get('memoria_sessao', {}).values())
+if ctx_execucao is not None:
+    registro_sessoes().registrar(ctx_execucao.session_id, bytes_sessao)
+n_sessoes, bytes_sessoes = registro_sessoes().resumo()
+if banco is not None:
+    descricao_base = f"base em SQLite ({formatar_bytes(os.path.getsize(banco.caminho))} em disco)"
+else:
+    descricao_base = (
+        f"base compartilhada {formatar_bytes(memoria_base(df, versao_dados))}"
+        f" + linha do tempo {formatar_bytes(linha_tempo.nbytes)}"
+    )
+painel_memoria.caption(
+    f"Memória: {descricao_base} · "
+    f"esta sessão {formatar_bytes(bytes_sessao)} · "
+    f"{n_sessoes} sessão(ões) ativa(s), {formatar_bytes(bytes_sessoes)} no total"
+)
+
+# ============================================================
+# INSTRUMENTAÇÃO (DEPURAÇÃO)
+# ============================================================
+if medidor.ativo:
+    with st.expander("Instrumentação: tempo e memória por etapa"):
+        etapas = pd.DataFrame(
+            medidor.etapas, columns=['etapa', 'segundos', 'memoria_alocada', 'pico_memoria', 'etapas_simultaneas']
+        )
+        etapas['memoria_alocada'] = etapas['memoria_alocada'].map(formatar_bytes)
+        etapas['pico_memoria'] = etapas['pico_memoria'].map(formatar_bytes)
+        etapas = etapas.rename(columns={
+            'memoria_alocada': 'memória alocada (processo)',
+            'pico_memoria': 'pico de memória (processo)',
+            'etapas_simultaneas': 'etapas simultâneas',
+        })
+        st.dataframe(etapas, hide_index=True, width='stretch')
+        st.caption(
+            f"Total medido: {sum(e['segundos'] for e in medidor.etapas):.3f} s · "
+            "memória do processo inteiro (todas as sessões e threads); com etapas simultâneas, "
+            "os números incluem o que as outras alocaram · "
+            f"registros acrescentados em {LOG_INSTRUMENTACAO} · "
+            "as seções em fragmento registram suas reexecuções só no log"
+        )
+        entradas_figuras, acertos_figuras, falhas_figuras = cache_figuras().estatisticas()
+        pedidos_figuras = acertos_figuras + falhas_figuras
+        st.caption(
+            f"Cache de figuras: {entradas_figuras} de {MAX_FIGURAS_CACHE} figura(s) guardadas · "
+            f"{acertos_figuras} acerto(s) em {pedidos_figuras} pedido(s)"
+            + (f" ({acertos_figuras / pedidos_figuras:.0%})" if pedidos_figuras else "")
+            + " · todas as sessões"
+        )
 
 # ============================================================
 # RODAPÉ
 # ============================================================
 st.markdown("---")
 
-# Logo em base64
-FOOTER_LOGO = "data:image/webp;base64,UklGRs4TAABXRUJQVlA4WAoAAAAgAAAAnwIAUgAASUNDUMgBAAAAAAHIAAAAAAQwAABtbnRyUkdCIFhZWiAH4AABAAEAAAAAAABhY3NwAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAQAA9tYAAQAAAADTLQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAlkZXNjAAAA8AAAACRyWFlaAAABFAAAABRnWFlaAAABKAAAABRiWFlaAAABPAAAABR3dHB0AAABUAAAABRyVFJDAAABZAAAAChnVFJDAAABZAAAAChiVFJDAAABZAAAAChjcHJ0AAABjAAAADxtbHVjAAAAAAAAAAEAAAAMZW5VUwAAAAgAAAAcAHMAUgBHAEJYWVogAAAAAAAAb6IAADj1AAADkFhZWiAAAAAAAABimQAAt4UAABjaWFlaIAAAAAAAACSgAAAPhAAAts9YWVogAAAAAAAA9tYAAQAAAADTLXBhcmEAAAAAAAQAAAACZmYAAPKnAAANWQAAE9AAAApbAAAAAAAAAABtbHVjAAAAAAAAAAEAAAAMZW5VUwAAACAAAAAcAEcAbwBvAGcAbABlACAASQBuAGMALgAgADIAMAAxADZWUDgg4BEAAFBRAJ0BKqACUwA+USiRRiOioaEkVEmIcAoJZW7hdgERG1q/eY84voHt7yXcJPuf6H1N/3jnpPUX+vnqA/aD9jPc+/0n6ve5v0AP1v///rAewt/Wv8z7AH8n/qv/s9cj9z/gr/r3+2/cz4Cf2V///sAegB1M/SL+q9nX94/KXz58NfjH1r5LHSHmZ/GfrX+C/u/7b+vf+P8Gfi3/AeoF+S/y/+6/mDwQdovQC9aPmf+d/s37sf4T0Lv630T+sf+z/qXwAfxj+j/6f8xv7Dzt/3X/d+wF/Mf6p/p/8z+TH0vfx3/N/yP5pe2L83/xH/R/yHwE/yP+rf7j+//vf/oPnS9h/7texf+wA7Eo5KfhAyE/JAwclPwgZCfkgYOSn4QMhPyQMHJT8IGQnZJbewBSjQ5KUXnR1oH8nADo44CLIUrifcReU7z0BUolUMq0lXrNIgyyqMRFfwm82vC/KxqnUNoflPym69+GnrUVN7ziglb8wkMBXqqoMPrU2qhqkGU9ZR6WGmiGp8cWYxqkUew5Zx8vRbO3SsIbRYd2o60XXp37GW2Qun37w4zY52JGK+/pcUkg8XXGXTRlp+5KT+VtXT6GTzhY9eRZMNl5yHrYcvHFoJdqewtil915RFYWKSChoZdJG3/73jkApQx7eelmZM+8teb473khAUqQooLT3+nx8Op4BbBwBeXnY5DEA3wn4//+YtKiUSz44S+YXJAv2JVVXoGDlu4CEbpgwlhYwoKLEDxQuDgbM0fXqQEsJ4LPu5ncycP2L4LVL0a2Bdi6j6wEhNjQSalBIP0qVQWV5J8XYR5QNa49LFPSiURFLEDHkxaq1ht7lPM2BpkQ/9PhkJ+SBg5KfhAyE/JAwclPxHTgn49AAP7/2D8AAAFvtQ4t2X3PAyeZ2NxmpCEBMmA1vKkc/Qdk8+aaRq8V//wrSXwZVn+jWLQ/qWLeFTM/IIsiZz7Wt32nscmbaN16sps3+wvYkQYDXbJAB6cxoIwkR3oav389TAtzu8XgnbRgSAT9kOdFNUwASWzRRAHUkRHa/VDsNA+oYKs32fn97sMcSm9FJHVTQvERKFjtwVRdFoieQnQdSDlNq6Agda2VEN8r/uhazvbuqbFYGPb1fAWKDzEl2/3qI8osnMUEcaaguBRUyUufZPwJn+60KmfP0XpTHyD3g8vtbxT2WY++I5tU9+o575AbqglKZI0e5F5MK+ktqO20Ftsmz8k1cCLfKZKu0slSn4HCvvbvC5N81RT0TbZwKqrDBSb800Jaxy7KIMMKsBSOZj/eEj5CvyX6vAEzhvqIOczSMze+AFoEygeV1s25jiBfYz9OdWesE9k7insLX/+YrXZZHETh2lktI6NWd44ErEmIP7spgvaVoTq7Yc8Tm4M9h3qdyqJkP7pz/r2fLOgesiUkg3m2p3PpZ1rg+NopJTUr9yNLHQysDHbKpsgD+haKTEKqPZk0w+x56amLqZDWlD5RcMKfeAf9+bgJ0h0S5GNk0nqVYGtjsJTpTruvdddqiRN7PVrgUFmKF9Ih6eRHQt/cfr4qA/AaAXIs/Q7s/Z46tkhbXt4NS5TDf2piI/dW6bC+mmjUzzfduAyU6Od8En6hJR30XgJaKiG+DVRET7/RbS5C4moVtHp/iCkAr50Y2KgX+zu5COsp1u2NinHSzUEHvebsg3IU6jn9Nl6h1c3tv/UWu1rrlo4c94CwAq4Oj91UQLBE3boIeoX8LVOacNqOTqVYz85bMRV0r448/kUDbeBhzcyJo34axYwKvdfggSXPqoHceD+INl7HqHG2cyf3+Teqzqp+o+ZHnCBHM5kx8B9C3jU2vSMKm6f8vWDRhx0dZC/JczxZLl8uBcKTtgkgic4f5UILAnOe+Dw3VEar82n/VM3YXExqqu3oaN/i3jKf3aAU2ttPNr+cmuWdptNPLbhf0r/dQRI1ZsS9+8X3Aqn2d5VOzJbparz2rrQPNQFt93Xbv+yC9YgSJHXrqgjvBdy7AIjHb76EZpSjcQuJgKi/hClsBejSEeQc3ReZLcTgMhQM6SDR9TcsUWukGUyhL5MYhQMZTt3e+aUiYSmQ1w2xFsDNm7kN9jH6TVF5ZXOWw104TGzI0mTfXFcnxeb0msfoBgQ7YhmkWMu2kZ+diNc57cac7hul72DbmvpOfNUUzPStKuyDs4/8rXQ/XoeEiBc2yER/tOtaQEggQypeOsD95pZjW/L0G5tlS3jR65OEyXac4RWJ5fM6NC+VP5EBUH7+QEAxge8QcGLgdQqBlqXy99MpbM2KgnB8W37E5LAV23jI8mngdFRamfX4FEgKqX7co8blLW5zCFR2nvAOemabk/OUeHdBHADydVJj1bsxKPhIDtAG+XkQfTNnvtvy47rhyc4o0rq1+cQ/RYfR2H7/uEUe4pBYvYYH6+in3BSCs95EopbLZXIihZuZo+WHBddzYg+ltZnk8li8su0cOcE3gvQUClEaU116AHmKwx1rZNVXXgYJ3+pGoRwTEsm2CnUWInOTEEkZ73ybHHrCifM9iw/5ybtfsK5VXbvPFqgx3jDYrkWkfvweokhyBXuqYAxR0tiZw2qkKPkprt8+DQ6cAi6hEQ4i4J7r/GolXDjKIrPEQJlUHpqulwP092IFc6NT8n5zq6Bq99hveZN803yfRVvGrsTevOUp7smgX5tMc6sg89ZDZ73SMWCp1FfIVMxRqMyXCkxlWUiRUyrVX7zrz/2NNckSxlDOpIIGupYES37N9rqnlEUbv8/BCchn8RGqYgvkFu3I8MgDb8rrdtfkTNOskTbO3WVV7bB5KaffS6c9HSSqd9dZLW+e4OcuG5cPQXpDAhgr8iyEtrBF99VtkhBOc/dgja35filyPwIj9H2G2GmFrnvoqAQyPk5cqPCNX9goRgMfbuU0ejY5WvQQCSVmn6m2+cXCJKJXntZ949qaNaG/gqMqcL/eeFawSsQScOJKru8G0qLm7Q2W/MmkClPub9wTYh//YWJXTPUssW/3jGQYGMArjiErFYNziXrgHE7JadiH4l7odKwP68wi48cfn/yugAvWLbR6xRE04scEbBm5zeuXkwPKlhApSFtZrD0d1riwLwoVV29629neN+VWG7/n725gGeG6Gopn9JHS9E615j3N890yqlU50D+rJ7xUHS6DlBQupYZZQy8TF4MHmyyBPn2gze2dLalEGKUXDflTjsikdQoc5usTBBcUT8G2Uzs2ePj+rwqU5LTmQIXemZIhCMVPBNMFKPKiua7gtBK+xjwzVNRp1f69ZdJs+3yykQdqBcyhXxFqIUgNJc5JdC7HWbvIIWiZVtI4xSu7g6/C/HDIqsZuy0mlnzE3rG5GSz4buWAv7JccoKhLl+xqf3niv/Kw59PbMybN/dCvzUn8dqUPVHJoEuk1y2XcqieYVcEmzyfsO4CbTwFFfpsS1bKRV5e6Ghuh5JJj331/ZluaZpMw4vHRXaCSLR9MzyJbij19OBzPxqQO3dKD7n50UjIWY0dumbERLrg3i8J28TxO9ZstN0a9Uq6naKqnSay7BtB4iZ7QodZZj7n1V1s6hGOUttQXbmgRtJW6llwMB9LTvC57z6sYkzm+6/Vd5h2UYNFkjxkJOVG1Mo0MOTifsnGPRkqqT50xDFbjLCb2EaqbXGpNyWdMidG+1JERXPWysTl8XHLRGl4WII+XLobPxyqP0vOiAnpZWFO0dOjQQDInJoJ4PdGva407VdlHIz5sfi4DkR6CDLd8bqd095ubAmYoo5FudAQ3Q8Aqlaj9KBS6crvOdFlyOnLVzCCinTawiEsUXVO/x3ndPPj2RqT6peL+Z1LvcYqrruZWP2NlT1iY8IKPUDfBwC11KDBa4DpGK+lf7TPMuInKYsGs6+oofI51x+6bLD93sp04lzVcbISXl1F49DMxt6138s5I6mSKHKKeWBauCWp/6CCDKPHxTb0JvowMvnqAY61De7rFq59r+FFhQ4ouVADPNH1hKPc1LoEAhAotRD1pclxORxR/I6/4ElkwJ9lney2HKacOu2q5ufb1l6eBJR+putiv5xZ09DzGmc5epJw9sDkBT5+w/yi4TNV38cTWX//M1I1Wc3IEG+Ijl6X3C9Qz6lTxPZKKIA5zpft288Oh/PLePEUbOQXOttqQ59oPBSi5bENd6YbYFt4FpvmJ4uVRxe7wRT/iDZGqoG25DOqxsLilaCh2iqiTnEIIZY8fzeJKo7GlKyoyF9eXwvoAS023/rZNfZRlufXrsLYxSmzErTW0aawzxNMMrNyetJy44TPX8BVbtBcuwhE+1CDil82H/HFySheg58uCzLNn+faTgDUtztVJOr8A3VdnV9JXjHMWlpe5sPcVyObfpvZ4hEkNi4cKk0fR8TB14ASaRd6iringsJysnapWn8pG2mtbjT4cAv8Ww47zW9PqNtoYFOuVz9sWlZPHn/qKzcRgJ9nWM2yMMbkzNExIActYYthhokj2Ggv0wbXRd9044z9qusF/DmqwnrcMYlCf7QuEDmKoBSonBY2pPTaefci0PbgLEeHYH3z0RPi7HknJECY8ET02D+YF7CbqLDb0+3921rwQ3Ci/nzVTzhfrj9k7Wm5V8tv2XgXkbsBEUVM6QoqApIyYsiYaMKnTiij1/QYBO2HkET3HPiE0WiwmsmWhdTs1qn49c4RIUG3S6r8WyvKQf41VovYpq/5B8dHvR0ea+CfwE0gDLvRHTY3eg9P5Rit77o0XacEcD8b8WOANdvonw/yH9vhK1dTjY+un4jo57ajMfDmk+sc+oQk9qSSVEe6jG3vm6hyZimK38U4fEVLvIEnRypGdRjplwjmrh6sSjyds4C04A9y0aYs5xJdPx96ruoNr6J3EiqodjXCF5a9RyIo/c+o0pdwQC+uH8sZ4SPvfc+SoOtJ3Ryvz6XpnZSd6GRbd+Dtzwn7aRjyKZMNllZvbL6+Sd0cXqqWmkdnLuif0pFsqXERRQXCV/1F6lnXb0LBhMqEhXsyOMgZpKX67495y30Y+02Vo5lJSSajALTlirsK7phAydAs1zz58ww6v4aqGZo2qlFrxhlD7GRm8v/I8aR+lI+1dX8TBgo7mvR5pcf246XHLccPz6HoS1QXCxs1hj0RAlvCW+KTxgTkRZvsgX5ktXkzV5YUy9IhTKMMyX0BGTSGL3sl90yTHzniJQ42pbjPG0Q+xevKwCwS1SXuWtPcOkd1hGiKLibVis097yiO/v0mV9iIg7OMchjuCEEmI8qyAZqP8zgGYTgjhQBpQ3fEc3nP1NMNvTee7IOUIoar4zC9tOf/4UxWKvFDIGjRl4dUKCdB325+bpqgV53h6RCdIKZLceZmcYBFH9nPZvQpyGvWf8rYi+Mmpo79Cl4RbOowJxiMPuXukKUOMF88wdZqywCY3p6aDFXzEEbcVDEQzGl+ziSVAMLivZiegavlIfAcwvmu4mNonvk+6U95lP36Bi+RYb3MFgx7qdPBCwKdUg2isecgsHFgQxo1V1UHsIIXs8IG1v9/yroay81mbQaZhQEoSUcS+Z3wDXWarJi8uR6ZJKxI28bTho4bUbgCS5gYAqoHZ5G5ogP+XKc/kzPeEM9TLCpF2QvYTq+0kPdxpOU/IOesdrNh2+lceLMbkenbIVEH1xY6BwlsBzurIWyNovG8nShJKwDs2fntvVsAF7WkAUvyU6+43kzUVy3fazAQC6lxd8sW6MdcdsCHm72Ci5QDQMenTlwvHPoa4kV/f7fEly/IlU+LZmj7Kh0Ti9Uvzn/nKWK1EaKKnziKWrsZ8LF0N7RedKwFTAxeimVpfCuBny+jKfpOiG2fOCTVHkzmlwM/mdkmAsifm7cBWAuL0U37fhsTVBYDF15DE4kTbXlUcckKNLXMdoMRPs9EYdQMEkIIrSR25tkJrODcscFltO9lwEJ/nvuYs4qo0AzZNkQ+YeVPKRqd71nU93evhtj8MET6+oYJ1/ypYbammhYI3/+jJnW4H0CzjOK/0uCeKNAGp6KwvNssh3MMh/OySBojyg36Mqp+Ib+NBxcCe8euEsIV5Ws0zFsQAAAAAAAp9r0eB8ED74HwgEdReeJ6EKHtaAoF4dNut1CFCNxQZcAMoLrdAAAAAAAA="
-
 st.markdown(
-    f"""
-    <div style='text-align: center; padding: 2rem 1rem 1rem 1rem;'>
-        <img src="{FOOTER_LOGO}" alt="AVIN | BTG Pactual" style="max-width: 550px; width: 138%;">
-    </div>
-    """,
+    f'<div class="rodape"><img src="{url_estatico("logo_rodape.webp")}" alt="AVIN | BTG Pactual"></div>',
     unsafe_allow_html=True
 )
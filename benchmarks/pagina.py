@@ -0,0 +1,87 @@
+"""Carga da página: bytes enviados por execução e tempo até a primeira renderização.
+
+Executa o ``app.py`` pelo ``AppTest`` do Streamlit com a origem de dados do
+painel (rode da raiz do repositório, com a planilha em ``data/`` ou
+``DASHBOARD_PASTA_PLANILHAS``) e soma o tamanho das mensagens que o servidor
+enviaria ao navegador. Cada modo roda num processo novo, com os caches em
+memória vazios: ``frio`` é o primeiro visitante sem aquecimento e
+``aquecido`` o primeiro visitante depois do ``caches.aquecer`` feito pelo
+``servidor.py``.
+
+Uso:
+    python -m benchmarks.pagina
+    python -m benchmarks.pagina --reexecucoes 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+MODOS = ('frio', 'aquecido')
+
+
+def medir_modo(modo, reexecucoes):
+    """{'aquecimento', 'primeira_renderizacao', 'bytes_primeira', 'bytes_reexecucao'} neste processo"""
+    from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+    from streamlit.testing.v1 import AppTest
+
+    enviados = [0]
+    enfileirar = ForwardMsgQueue.enqueue
+
+    def contar(fila, msg):
+        enviados[0] += msg.ByteSize()
+        return enfileirar(fila, msg)
+
+    ForwardMsgQueue.enqueue = contar
+
+    resultado = {'aquecimento': None}
+    if modo == 'aquecido':
+        import caches
+
+        inicio = time.perf_counter()
+        caches.aquecer()
+        resultado['aquecimento'] = time.perf_counter() - inicio
+
+    at = AppTest.from_file(os.path.abspath('app.py'), default_timeout=600)
+    inicio = time.perf_counter()
+    at.run()
+    resultado['primeira_renderizacao'] = time.perf_counter() - inicio
+    resultado['bytes_primeira'] = enviados[0]
+    if at.exception:
+        raise RuntimeError(f"Erro ao executar o app: {at.exception}")
+
+    bytes_reexecucao = []
+    for _ in range(reexecucoes):
+        enviados[0] = 0
+        at.run()
+        bytes_reexecucao.append(enviados[0])
+    resultado['bytes_reexecucao'] = max(bytes_reexecucao) if bytes_reexecucao else None
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reexecucoes', type=int, default=3, help="Execuções seguintes medidas (vale a maior)")
+    parser.add_argument('--modo', choices=MODOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.modo:
+        print(json.dumps(medir_modo(args.modo, args.reexecucoes)))
+        return
+
+    print(f"  {'modo':<10}{'aquecimento (s)':>17}{'1ª renderização (s)':>21}{'bytes 1ª':>11}{'bytes/execução':>16}")
+    for modo in MODOS:
+        saida = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.pagina', '--modo', modo, '--reexecucoes', str(args.reexecucoes)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        r = json.loads(saida.strip().splitlines()[-1])
+        aquecimento = '-' if r['aquecimento'] is None else f"{r['aquecimento']:.2f}"
+        print(f"  {modo:<10}{aquecimento:>17}{r['primeira_renderizacao']:>21.2f}"
+              f"{r['bytes_primeira']:>11}{r['bytes_reexecucao'] or 0:>16}")
+
+
+if __name__ == '__main__':
+    main()
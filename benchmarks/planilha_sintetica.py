@@ -0,0 +1,147 @@
+"""Gerador de planilhas sintéticas no layout da aba 'Relatórios de Crédito'.
+
+Escreve as mesmas colunas da planilha compilada real, com distribuições
+parecidas com as da amostra em ``data/`` (tipo, rating, escala, opiniões,
+conclusões de ~1.500 caracteres), para medir o painel em 1 mil, 100 mil ou
+1 milhão de linhas.
+
+Uso:
+    python -m benchmarks.planilha_sintetica 100000 /tmp/credito_100k.xlsx
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from credito.tratamento import ABA_RELATORIOS
+
+COLUNAS_PLANILHA = [
+    '##',
+    'Relatórios Enviados',
+    'Empresa / Emissão',
+    'Data de Envio',
+    'Rating - X/100',
+    'Rating Escala',
+    'Opinião - Independente de pontuação de Rating',
+    'Conclusão',
+]
+
+TAMANHOS_PADRAO = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+# Opiniões como aparecem na amostra (texto livre), com pesos aproximados
+OPINIOES = [
+    ('Positivo', 5), ('Negativo', 5), ('Neutro, requer atenção', 4), ('Neutro, boa evolução', 3),
+    ('Atenção', 2), ('Neutro', 2), ('Positivo, requer atenção quanto a gestão', 1), ('Requer Atenção', 1),
+    ('Positivo, atenção a riscos', 1), ('Positivo, atenção a ramp-up operacional', 1), ('Negativo (Default)', 1),
+]
+
+# Escala a partir da nota (aba auxiliar da planilha real)
+ESCALAS = [(90, 'AAA'), (80, 'AA'), (70, 'A'), (60, 'BBB'), (50, 'BB'), (0, 'B')]
+
+_RAIZES = [
+    'Energia', 'Celulose', 'Foods', 'Agro', 'Logística', 'Saneamento', 'Infra', 'Incorporadora',
+    'Transmissão', 'Mineração', 'Varejo', 'Saúde', 'Locadora', 'Siderurgia', 'Telecom', 'Bioenergia',
+]
+_PREFIXOS = ['Alta', 'Nova', 'Grupo', 'Cia', 'Porto', 'Vale', 'Rio', 'Sul', 'Norte', 'Brasil', 'Terra', 'Prime']
+_EMISSOES = ['CRI', 'CRA', 'Debênture', 'FIDC', 'CDCA']
+
+_FRASES = [
+    'A companhia apresentou crescimento de receita acima do setor nos últimos trimestres',
+    'A alavancagem medida por dívida líquida sobre EBITDA segue em patamar confortável',
+    'Os covenants financeiros foram cumpridos com folga no último período',
+    'A geração de caixa operacional foi pressionada pelo aumento do capital de giro',
+    'O cronograma de amortizações está bem distribuído e não há concentração no curto prazo',
+    'A liquidez é expressiva e cobre as necessidades de Capex previstas',
+    'Há risco relevante de refinanciamento caso as condições de mercado se deteriorem',
+    'A margem EBITDA recuou devido a custos de operação mais altos',
+    'O setor elétrico regulado traz previsibilidade às receitas',
+    'A estrutura de garantias da emissão inclui cessão fiduciária de recebíveis',
+    'A governança melhorou após a entrada de novos conselheiros independentes',
+    'O ramp-up operacional da nova planta ainda é um ponto de atenção',
+    'A exposição cambial é parcialmente protegida por instrumentos de hedge',
+    'O histórico de pagamentos é adimplente e sem eventos de crédito',
+    'Recomendamos acompanhamento trimestral dos indicadores de endividamento',
+]
+
+
+def _nomes_empresas(n, rng):
+    """Pool de nomes de empresas e emissões (com repetições ao longo da base)"""
+    nomes = set()
+    while len(nomes) < n:
+        nome = f'{rng.choice(_PREFIXOS)} {rng.choice(_RAIZES)}'
+        if rng.random() < 0.3:
+            nome = f'{rng.choice(_EMISSOES)} {nome}'
+        if nome in nomes:
+            nome = f'{nome} {rng.randint(2, 999)}'
+        nomes.add(nome)
+    return sorted(nomes)
+
+
+def _conclusoes(n, rng, tamanho_medio=1_465, desvio=466):
+    """Pool de conclusões com tamanhos próximos aos da amostra (parágrafos de frases)"""
+    conclusoes = []
+    for _ in range(n):
+        alvo = max(300, int(rng.gauss(tamanho_medio, desvio)))
+        paragrafos, atual, tamanho = [], [], 0
+        while tamanho < alvo:
+            frase = rng.choice(_FRASES) + '.'
+            atual.append(frase)
+            tamanho += len(frase) + 1
+            if len(atual) >= 3:
+                paragrafos.append(' '.join(atual))
+                atual = []
+        if atual:
+            paragrafos.append(' '.join(atual))
+        conclusoes.append('\n\n'.join(paragrafos))
+    return conclusoes
+
+
+def _escala(rating):
+    return next(escala for minimo, escala in ESCALAS if rating >= minimo)
+
+
+def gerar_linhas(n_linhas, semente=0):
+    """Gera as linhas (tuplas na ordem de ``COLUNAS_PLANILHA``)"""
+    rng = random.Random(semente)
+    empresas = _nomes_empresas(max(10, n_linhas // 3), rng)
+    conclusoes = _conclusoes(min(n_linhas, 2_000), rng)
+    opinioes, pesos = zip(*OPINIOES)
+    inicio = datetime(2019, 1, 1)
+    dias = (datetime(2026, 1, 31) - inicio).days
+
+    for i in range(1, n_linhas + 1):
+        empresa = rng.choice(empresas)
+        tipo = 'Emissão' if empresa.split()[0] in _EMISSOES or rng.random() < 0.1 else 'Empresa'
+        data = inicio + timedelta(days=rng.randrange(dias)) if rng.random() > 0.02 else None
+        rating = round(min(100, max(20, rng.gauss(72, 11)))) if rng.random() > 0.35 else None
+        escala = _escala(rating) if rating is not None else None
+        opiniao = rng.choices(opinioes, pesos)[0] if rng.random() > 0.03 else None
+        conclusao = rng.choice(conclusoes) if rng.random() > 0.04 else None
+        yield (i, empresa, tipo, data, rating, escala, opiniao, conclusao)
+
+
+def gerar_planilha(caminho, n_linhas, semente=0):
+    """Escreve a planilha sintética em ``caminho`` (modo de escrita em streaming do openpyxl)"""
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(ABA_RELATORIOS)
+    ws.append(COLUNAS_PLANILHA)
+    for linha in gerar_linhas(n_linhas, semente):
+        ws.append(linha)
+    wb.save(caminho)
+    return caminho
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('linhas', help="Número de linhas ou um dos tamanhos: " + ', '.join(TAMANHOS_PADRAO))
+    parser.add_argument('saida', help="Arquivo .xlsx a gerar")
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+    n_linhas = TAMANHOS_PADRAO.get(args.linhas.lower()) or int(args.linhas)
+    gerar_planilha(args.saida, n_linhas, args.semente)
+    print(f"{n_linhas} linhas gravadas em {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
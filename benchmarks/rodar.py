@@ -0,0 +1,189 @@
+"""Benchmark das etapas do painel em planilhas sintéticas.
+
+Para cada tamanho, gera a planilha (``benchmarks.planilha_sintetica``) e mede
+as etapas de uma execução: leitura a frio, sidecar Parquet, índice de
+filtros, filtragem, KPIs, cubo mensal, figuras, linha do tempo por empresa
+e página da tabela. As medianas são comparadas com a baseline gravada;
+etapas mais lentas que o limite de tolerância são marcadas como regressão e
+o processo sai com código 1.
+
+Uso:
+    python -m benchmarks.rodar                      # 1k e 100k linhas
+    python -m benchmarks.rodar --linhas 1000 --salvar-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.planilha_sintetica import gerar_planilha
+from credito.cubo import CuboMensal
+from credito.filtros import IndiceFiltros
+from credito.kpis import calcular_kpis
+from credito.linha_tempo import LinhaTempoEmpresas
+from credito.ranking import preparar_ranking
+from credito.sidecar import gravar_sidecar, ler_sidecar
+from credito.streaming import ler_planilha_streaming, usar_streaming
+from credito.tabela import html_tabela, pagina_tabela
+from credito.tratamento import ABA_RELATORIOS, tratar_dados
+from graficos import figura_empresas, figura_faixa, figura_opiniao, figuras_mensais
+
+BASELINE_PADRAO = Path(__file__).with_name('baseline.json')
+LIMITE_PADRAO = 0.20
+# Diferenças menores que isto são ruído de medição, qualquer que seja a variação relativa
+MINIMO_MS_PADRAO = 1.0
+# Mesmo limite de pontos WebGL do app.py
+LIMITE_WEBGL = int(os.environ.get('DASHBOARD_LIMITE_WEBGL', 300))
+
+# Filtros de um uso típico: um tipo e uma opinião no período inteiro
+SELECOES = {'Tipo': 'Empresa', 'Opiniao_Agregada': 'Positivo', 'Faixa_Rating': None}
+
+
+def medir(funcao, repeticoes, aquecer=False):
+    """(mediana em segundos, último resultado) de ``repeticoes`` chamadas
+
+    ``aquecer`` faz uma chamada fora da medição antes (importações e caches
+    de primeira chamada, como os do Plotly).
+    """
+    if aquecer:
+        funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), resultado
+
+
+def ler_a_frio(planilha):
+    if usar_streaming(os.path.getsize(planilha)):
+        return ler_planilha_streaming(planilha)
+    return tratar_dados(pd.read_excel(planilha, sheet_name=ABA_RELATORIOS))
+
+
+def rodar_tamanho(n_linhas, pasta, repeticoes):
+    """Tempos medianos (segundos) de cada etapa para uma planilha de ``n_linhas``"""
+    planilha = os.path.join(pasta, f'sintetica_{n_linhas}.xlsx')
+    if not os.path.exists(planilha):
+        print(f"  gerando {planilha}...", flush=True)
+        gerar_planilha(planilha, n_linhas)
+
+    tempos = {}
+    # A leitura a frio é a etapa mais cara: uma única vez acima de 100 mil linhas
+    tempos['leitura_fria'], df = medir(lambda: ler_a_frio(planilha), 1 if n_linhas > 100_000 else repeticoes)
+    tempos['gravar_sidecar'], _ = medir(lambda: gravar_sidecar(planilha, df), repeticoes)
+    tempos['ler_sidecar'], df = medir(lambda: ler_sidecar(planilha), repeticoes)
+
+    tempos['indice_filtros'], indice = medir(lambda: IndiceFiltros(df), repeticoes)
+    inicio, fim = indice.intervalo_datas()
+    tempos['filtrar'], linhas = medir(lambda: indice.filtrar(SELECOES, (inicio, fim)), repeticoes)
+    tempos['kpis'], _ = medir(lambda: calcular_kpis(df, linhas), repeticoes)
+
+    tempos['cubo_mensal'], cubo = medir(lambda: CuboMensal(df), repeticoes)
+    tempos['fatia_cubo'], celulas = medir(lambda: cubo.fatia(SELECOES), repeticoes)
+    tempos['figuras_cubo'], _ = medir(
+        lambda: (figura_opiniao(celulas), figura_faixa(celulas), figuras_mensais(celulas)), repeticoes, aquecer=True
+    )
+    tempos['ranking'], ranking = medir(lambda: preparar_ranking(df, linhas, n=50), repeticoes)
+    tempos['figura_empresas'], _ = medir(
+        lambda: figura_empresas(ranking, max(500, len(ranking) * 22), LIMITE_WEBGL), repeticoes, aquecer=True
+    )
+    tempos['linha_tempo'], linha_tempo = medir(lambda: LinhaTempoEmpresas(df), repeticoes)
+    tempos['rebaixamentos'], _ = medir(lambda: linha_tempo.rebaixamentos(pd.Timestamp(fim) - pd.Timedelta(days=365), fim), repeticoes)
+
+    tempos['pagina_tabela'], _ = medir(
+        lambda: html_tabela(pagina_tabela(df, linhas, pagina=2, ordenar_por='Rating', crescente=False)),
+        repeticoes
+    )
+    return tempos
+
+
+def info_maquina():
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'sistema': platform.platform(),
+        'processador': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def relatorio(resultados, baseline, limite, minimo_ms=MINIMO_MS_PADRAO):
+    """Imprime a comparação com a baseline; devolve o número de regressões"""
+    regressoes = 0
+    for tamanho, tempos in resultados.items():
+        base = baseline.get('resultados', {}).get(tamanho, {})
+        print(f"\n{int(tamanho):,} linhas".replace(',', '.'))
+        print(f"  {'etapa':<18}{'atual (ms)':>12}{'baseline (ms)':>15}{'variação':>11}  situação")
+        for etapa, segundos in tempos.items():
+            anterior = base.get(etapa)
+            if anterior is None:
+                print(f"  {etapa:<18}{segundos * 1000:>12.1f}{'-':>15}{'-':>11}  sem baseline")
+                continue
+            variacao = segundos / anterior - 1 if anterior > 0 else 0.0
+            situacao = 'ok'
+            if variacao > limite and (segundos - anterior) * 1000 > minimo_ms:
+                situacao = 'REGRESSÃO'
+                regressoes += 1
+            elif variacao < -limite and (anterior - segundos) * 1000 > minimo_ms:
+                situacao = 'melhorou'
+            print(f"  {etapa:<18}{segundos * 1000:>12.1f}{anterior * 1000:>15.1f}{variacao:>+11.0%}  {situacao}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[1_000, 100_000],
+                        help="Tamanhos das planilhas sintéticas (ex.: 1000 100000 1000000)")
+    parser.add_argument('--pasta', help="Pasta das planilhas geradas (reaproveitadas entre execuções); "
+                                        "padrão: pasta temporária apagada no fim")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PADRAO)
+    parser.add_argument('--salvar-baseline', action='store_true', help="Grava os tempos medidos como nova baseline")
+    parser.add_argument('--limite', type=float, default=LIMITE_PADRAO,
+                        help="Tolerância de lentidão antes de acusar regressão (0.2 = 20%%)")
+    parser.add_argument('--minimo-ms', type=float, default=MINIMO_MS_PADRAO,
+                        help="Diferença absoluta mínima (ms) para uma etapa contar como regressão")
+    args = parser.parse_args()
+
+    pasta = args.pasta or tempfile.mkdtemp(prefix='bench_credito_')
+    os.makedirs(pasta, exist_ok=True)
+    try:
+        resultados = {}
+        for n_linhas in args.linhas:
+            print(f"Medindo {n_linhas} linhas...", flush=True)
+            resultados[str(n_linhas)] = {
+                etapa: round(segundos, 6) for etapa, segundos in rodar_tamanho(n_linhas, pasta, args.repeticoes).items()
+            }
+    finally:
+        if not args.pasta:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8')) if args.baseline.exists() else {}
+    regressoes = relatorio(resultados, baseline, args.limite, args.minimo_ms)
+
+    if args.salvar_baseline:
+        novos = {**baseline.get('resultados', {}), **resultados}
+        args.baseline.write_text(json.dumps({
+            'gerado_em': datetime.now().isoformat(timespec='seconds'),
+            'maquina': info_maquina(),
+            'repeticoes': args.repeticoes,
+            'resultados': novos,
+        }, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        print(f"\nBaseline gravada em {args.baseline}")
+    elif regressoes:
+        print(f"\n{regressoes} etapa(s) acima da tolerância de {args.limite:.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Caches de dados do painel (``st.cache_resource``), compartilhados pelas sessões.
+
+Ficam fora do ``app.py`` para que o servidor possa preenchê-los antes da
+primeira sessão (``servidor.py``): o Streamlit identifica cada cache pelo
+módulo e pelo código da função, então o ``app.py`` encontra aqui os mesmos
+valores que o aquecimento calculou no processo.
+"""
+import numpy as np
+import streamlit as st
+
+from credito.banco import BACKEND, BancoSQLite, caminho_banco
+from credito.carga import abrir_origem, candidatas_origem
+from credito.cubo import CuboMensal
+from credito.filtros import IndiceFiltros
+from credito.linha_tempo import LinhaTempoEmpresas
+from credito.memoria import tamanho_objeto
+
+
+@st.cache_resource(max_entries=4)
+def carregar_dados(versao_dados, _ler):
+    """Carrega e trata a base de uma planilha, pasta ou padrão glob
+
+    ``versao_dados`` (origem e assinaturas, ver ``candidatas_origem``) é a
+    chave do cache: uma planilha alterada é relida. ``_ler`` lê a base, pelo
+    sidecar Parquet quando ele está em dia, em streaming (planilhas muito
+    grandes) ou em paralelo (pastas).
+
+    A base fica num ``st.cache_resource``: um único DataFrame por processo,
+    lido (nunca alterado) por todas as sessões, sem a cópia por chamada do
+    ``st.cache_data``.
+    """
+    return _ler()
+
+@st.cache_resource(max_entries=4)
+def banco_sqlite(caminho, versao_dados, _ler_base):
+    """Banco SQLite da origem (backend 'sqlite'), regravado quando ela muda
+
+    A base lida por ``_ler_base`` só existe durante a gravação; depois as
+    sessões consultam o banco.
+    """
+    return BancoSQLite.abrir(caminho, versao_dados, _ler_base)
+
+@st.cache_resource(max_entries=4)
+def memoria_base(_df, versao_dados):
+    """Bytes da base compartilhada (medido uma vez por versão)"""
+    return tamanho_objeto(_df)
+
+@st.cache_resource
+def ultimos_indices():
+    """Último índice/cubo construído para cada (tipo, origem de dados)"""
+    return {}
+
+@st.cache_resource(max_entries=4)
+def indice_filtros(_df, versao_dados):
+    """Índice de filtros construído uma vez por versão da base
+
+    Quando já existe um índice de uma versão anterior da mesma planilha,
+    ele é atualizado só nas linhas novas ou alteradas.
+    """
+    chave = ('filtros', versao_dados[0])
+    anterior = ultimos_indices().get(chave)
+    indice = anterior.atualizado(_df) if anterior is not None else IndiceFiltros(_df)
+    ultimos_indices()[chave] = indice
+    return indice
+
+@st.cache_resource(max_entries=4)
+def cubo_mensal(_df, versao_dados):
+    """Cubo mensal construído na carga (atualizado incrementalmente, como o índice)"""
+    chave = ('cubo', versao_dados[0])
+    anterior = ultimos_indices().get(chave)
+    cubo = anterior.atualizado(_df) if anterior is not None else CuboMensal(_df)
+    ultimos_indices()[chave] = cubo
+    return cubo
+
+@st.cache_resource(max_entries=8)
+def linha_tempo_empresas(_fonte, versao_dados, tipo):
+    """Linha do tempo de rating por empresa, por versão dos dados e filtro de tipo
+
+    ``_fonte`` é a base em memória ou o banco SQLite. Da base só ficam arrays
+    compactos (a linha do tempo não a referencia, então um upload descartado
+    pelo cache de uploads não fica preso aqui); no banco, as consultas são
+    feitas em SQL, sem ler o histórico.
+    """
+    if isinstance(_fonte, BancoSQLite):
+        return _fonte.linha_tempo(tipo)
+    linhas = None if tipo is None else np.flatnonzero((_fonte['Tipo'] == tipo).to_numpy())
+    return LinhaTempoEmpresas(_fonte, linhas)
+
+# ============================================================
+# ORIGEM DOS DADOS E AQUECIMENTO
+# ============================================================
+def abrir_fonte(versao_dados, ler):
+    """Base em memória (backend pandas) ou banco SQLite da origem, pelos caches acima
+
+    Usada com ``abrir_origem`` pelo ``app.py`` e pelo aquecimento, que assim
+    chegam às mesmas chaves de cache.
+    """
+    if BACKEND == 'sqlite':
+        return banco_sqlite(caminho_banco(versao_dados[0]), versao_dados, ler)
+    return carregar_dados(versao_dados, ler)
+
+def aquecer():
+    """Preenche os caches que a primeira execução do painel usaria; devolve a versão dos dados (ou None)
+
+    Base (ou banco SQLite), índice de filtros, cubo mensal, memória da base
+    e a linha do tempo sem filtro de tipo (a seleção inicial da sidebar).
+    """
+    origem = abrir_origem(candidatas_origem(), abrir_fonte)
+    if origem is None:
+        return None
+    versao_dados, fonte = origem
+    if not isinstance(fonte, BancoSQLite):
+        indice_filtros(fonte, versao_dados)
+        cubo_mensal(fonte, versao_dados)
+        memoria_base(fonte, versao_dados)
+    linha_tempo_empresas(fonte, versao_dados, None)
+    return versao_dados
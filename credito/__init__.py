@@ -0,0 +1 @@
+"""Rotinas de dados do Dashboard de Crédito (sem dependência do Streamlit)"""
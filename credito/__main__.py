@@ -0,0 +1,185 @@
+"""Linha de comando do Dashboard de Crédito, sem Streamlit.
+
+    python -m credito saude [origem] [--exigir-cache]
+    python -m credito preparar [origem]
+    python -m credito kpis [origem] [--tipo Empresa] [--opiniao Negativo] [--inicio 2024-01-01] [--json]
+    python -m credito exportar destino.csv [origem] [--tipo Empresa] [--conclusoes]
+
+``saude`` confere se a origem existe e se o sidecar está em dia, sem
+importar o pandas (serve de health check do contêiner). ``preparar`` lê a
+base uma vez, gravando o sidecar Parquet (e o banco SQLite, com
+``DASHBOARD_BACKEND=sqlite``), para que a primeira sessão do painel não
+pague a leitura da planilha. ``kpis`` imprime os KPIs de um conjunto de
+filtros e ``exportar`` grava as análises filtradas em CSV, XLSX ou Parquet
+(pela extensão do destino), lote a lote, sem o limite de linhas do
+download pelo painel.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+
+from credito.carga import PASTA_PLANILHAS, abrir_origem, candidatas_origem
+
+
+def _candidatas(args):
+    candidatas = candidatas_origem(args.origem)
+    if not candidatas:
+        origem = args.origem or PASTA_PLANILHAS
+        sys.exit(f"Nenhuma planilha encontrada{f' em {origem}' if origem else ''}")
+    return candidatas
+
+
+def _abrir(args, abrir):
+    """(versão dos dados, ``abrir(versão, ler)``) da origem, com o mesmo fallback do painel"""
+    return abrir_origem(_candidatas(args), abrir)
+
+
+def saude(args):
+    from credito.sidecar import sidecar_fresco
+
+    # Sem ler a planilha, vale a primeira candidata (a que o painel tenta primeiro)
+    (origem, _), _ = _candidatas(args)[0]
+    if not os.path.isfile(origem):
+        print(f"ok: {origem}")
+        return 0
+    fresco = sidecar_fresco(origem)
+    print(f"ok: {origem} (sidecar {'em dia' if fresco else 'ausente ou desatualizado'})")
+    return 0 if fresco or not args.exigir_cache else 1
+
+
+def _ler_base(versao_dados, ler):
+    return ler()
+
+
+def _abrir_banco(versao_dados, ler):
+    from credito.banco import BancoSQLite, caminho_banco
+
+    return BancoSQLite.abrir(caminho_banco(versao_dados[0]), versao_dados, ler)
+
+
+def preparar(args):
+    from credito.banco import BACKEND
+
+    inicio = time.perf_counter()
+    if BACKEND == 'sqlite':
+        versao_dados, banco = _abrir(args, _abrir_banco)
+        n_linhas = banco.n_linhas
+    else:
+        versao_dados, df = _abrir(args, _ler_base)
+        n_linhas = len(df)
+    print(f"{versao_dados[0]}: {n_linhas} linhas prontas em {time.perf_counter() - inicio:.1f}s (backend {BACKEND})")
+    return 0
+
+
+def _periodo(args, intervalo):
+    """(início, fim) pedidos na linha de comando, completados pelo intervalo da base"""
+    if args.inicio is None and args.fim is None or intervalo is None:
+        return None
+    import pandas as pd
+
+    minimo, maximo = (pd.Timestamp(d).date() for d in intervalo)
+    return (
+        date.fromisoformat(args.inicio) if args.inicio else minimo,
+        date.fromisoformat(args.fim) if args.fim else maximo,
+    )
+
+
+def _vista(args):
+    """Vista (pandas ou SQLite, conforme o backend) das análises que passam nos filtros da linha de comando"""
+    from credito.banco import BACKEND
+
+    selecoes = {'Tipo': args.tipo, 'Opiniao_Agregada': args.opiniao, 'Faixa_Rating': args.faixa}
+    if BACKEND == 'sqlite':
+        _, banco = _abrir(args, _abrir_banco)
+        return banco.vista(selecoes, _periodo(args, banco.intervalo_datas()), args.busca)
+
+    import numpy as np
+
+    from credito.busca import IndiceTexto
+    from credito.filtros import IndiceFiltros
+    from credito.vista import VistaPandas
+
+    _, df = _abrir(args, _ler_base)
+    indice = IndiceFiltros(df)
+    linhas = indice.filtrar(selecoes, _periodo(args, indice.intervalo_datas()))
+    linhas_busca = IndiceTexto(df).buscar(args.busca) if args.busca.strip() else None
+    if linhas_busca is not None:
+        linhas = np.intersect1d(linhas, linhas_busca, assume_unique=True)
+    return VistaPandas(df, linhas)
+
+
+def kpis(args):
+    resultado = _vista(args).kpis()
+    valores = {
+        'total': resultado.total,
+        'empresas': resultado.empresas,
+        'emissoes': resultado.emissoes,
+        'rating_medio': None if resultado.com_rating == 0 else round(resultado.rating_medio, 2),
+        'pct_negativos': round(resultado.pct_negativos, 2),
+    }
+    if args.json:
+        print(json.dumps(valores, ensure_ascii=False))
+    else:
+        rating_medio = 'N/A' if valores['rating_medio'] is None else f"{valores['rating_medio']:.1f}"
+        print(f"Total de análises: {valores['total']}")
+        print(f"Empresas:          {valores['empresas']}")
+        print(f"Emissões:          {valores['emissoes']}")
+        print(f"Rating médio:      {rating_medio}")
+        print(f"% negativos:       {valores['pct_negativos']:.1f}%")
+    return 0
+
+
+def exportar(args):
+    from credito.exportacao import FORMATOS, exportar_arquivo, formato_do_caminho
+
+    formato = args.formato or formato_do_caminho(args.destino)
+    if formato is None:
+        sys.exit(f"Formato de {args.destino} não reconhecido: use --formato ({', '.join(FORMATOS)})")
+    vista = _vista(args)
+    inicio = time.perf_counter()
+    exportar_arquivo(vista, formato, args.destino, com_conclusao=args.conclusoes)
+    print(f"{args.destino}: {vista.n_linhas} análises em {time.perf_counter() - inicio:.1f}s")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m credito', description=__doc__.splitlines()[0])
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    p_saude = comandos.add_parser('saude', help="Confere a origem dos dados e o sidecar (sem importar o pandas)")
+    p_saude.add_argument('--exigir-cache', action='store_true', help="Sai com código 1 se o sidecar não estiver em dia")
+    p_saude.set_defaults(funcao=saude)
+
+    p_preparar = comandos.add_parser('preparar', help="Lê a base e grava os caches em disco (sidecar e banco SQLite)")
+    p_preparar.set_defaults(funcao=preparar)
+
+    p_kpis = comandos.add_parser('kpis', help="Imprime os KPIs de um conjunto de filtros")
+    p_kpis.add_argument('--json', action='store_true', help="Saída em JSON")
+    p_kpis.set_defaults(funcao=kpis)
+
+    p_exportar = comandos.add_parser('exportar', help="Grava as análises filtradas em CSV, XLSX ou Parquet")
+    p_exportar.add_argument('destino', help="Arquivo de saída (o formato vem da extensão: .csv, .xlsx ou .parquet)")
+    p_exportar.add_argument('--formato', choices=['csv', 'xlsx', 'parquet'], help="Formato, se a extensão não indicar")
+    p_exportar.add_argument('--conclusoes', action='store_true', help="Inclui o texto completo das conclusões")
+    p_exportar.set_defaults(funcao=exportar)
+
+    for subparser in (p_kpis, p_exportar):
+        subparser.add_argument('--tipo', help="Tipo de análise (ex.: Empresa, Emissão)")
+        subparser.add_argument('--opiniao', help="Opinião agregada (ex.: Positivo, Negativo)")
+        subparser.add_argument('--faixa', help="Faixa de rating (ex.: 'Alto (≥80)')")
+        subparser.add_argument('--inicio', help="Data inicial (AAAA-MM-DD)")
+        subparser.add_argument('--fim', help="Data final (AAAA-MM-DD)")
+        subparser.add_argument('--busca', default='', help="Busca de texto em opiniões e conclusões")
+
+    for subparser in (p_saude, p_preparar, p_kpis, p_exportar):
+        subparser.add_argument('origem', nargs='?', help="Planilha, pasta ou padrão glob (padrão: a origem do painel)")
+
+    args = parser.parse_args(argv)
+    return args.funcao(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
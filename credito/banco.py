@@ -0,0 +1,425 @@
+"""Backend opcional em SQLite: filtros, KPIs e páginas viram consultas.
+
+Com ``DASHBOARD_BACKEND=sqlite`` a base tratada por ``carregar_dados`` é
+gravada uma vez num arquivo SQLite (por padrão ``<planilha>.sqlite``), com
+índices nas colunas filtradas. Os filtros da sidebar e a busca de texto
+viram a cláusula WHERE; KPIs, agregados dos gráficos, ranking e as páginas
+da tabela e das conclusões são consultas sobre ela. O processo do Streamlit
+guarda só os resultados, nunca a base inteira.
+
+``VistaSQLite`` responde às mesmas consultas que ``credito.vista.VistaPandas``
+(o backend padrão, em memória).
+"""
+import json
+import os
+import pathlib
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from credito.busca import termos_consulta, texto_busca
+from credito.conclusoes import COLUNAS_BUSCA_CONCLUSOES
+from credito.cubo import CHAVES_CUBO, ORDEM_DIMENSOES, VAZIO
+from credito.filtros import COLUNAS_INDEXADAS
+from credito.kpis import KPIs
+from credito.linha_tempo import ordenar_rebaixamentos
+from credito.ranking import COLUNAS_RANKING
+from credito.tabela import COLUNAS_TABELA, TAMANHO_PAGINA_PADRAO, formatar_pagina, total_paginas
+
+BACKENDS = ('pandas', 'sqlite')
+
+# Backend de consulta: 'pandas' (padrão, base em memória) ou 'sqlite'
+BACKEND = os.environ.get('DASHBOARD_BACKEND', 'pandas').strip().lower()
+if BACKEND not in BACKENDS:
+    raise ValueError(f"DASHBOARD_BACKEND deve ser um de {BACKENDS}, não '{BACKEND}'")
+
+# Caminho do banco (padrão: ao lado da planilha, ou dashboard.sqlite na pasta)
+ARQUIVO_SQLITE = os.environ.get('DASHBOARD_ARQUIVO_SQLITE', '')
+
+# Incrementar sempre que o esquema ou o tratamento mudar, para reconstruir bancos antigos
+VERSAO_BANCO = 1
+
+TABELA = 'analises'
+COLUNAS_BANCO = [
+    'Empresa', 'Tipo', 'Data', 'Rating', 'Rating_Escala', 'Faixa_Rating',
+    'Opiniao', 'Opiniao_Agregada', 'Conclusao', 'Resumo', 'Mes_Ano',
+]
+COLUNAS_INDICES_BANCO = ['Tipo', 'Opiniao_Agregada', 'Faixa_Rating', 'Data', 'Empresa']
+
+# Linhas gravadas por transação ao montar o banco
+LOTE_GRAVACAO = 50_000
+
+# Datas em texto ISO: a ordem do texto é a ordem cronológica
+_FORMATO_DATA = '%Y-%m-%d %H:%M:%S'
+
+
+def caminho_banco(origem):
+    """Arquivo SQLite de uma planilha (``<planilha>.sqlite``) ou de uma pasta/padrão glob"""
+    if ARQUIVO_SQLITE:
+        return ARQUIVO_SQLITE
+    if os.path.isfile(origem):
+        return os.fspath(origem) + '.sqlite'
+    return os.path.join(origem if os.path.isdir(origem) else '.', 'dashboard.sqlite')
+
+
+def _coluna(coluna):
+    """Valida um nome de coluna antes de usá-lo no SQL"""
+    if coluna not in COLUNAS_BANCO:
+        raise KeyError(coluna)
+    return coluna
+
+
+def _escapar_like(texto):
+    return texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _contem(valor, texto):
+    """Função SQL ``contem``: texto contido, sem diferenciar maiúsculas (como o filtro pandas)"""
+    return valor is not None and texto.lower() in str(valor).lower()
+
+
+def _lote_banco(df):
+    """Linhas de ``df`` como tuplas prontas para o INSERT (vazios viram NULL)"""
+    colunas = []
+    for coluna in COLUNAS_BANCO:
+        if coluna not in df.columns:
+            colunas.append([None] * len(df))
+            continue
+        serie = df[coluna]
+        if coluna == 'Data':
+            serie = serie.dt.strftime(_FORMATO_DATA)
+        colunas.append(serie.astype(object).where(df[coluna].notna(), None).tolist())
+    colunas.append(texto_busca(df).tolist())
+    return list(zip(*colunas))
+
+
+def criar_banco(caminho, df, chave):
+    """Grava ``df`` (já tratado) em ``caminho``, com índices e a chave da origem.
+
+    O banco é montado num arquivo temporário e trocado de uma vez, para que
+    nenhuma sessão leia um banco pela metade.
+    """
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    if os.path.exists(temporario):
+        os.remove(temporario)
+    colunas = COLUNAS_BANCO + ['Texto_Busca']
+    definicoes = ', '.join(f"{c} {'REAL' if c == 'Rating' else 'TEXT'}" for c in colunas)
+    with closing(sqlite3.connect(temporario)) as con:
+        con.execute(f'CREATE TABLE {TABELA} ({definicoes})')
+        inserir = f"INSERT INTO {TABELA} VALUES ({', '.join('?' * len(colunas))})"
+        for inicio in range(0, len(df), LOTE_GRAVACAO):
+            con.executemany(inserir, _lote_banco(df.iloc[inicio:inicio + LOTE_GRAVACAO]))
+            con.commit()
+        for coluna in COLUNAS_INDICES_BANCO:
+            con.execute(f'CREATE INDEX idx_{coluna} ON {TABELA} ({coluna})')
+        con.execute('CREATE TABLE meta (chave TEXT)')
+        con.execute('INSERT INTO meta VALUES (?)', (chave,))
+        con.commit()
+    os.replace(temporario, caminho)
+
+
+def _uri_leitura(caminho):
+    return pathlib.Path(caminho).absolute().as_uri() + '?mode=ro'
+
+
+def chave_banco(caminho):
+    """Chave da origem gravada no banco, ou None se ele não existir/estiver ilegível"""
+    if not os.path.exists(caminho):
+        return None
+    try:
+        with closing(sqlite3.connect(_uri_leitura(caminho), uri=True)) as con:
+            return con.execute('SELECT chave FROM meta').fetchone()[0]
+    except (sqlite3.Error, TypeError):
+        return None
+
+
+class BancoSQLite:
+    """Base tratada num arquivo SQLite, consultada sob demanda (somente leitura)"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._uri = _uri_leitura(caminho)
+
+        # Só os metadados dos filtros ficam em memória: opções (na ordem em que
+        # aparecem na base) e intervalo de datas
+        self.valores = {
+            coluna: [valor for (valor,) in self._consultar(
+                f'SELECT {coluna} FROM {TABELA} WHERE {coluna} IS NOT NULL GROUP BY {coluna} ORDER BY MIN(rowid)'
+            )]
+            for coluna in COLUNAS_INDEXADAS
+        }
+        (self.n_linhas, minimo, maximo), = self._consultar(f'SELECT COUNT(*), MIN(Data), MAX(Data) FROM {TABELA}')
+        self._intervalo = None if minimo is None else (
+            np.datetime64(pd.Timestamp(minimo), 'ns'), np.datetime64(pd.Timestamp(maximo), 'ns')
+        )
+
+    @classmethod
+    def abrir(cls, caminho, chave, ler_base):
+        """Banco de ``caminho``, regravado com ``ler_base()`` se a origem mudou.
+
+        ``chave`` identifica a versão da origem (ex.: tamanho e mtime da
+        planilha); a base lida para gravar o banco é descartada em seguida.
+        """
+        chave = json.dumps([VERSAO_BANCO, chave], default=str)
+        if chave_banco(caminho) != chave:
+            criar_banco(caminho, ler_base(), chave)
+        return cls(caminho)
+
+    def _conectar(self):
+        con = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+        con.create_function('contem', 2, _contem, deterministic=True)
+        return con
+
+    def _consultar(self, sql, parametros=()):
+        with closing(self._conectar()) as con:
+            return con.execute(sql, parametros).fetchall()
+
+    def _ler_df(self, sql, parametros=()):
+        with closing(self._conectar()) as con:
+            return _tipar_colunas(pd.read_sql_query(sql, con, params=parametros))
+
+    def _ler_lotes(self, sql, parametros, tamanho_lote):
+        """DataFrames do resultado, ``tamanho_lote`` linhas por vez (cursor, sem ler tudo)"""
+        with closing(self._conectar()) as con:
+            for lote in pd.read_sql_query(sql, con, params=parametros, chunksize=tamanho_lote):
+                yield _tipar_colunas(lote)
+
+    def linha_tempo(self, tipo=None):
+        """Linha do tempo de rating por empresa (só as análises de ``tipo``, se dado), consultada no banco"""
+        return LinhaTempoSQLite(self, tipo)
+
+    # Mesma interface do IndiceFiltros usada pela sidebar
+    @property
+    def tem_datas(self):
+        return self._intervalo is not None
+
+    def intervalo_datas(self):
+        """Menor e maior data (datetime64) ou None se não houver datas"""
+        return self._intervalo
+
+    def filtro(self, selecoes=None, periodo=None, busca=''):
+        """Cláusula WHERE (sql, parâmetros) dos filtros e da busca de texto.
+
+        Mesma semântica do ``IndiceFiltros``/``IndiceTexto``: período em dias
+        inclusivos e cada termo da busca casando com o início de uma palavra.
+        """
+        condicoes, parametros = [], []
+        for coluna, valor in (selecoes or {}).items():
+            if valor is not None:
+                condicoes.append(f'{_coluna(coluna)} = ?')
+                parametros.append(valor)
+        if periodo is not None:
+            inicio, fim = (pd.Timestamp(d).normalize() for d in periodo)
+            condicoes.append('Data >= ? AND Data < ?')
+            parametros += [inicio.strftime(_FORMATO_DATA), (fim + pd.Timedelta(days=1)).strftime(_FORMATO_DATA)]
+        for termo in termos_consulta(busca):
+            condicoes.append("Texto_Busca LIKE ? ESCAPE '\\'")
+            parametros.append(f'% {_escapar_like(termo)}%')
+        return ' AND '.join(condicoes) or '1', tuple(parametros)
+
+    def vista(self, selecoes=None, periodo=None, busca=''):
+        return VistaSQLite(self, *self.filtro(selecoes, periodo, busca))
+
+
+def _tipar_colunas(df):
+    """Data e rating lidos do banco como texto/número voltam aos tipos da base"""
+    if 'Data' in df.columns:
+        df['Data'] = pd.to_datetime(df['Data'])
+    if 'Rating' in df.columns:
+        df['Rating'] = pd.to_numeric(df['Rating'], errors='coerce').astype(float)
+    return df
+
+
+def _ordem_categorias(coluna):
+    """Expressão de ordenação que segue as categorias fixas (como o sort do pandas)"""
+    if coluna not in ORDEM_DIMENSOES:
+        return coluna, ()
+    categorias = ORDEM_DIMENSOES[coluna]
+    casos = ' '.join('WHEN ? THEN ?' for _ in categorias)
+    parametros = tuple(v for i, categoria in enumerate(categorias) for v in (categoria, i))
+    return f'CASE {coluna} {casos} ELSE {len(categorias)} END', parametros
+
+
+class VistaSQLite:
+    """Recorte filtrado de um ``BancoSQLite`` (cada consulta leva o WHERE)"""
+
+    def __init__(self, banco, where, parametros):
+        self.banco = banco
+        self.where = where
+        self.parametros = parametros
+        (self.n_linhas,), = banco._consultar(f'SELECT COUNT(*) FROM {TABELA} WHERE {where}', parametros)
+
+    def kpis(self):
+        (total, empresas, emissoes, negativos, com_rating, soma_rating), = self.banco._consultar(
+            f'''SELECT COUNT(*), TOTAL(Tipo = ?), TOTAL(Tipo = ?), TOTAL(Opiniao_Agregada = ?),
+                       COUNT(Rating), TOTAL(Rating)
+                FROM {TABELA} WHERE {self.where}''',
+            ('Empresa', 'Emissão', 'Negativo') + self.parametros
+        )
+        return KPIs(
+            total=int(total),
+            empresas=int(empresas),
+            emissoes=int(emissoes),
+            negativos=int(negativos),
+            com_rating=int(com_rating),
+            soma_rating=float(soma_rating),
+        )
+
+    def celulas(self):
+        """Células do cubo mensal (mesmo formato de ``credito.cubo.agregar``)"""
+        chaves = ', '.join(f'COALESCE({c}, ?) AS {c}' for c in CHAVES_CUBO)
+        return self.banco._ler_df(
+            f'''SELECT {chaves}, COUNT(*) AS n, COUNT(Rating) AS n_rating, TOTAL(Rating) AS soma_rating
+                FROM {TABELA} WHERE {self.where}
+                GROUP BY 1, 2, 3, 4 ORDER BY 1, 2, 3, 4''',
+            (VAZIO,) * len(CHAVES_CUBO) + self.parametros
+        )
+
+    def n_com_rating(self):
+        (n,), = self.banco._consultar(f'SELECT COUNT(Rating) FROM {TABELA} WHERE {self.where}', self.parametros)
+        return n
+
+    def ranking(self, n=None, maiores=True, agregacao=None):
+        """Dados do gráfico "Rating por Empresa" (ver ``credito.ranking.preparar_ranking``)"""
+        colunas = ', '.join(COLUNAS_RANKING)
+        if agregacao is None:
+            base = f'SELECT rowid AS pos, {colunas} FROM {TABELA} WHERE ({self.where}) AND Rating IS NOT NULL'
+            desempate = 'pos'
+        else:
+            # Última análise de cada empresa (data mais recente; empate fica com a última linha)
+            rating = 'Rating_Medio' if agregacao == 'media' else 'Rating'
+            outras = ', '.join(c for c in COLUNAS_RANKING if c not in ('Empresa', 'Rating'))
+            base = f'''SELECT pos, Empresa, {rating} AS Rating, {outras} FROM (
+                    SELECT rowid AS pos, {colunas},
+                           AVG(Rating) OVER (PARTITION BY Empresa) AS Rating_Medio,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY Empresa ORDER BY Data IS NULL, Data DESC, rowid DESC
+                           ) AS ordem
+                    FROM {TABELA}
+                    WHERE ({self.where}) AND Rating IS NOT NULL AND Empresa IS NOT NULL
+                ) WHERE ordem = 1'''
+            # Empresas empatadas seguem a data da última análise, como no pandas
+            desempate = 'Data IS NOT NULL, Data, pos'
+        parametros = self.parametros
+        if n is not None:
+            base = f"SELECT * FROM ({base}) ORDER BY Rating {'DESC' if maiores else 'ASC'}, {desempate} LIMIT ?"
+            parametros += (n,)
+        return self.banco._ler_df(f'SELECT {colunas} FROM ({base}) ORDER BY Rating, {desempate}', parametros)
+
+    def pagina_tabela(self, pagina=1, tamanho_pagina=TAMANHO_PAGINA_PADRAO, ordenar_por=None, crescente=True):
+        """DataFrame formatado da página pedida, ordenada no banco (vazios no fim)"""
+        pagina = min(max(1, pagina), total_paginas(self.n_linhas, tamanho_pagina))
+        ordem, parametros_ordem = 'rowid', ()
+        if ordenar_por is not None:
+            expressao, parametros_ordem = _ordem_categorias(_coluna(ordenar_por))
+            ordem = f"{ordenar_por} IS NULL, {expressao} {'ASC' if crescente else 'DESC'}, rowid"
+        df_pagina = self.banco._ler_df(
+            f'''SELECT {', '.join(COLUNAS_TABELA)} FROM {TABELA} WHERE {self.where}
+                ORDER BY {ordem} LIMIT ? OFFSET ?''',
+            self.parametros + parametros_ordem + (tamanho_pagina, (pagina - 1) * tamanho_pagina)
+        )
+        return formatar_pagina(df_pagina)
+
+    def lotes(self, colunas, tamanho_lote):
+        """Linhas do recorte (só ``colunas``), ``tamanho_lote`` por vez, na ordem da planilha"""
+        selecao = ', '.join(_coluna(c) for c in colunas if c in COLUNAS_BANCO)
+        return self.banco._ler_lotes(
+            f'SELECT {selecao} FROM {TABELA} WHERE {self.where} ORDER BY rowid', self.parametros, tamanho_lote
+        )
+
+    def _where_conclusoes(self, texto):
+        where = f'({self.where}) AND Conclusao IS NOT NULL'
+        parametros = self.parametros
+        texto = (texto or '').strip()
+        if texto:
+            where += ' AND (' + ' OR '.join(f'contem({c}, ?)' for c in COLUNAS_BUSCA_CONCLUSOES) + ')'
+            parametros += (texto,) * len(COLUNAS_BUSCA_CONCLUSOES)
+        return where, parametros
+
+    def contar_conclusoes(self, texto):
+        where, parametros = self._where_conclusoes(texto)
+        (total,), = self.banco._consultar(f'SELECT COUNT(*) FROM {TABELA} WHERE {where}', parametros)
+        return total
+
+    def pagina_conclusoes(self, texto, inicio, quantidade):
+        """(posições, linhas) da página de conclusões"""
+        where, parametros = self._where_conclusoes(texto)
+        df_pagina = self.banco._ler_df(
+            f'SELECT rowid - 1 AS pos, * FROM {TABELA} WHERE {where} ORDER BY rowid LIMIT ? OFFSET ?',
+            parametros + (quantidade, inicio)
+        )
+        return df_pagina['pos'].to_numpy(), df_pagina
+
+
+class LinhaTempoSQLite:
+    """Linha do tempo por empresa no banco: as consultas de ``credito.linha_tempo.LinhaTempoEmpresas`` em SQL
+
+    Cada consulta devolve uma linha por empresa; o histórico não é lido para
+    a memória do processo. Mesma semântica da versão em memória: vale a
+    última análise de cada empresa até o dia pedido (no mesmo dia, a última
+    linha da planilha) e o rating da última análise com nota.
+    """
+
+    def __init__(self, banco, tipo=None):
+        self.banco = banco
+        self._where = 'Empresa IS NOT NULL AND Data IS NOT NULL' + ('' if tipo is None else ' AND Tipo = ?')
+        self._parametros = () if tipo is None else (tipo,)
+        (minimo, maximo), = banco._consultar(
+            f'SELECT MIN(Data), MAX(Data) FROM {TABELA} WHERE {self._where}', self._parametros
+        )
+        self._intervalo = None if minimo is None else (
+            np.datetime64(pd.Timestamp(minimo), 'ns'), np.datetime64(pd.Timestamp(maximo), 'ns')
+        )
+
+    def intervalo_datas(self):
+        """Menor e maior data (datetime64) ou None se não houver análises"""
+        return self._intervalo
+
+    def _ultimas(self, data, com_rating=False):
+        """Última análise (ou a última com rating) de cada empresa até ``data``, em ordem alfabética"""
+        fim = (pd.Timestamp(data).normalize() + pd.Timedelta(days=1)).strftime(_FORMATO_DATA)
+        return self.banco._ler_df(
+            f'''SELECT Empresa, Data, Rating, Rating_Escala, Opiniao_Agregada FROM (
+                SELECT Empresa, Data, Rating, Rating_Escala, Opiniao_Agregada,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY Empresa ORDER BY substr(Data, 1, 10) DESC, rowid DESC
+                       ) AS ordem
+                FROM {TABELA}
+                WHERE {self._where} AND Data < ?{' AND Rating IS NOT NULL' if com_rating else ''}
+            ) WHERE ordem = 1 ORDER BY Empresa''',
+            self._parametros + (fim,)
+        )
+
+    # As duas consultas por empresa são unidas no pandas: uma linha por
+    # empresa cada, e o JOIN de duas subconsultas com janela no SQLite vira
+    # um laço aninhado sobre o histórico
+    def na_data(self, data):
+        """Última análise de cada empresa até ``data``, com o rating vigente (ordem alfabética)"""
+        ultimas = self._ultimas(data)[['Empresa', 'Data', 'Opiniao_Agregada']]
+        ratings = self._ultimas(data, com_rating=True)[['Empresa', 'Rating', 'Rating_Escala', 'Data']]
+        return ultimas.merge(ratings.rename(columns={'Data': 'Data_Rating'}), on='Empresa', how='left')
+
+    def variacoes(self, inicio, fim):
+        """Rating vigente de cada empresa em ``inicio`` e em ``fim`` e a variação (empresas com os dois)"""
+        ratings_inicio = self._ultimas(inicio, com_rating=True)
+        ratings_fim = self._ultimas(fim, com_rating=True)
+        df = ratings_inicio[['Empresa', 'Rating', 'Rating_Escala']].merge(
+            ratings_fim[['Empresa', 'Rating', 'Rating_Escala', 'Data']], on='Empresa', suffixes=('_Inicio', '_Fim')
+        )
+        return pd.DataFrame({
+            'Empresa': df['Empresa'],
+            'Rating_Inicio': df['Rating_Inicio'],
+            'Rating_Fim': df['Rating_Fim'],
+            'Variacao': df['Rating_Fim'] - df['Rating_Inicio'],
+            'Escala_Inicio': df['Rating_Escala_Inicio'],
+            'Escala_Fim': df['Rating_Escala_Fim'],
+            'Data_Rating_Fim': df['Data'],
+        })
+
+    def rebaixamentos(self, desde, ate=None):
+        """Empresas cujo rating vigente caiu entre ``desde`` e ``ate`` (padrão: a última data), maiores quedas primeiro"""
+        if ate is None:
+            ate = desde if self._intervalo is None else self._intervalo[1]
+        return ordenar_rebaixamentos(self.variacoes(desde, ate))
@@ -0,0 +1,124 @@
+"""Índice invertido de texto sobre ``Opiniao`` e ``Conclusao``.
+
+Os textos são normalizados sem acentos e em minúsculas ("atenção" casa com
+"atencao"). Cada termo da consulta casa com as palavras que começam por ele
+("covenant" encontra "covenants"), e todos os termos precisam aparecer na
+linha.
+"""
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_TEXTO = ['Opiniao', 'Conclusao']
+
+TAMANHO_MINIMO_TERMO = 2
+
+_PALAVRA = re.compile(r'\w+')
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos"""
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def termos_consulta(consulta):
+    """Termos normalizados da consulta (ignora os muito curtos)"""
+    return [t for t in _PALAVRA.findall(normalizar(consulta or '')) if len(t) >= TAMANHO_MINIMO_TERMO]
+
+
+_SEPARADOR = r'[^\p{L}\p{N}_]+'
+
+
+def _textos_normalizados(df, colunas):
+    """Texto de cada linha (colunas concatenadas), normalizado com kernels do Arrow"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    textos = pd.Series('', index=range(len(df)), dtype='string')
+    for coluna in colunas:
+        if coluna in df.columns:
+            textos = textos + ' ' + df[coluna].astype('string').fillna('').reset_index(drop=True)
+    arr = pa.array(textos.to_numpy(dtype=object), type=pa.large_string())
+    return pc.utf8_lower(pc.replace_substring_regex(pc.utf8_normalize(arr, 'NFKD'), r'\p{Mn}', ''))
+
+
+def texto_busca(df, colunas=COLUNAS_TEXTO):
+    """Texto normalizado de cada linha, palavras entre espaços (' palavra palavra ').
+
+    Serve para buscas por prefixo fora do índice (ex.: ``LIKE '% termo%'``).
+    """
+    import pyarrow.compute as pc
+
+    juntas = pc.utf8_trim_whitespace(pc.replace_substring_regex(_textos_normalizados(df, colunas), _SEPARADOR, ' '))
+    return (' ' + pd.Series(juntas.to_numpy(zero_copy_only=False), dtype=object) + ' ').to_numpy()
+
+
+class IndiceTexto:
+    """Termo -> posições das linhas em que ele aparece"""
+
+    def __init__(self, df, colunas=COLUNAS_TEXTO):
+        import pyarrow.compute as pc
+
+        listas = pc.split_pattern_regex(_textos_normalizados(df, colunas), _SEPARADOR)
+        palavras = pc.list_flatten(listas)
+        posicoes = pc.list_parent_indices(listas)
+        validas = pc.greater_equal(pc.utf8_length(palavras), TAMANHO_MINIMO_TERMO)
+        codificadas = pc.dictionary_encode(pc.filter(palavras, validas))
+        vocabulario = codificadas.dictionary.to_pylist()
+        codigos = codificadas.indices.to_numpy(zero_copy_only=False)
+        posicoes = pc.filter(posicoes, validas).to_numpy(zero_copy_only=False)
+
+        # Agrupa por termo (ordenação estável mantém as linhas em ordem) e tira repetições
+        ordem = np.argsort(codigos, kind='stable')
+        codigos, posicoes = codigos[ordem], posicoes[ordem]
+        nova = np.ones(len(codigos), dtype=bool)
+        nova[1:] = (codigos[1:] != codigos[:-1]) | (posicoes[1:] != posicoes[:-1])
+        codigos, posicoes = codigos[nova], posicoes[nova].astype(np.int64)
+        cortes = np.flatnonzero(np.diff(codigos)) + 1
+        inicios = np.concatenate([[0], cortes]) if len(codigos) else np.array([], dtype=np.int64)
+        self.postings = {
+            vocabulario[codigo]: lista
+            for codigo, lista in zip(codigos[inicios], np.split(posicoes, cortes))
+        }
+        self.termos = sorted(self.postings)
+
+    def _posicoes_prefixo(self, prefixo):
+        inicio = bisect.bisect_left(self.termos, prefixo)
+        fim = bisect.bisect_left(self.termos, prefixo + '\uffff')
+        listas = [self.postings[termo] for termo in self.termos[inicio:fim]]
+        if not listas:
+            return np.array([], dtype=np.int64)
+        return np.unique(np.concatenate(listas))
+
+    def buscar(self, consulta):
+        """Posições (em ordem crescente) das linhas que contêm todos os termos.
+
+        Retorna None para uma consulta sem termos (nenhum filtro).
+        """
+        termos = termos_consulta(consulta)
+        if not termos:
+            return None
+        resultado = None
+        for termo in termos:
+            posicoes = self._posicoes_prefixo(termo)
+            resultado = posicoes if resultado is None else np.intersect1d(resultado, posicoes, assume_unique=True)
+            if len(resultado) == 0:
+                break
+        return resultado
+
+
+def destacar(texto, consulta, marcador=':orange-background[{}]'):
+    """Marca no texto (markdown do Streamlit) as palavras que casam com a consulta"""
+    termos = termos_consulta(consulta)
+    if not termos or not isinstance(texto, str):
+        return texto
+
+    def substituir(m):
+        palavra = m.group(0)
+        return marcador.format(palavra) if normalizar(palavra).startswith(tuple(termos)) else palavra
+
+    return _PALAVRA.sub(substituir, texto)
@@ -0,0 +1,55 @@
+"""Cache das figuras dos gráficos.
+
+Montar uma figura com ``plotly.express`` custa bem mais que agregar os dados
+dela. As figuras prontas ficam guardadas por (versão dos dados, gráfico,
+filtros normalizados) e são reaproveitadas enquanto nada disso mudar; as
+menos usadas são descartadas quando o número de entradas passa do limite.
+"""
+import threading
+from collections import OrderedDict
+
+from credito.busca import termos_consulta
+
+
+def chave_filtros(selecoes, periodo=None, busca=''):
+    """Estado dos filtros numa tupla estável (ordem das seleções e grafia da busca não importam)"""
+    return (
+        tuple(sorted((coluna, valor) for coluna, valor in (selecoes or {}).items() if valor is not None)),
+        tuple(periodo) if periodo is not None else None,
+        tuple(sorted(set(termos_consulta(busca)))),
+    )
+
+
+class CacheFiguras:
+    """Cache LRU de figuras (ou de qualquer objeto montado a partir de uma chave)"""
+
+    def __init__(self, max_entradas=64):
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave, construir):
+        """Figura guardada para ``chave``; na falta, monta com ``construir()`` e guarda.
+
+        A figura devolvida é compartilhada: quem a usa não deve alterá-la.
+        """
+        with self._lock:
+            if chave in self._entradas:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return self._entradas[chave]
+        figura = construir()
+        with self._lock:
+            self.falhas += 1
+            self._entradas[chave] = figura
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return figura
+
+    def estatisticas(self):
+        """(número de entradas, acertos, falhas) desde o início do processo"""
+        with self._lock:
+            return len(self._entradas), self.acertos, self.falhas
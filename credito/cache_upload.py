@@ -0,0 +1,74 @@
+"""Cache das planilhas enviadas por upload.
+
+As entradas são identificadas pelo hash do conteúdo do arquivo (reenviar o
+mesmo arquivo não custa nada), expiram após um TTL e são descartadas por LRU
+quando o total em memória passa do orçamento.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def hash_conteudo(conteudo):
+    """SHA-256 dos bytes enviados"""
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def tamanho_df(df):
+    """Memória ocupada pelo DataFrame (bytes, incluindo textos)"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+class CacheUploads:
+    """Cache LRU com orçamento de memória e TTL, seguro entre sessões"""
+
+    def __init__(self, limite_bytes, ttl_segundos, relogio=time.monotonic):
+        self.limite_bytes = limite_bytes
+        self.ttl_segundos = ttl_segundos
+        self._relogio = relogio
+        self._entradas = OrderedDict()  # chave -> (df, bytes, criado_em)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _remover(self, chave):
+        _, tamanho, _ = self._entradas.pop(chave)
+        self._bytes -= tamanho
+
+    def _expirar(self):
+        agora = self._relogio()
+        for chave in [c for c, (_, _, criado) in self._entradas.items() if agora - criado > self.ttl_segundos]:
+            self._remover(chave)
+
+    def obter(self, chave):
+        """DataFrame guardado para ``chave``, ou None"""
+        with self._lock:
+            self._expirar()
+            if chave not in self._entradas:
+                return None
+            self._entradas.move_to_end(chave)
+            return self._entradas[chave][0]
+
+    def guardar(self, chave, df):
+        """Guarda ``df``, descartando as entradas menos usadas se faltar espaço.
+
+        Um DataFrame maior que o orçamento inteiro não é guardado.
+        """
+        tamanho = tamanho_df(df)
+        with self._lock:
+            if chave in self._entradas:
+                self._remover(chave)
+            if tamanho > self.limite_bytes:
+                return False
+            self._expirar()
+            while self._entradas and self._bytes + tamanho > self.limite_bytes:
+                self._remover(next(iter(self._entradas)))
+            self._entradas[chave] = (df, tamanho, self._relogio())
+            self._bytes += tamanho
+            return True
+
+    def estatisticas(self):
+        """(número de entradas, bytes usados)"""
+        with self._lock:
+            self._expirar()
+            return len(self._entradas), self._bytes
@@ -0,0 +1,130 @@
+"""Localização e leitura da base, sem Streamlit nem Plotly.
+
+O ``app.py`` chama estas funções dentro dos seus caches; a linha de comando
+(``python -m credito``) as usa para pré-montar os caches e calcular KPIs.
+A origem dos dados é resolvida num só lugar (``candidatas_origem`` e
+``abrir_origem``), com a mesma preferência e o mesmo fallback para todos.
+O pandas e a leitura das planilhas só são importados quando uma base é de
+fato lida: localizar a origem e conferir os caches é leve.
+"""
+import functools
+import os
+
+# Possíveis nomes do arquivo no repositório
+ARQUIVOS_POSSIVEIS = [
+    'data/0 - Compilado Relatórios de Crédito.xlsx',
+    'data/0_-_Compilado_Relatórios_de_Crédito.xlsx',
+    'data/0-Compilado Relatórios de Crédito.xlsx',
+    'data/base_credito.xlsx',
+    '0 - Compilado Relatórios de Crédito.xlsx',
+    '0_-_Compilado_Relatórios_de_Crédito.xlsx'
+]
+
+# Pasta ou padrão glob com várias planilhas compiladas (ex.: uma por ano e mesa).
+# Quando definida, tem prioridade sobre ARQUIVOS_POSSIVEIS.
+PASTA_PLANILHAS = os.environ.get('DASHBOARD_PASTA_PLANILHAS')
+# Abas lidas em cada planilha, separadas por vírgula (padrão: 'Relatórios de Crédito')
+ABAS_PLANILHAS = tuple(
+    aba.strip() for aba in os.environ.get('DASHBOARD_ABAS', '').split(',') if aba.strip()
+)
+
+
+def planilhas_existentes(arquivos=ARQUIVOS_POSSIVEIS):
+    """Caminhos de ``arquivos`` que existem, na ordem de preferência"""
+    return [arquivo for arquivo in arquivos if os.path.exists(arquivo)]
+
+
+def ler_base(arquivo):
+    """Lê e trata a planilha, sem cache em memória (sidecar, streaming ou incremental)"""
+    from credito.sidecar import chave_origem, conferir_sidecar, gravar_sidecar, ler_sidecar, ler_sidecar_anterior
+    from credito.streaming import ler_planilha_streaming, usar_streaming
+
+    fresco, sha256 = conferir_sidecar(arquivo)
+    df = ler_sidecar(arquivo, fresco)
+    if df is not None:
+        return df
+
+    # Reaproveita o hash calculado na conferência (mtime mudou, conteúdo também)
+    chave = chave_origem(arquivo, sha256=sha256)
+    if usar_streaming(chave['tamanho']):
+        df = ler_planilha_streaming(arquivo)
+    else:
+        import pandas as pd
+
+        from credito.incremental import mesclar_incremental
+        from credito.tratamento import ABA_RELATORIOS
+
+        # Planilha alterada: é lida inteira, mas só as linhas novas/editadas
+        # passam pelas derivações (a base fica na ordem da planilha)
+        df, _ = mesclar_incremental(
+            ler_sidecar_anterior(arquivo),
+            pd.read_excel(arquivo, sheet_name=ABA_RELATORIOS)
+        )
+    gravar_sidecar(arquivo, df, chave)
+    return df
+
+
+def ler_pasta(assinaturas, abas=ABAS_PLANILHAS):
+    """Lê em paralelo as planilhas de ``assinaturas`` (ver ``assinaturas_planilhas``)"""
+    from credito.ingestao import carregar_planilhas
+
+    return carregar_planilhas([arquivo for arquivo, _, _ in assinaturas], abas=list(abas) or None)
+
+
+def ler_upload(arquivo, tamanho):
+    """Lê e trata uma planilha enviada por upload (em streaming se for muito grande)"""
+    import pandas as pd
+
+    from credito.streaming import ler_planilha_streaming, usar_streaming
+    from credito.tratamento import ABA_RELATORIOS, tratar_dados
+
+    if usar_streaming(tamanho):
+        return ler_planilha_streaming(arquivo)
+    return tratar_dados(pd.read_excel(arquivo, sheet_name=ABA_RELATORIOS))
+
+
+def candidatas_origem(origem=None):
+    """[(versão dos dados, função que lê a base)] das origens possíveis, na ordem de preferência.
+
+    Sem ``origem``, usa a do painel: ``PASTA_PLANILHAS`` ou as planilhas
+    existentes de ``ARQUIVOS_POSSIVEIS``. A versão (origem e assinaturas) é a
+    mesma no painel, no aquecimento e na linha de comando, então os caches e
+    o banco SQLite montados por um são reaproveitados pelos outros. Só lista
+    e assina os arquivos, sem ler as planilhas (nem importar o pandas).
+    """
+    from credito.ingestao import assinaturas_planilhas, listar_planilhas
+    from credito.sidecar import assinatura_arquivo
+
+    if origem is None and PASTA_PLANILHAS:
+        origem = PASTA_PLANILHAS
+    if origem is None or os.path.isfile(origem):
+        candidatas = []
+        for arquivo in ([origem] if origem is not None else planilhas_existentes()):
+            try:
+                candidatas.append(((arquivo, assinatura_arquivo(arquivo)), functools.partial(ler_base, arquivo)))
+            except OSError:
+                pass
+        return candidatas
+
+    assinaturas = assinaturas_planilhas(listar_planilhas(origem))
+    if not assinaturas:
+        return []
+    return [((origem, assinaturas), functools.partial(ler_pasta, assinaturas))]
+
+
+def abrir_origem(candidatas, abrir):
+    """(versão dos dados, ``abrir(versão, ler)``) da primeira de ``candidatas`` que abre sem erro.
+
+    ``abrir`` recebe a versão e a função que lê a base (ex.: um cache do
+    painel ou o banco SQLite). Retorna None se não houver candidatas; se
+    todas falharem, relança o erro da última.
+    """
+    erro = None
+    for versao_dados, ler in candidatas:
+        try:
+            return versao_dados, abrir(versao_dados, ler)
+        except Exception as e:
+            erro = e
+    if erro is not None:
+        raise erro
+    return None
@@ -0,0 +1,27 @@
+"""Seleção e paginação da lista "Conclusões Detalhadas"."""
+import numpy as np
+
+CONCLUSOES_POR_PAGINA = 20
+
+# Colunas em que o filtro de texto procura
+COLUNAS_BUSCA_CONCLUSOES = ['Empresa', 'Opiniao', 'Conclusao']
+
+
+def linhas_com_conclusao(df, linhas, texto=None):
+    """Posições (dentre ``linhas``) que têm conclusão e contêm ``texto``.
+
+    O texto é comparado sem diferenciar maiúsculas, em qualquer das colunas
+    de ``COLUNAS_BUSCA_CONCLUSOES``.
+    """
+    linhas = np.asarray(linhas)
+    linhas = linhas[df['Conclusao'].iloc[linhas].notna().to_numpy()]
+    texto = (texto or '').strip()
+    if not texto:
+        return linhas
+    casa = np.zeros(len(linhas), dtype=bool)
+    for coluna in COLUNAS_BUSCA_CONCLUSOES:
+        if coluna in df.columns:
+            casa |= df[coluna].iloc[linhas].astype('string').str.contains(
+                texto, case=False, regex=False, na=False
+            ).to_numpy(dtype=bool)
+    return linhas[casa]
@@ -0,0 +1,167 @@
+"""Cubo mensal pré-agregado: Mes_Ano x Tipo x Opiniao_Agregada x Faixa_Rating.
+
+Guarda contagens e somas de rating por célula, calculadas na carga. Os
+gráficos de distribuição e de evolução mensal leem daqui sempre que os
+filtros ativos podem ser respondidos pelo cubo (seleções nas dimensões e
+período formado por meses inteiros).
+"""
+import numpy as np
+import pandas as pd
+
+from credito.tratamento import FAIXAS_RATING, OPINIOES_AGREGADAS
+
+CHAVES_CUBO = ['Mes_Ano', 'Tipo', 'Opiniao_Agregada', 'Faixa_Rating']
+MEDIDAS_CUBO = ['n', 'n_rating', 'soma_rating']
+
+# Ordem de exibição (e de desempate) das dimensões com categorias fixas
+ORDEM_DIMENSOES = {
+    'Faixa_Rating': FAIXAS_RATING,
+    'Opiniao_Agregada': OPINIOES_AGREGADAS,
+}
+
+# Valor usado no cubo para chaves vazias (ex.: análises sem data)
+VAZIO = ''
+
+
+def _linhas_cubo(df):
+    """Chaves (texto, VAZIO no lugar de nulos) e rating de cada linha"""
+    linhas = pd.DataFrame({
+        coluna: df[coluna].astype(object).where(df[coluna].notna(), VAZIO).to_numpy()
+        for coluna in CHAVES_CUBO
+    })
+    linhas['Rating'] = df['Rating'].to_numpy(dtype=float, na_value=np.nan)
+    return linhas
+
+
+def _codificar(linhas, categorias=None):
+    """Códigos int32 das chaves de ``linhas`` e as categorias (estendidas) de cada chave"""
+    codigos, novas = {}, {}
+    for coluna in CHAVES_CUBO:
+        valores = linhas[coluna].to_numpy()
+        conhecidas = pd.Index([] if categorias is None else categorias[coluna], dtype=object)
+        faltantes = pd.unique(valores[conhecidas.get_indexer(valores) < 0])
+        novas[coluna] = conhecidas.append(pd.Index(faltantes, dtype=object))
+        codigos[coluna] = novas[coluna].get_indexer(valores).astype(np.int32)
+    return codigos, novas
+
+
+def agregar_linhas(linhas):
+    """Agrega linhas (de ``_linhas_cubo``) nas células do cubo"""
+    tem_rating = linhas['Rating'].notna()
+    return (
+        linhas[CHAVES_CUBO]
+        .assign(n=1, n_rating=tem_rating.astype(int), soma_rating=linhas['Rating'].where(tem_rating, 0.0))
+        .groupby(CHAVES_CUBO, sort=True)[MEDIDAS_CUBO]
+        .sum()
+    )
+
+
+def agregar(df, linhas=None):
+    """Células do cubo calculadas direto das linhas (``linhas`` = posições)"""
+    if linhas is not None:
+        df = df.iloc[linhas]
+    return agregar_linhas(_linhas_cubo(df)).reset_index()
+
+
+def meses_periodo(inicio, fim):
+    """Meses ('AAAA-MM') de ``inicio`` a ``fim``, inclusive"""
+    return list(pd.period_range(pd.Timestamp(inicio), pd.Timestamp(fim), freq='M').strftime('%Y-%m'))
+
+
+class CuboMensal:
+    """Cubo mensal de uma base tratada"""
+
+    def __init__(self, df):
+        # Por linha só códigos int32 das chaves e o rating; as células saem
+        # de ``_linhas_cubo`` e o texto das chaves fica em ``categorias``
+        linhas = _linhas_cubo(df)
+        self.codigos, self.categorias = _codificar(linhas)
+        self.rating = linhas['Rating'].to_numpy()
+        self.hashes = df['Hash_Linha'].to_numpy() if 'Hash_Linha' in df.columns else None
+        self.celulas = agregar_linhas(linhas)
+
+    def _linhas(self, posicoes):
+        """Linhas (como em ``_linhas_cubo``) das ``posicoes`` guardadas"""
+        linhas = pd.DataFrame({
+            coluna: self.categorias[coluna].to_numpy()[self.codigos[coluna][posicoes]]
+            for coluna in CHAVES_CUBO
+        })
+        linhas['Rating'] = self.rating[posicoes]
+        return linhas
+
+    def fatia(self, selecoes=None, meses=None):
+        """Células que atendem às seleções (coluna -> valor; None ignora).
+
+        ``meses`` restringe aos meses informados; células sem mês ficam de
+        fora sempre que ``meses`` é dado, como no filtro de período.
+        """
+        celulas = self.celulas.reset_index()
+        mascara = np.ones(len(celulas), dtype=bool)
+        for coluna, valor in (selecoes or {}).items():
+            if valor is not None:
+                mascara &= (celulas[coluna] == valor).to_numpy()
+        if meses is not None:
+            mascara &= celulas['Mes_Ano'].isin(meses).to_numpy()
+        return celulas[mascara]
+
+    def atualizado(self, df, limite=0.5):
+        """Cubo para uma nova versão de ``df``, ajustando só as linhas alteradas.
+
+        Compara os hashes por posição, como ``IndiceFiltros.atualizado``.
+        """
+        n_antigas = len(self.rating)
+        if self.hashes is None or 'Hash_Linha' not in df.columns or len(df) < n_antigas:
+            return CuboMensal(df)
+        hashes = df['Hash_Linha'].to_numpy()
+        alteradas = np.flatnonzero(hashes[:n_antigas] != self.hashes)
+        tocadas = np.concatenate([alteradas, np.arange(n_antigas, len(df))])
+        if len(tocadas) == 0:
+            return self
+        if len(tocadas) > limite * len(df):
+            return CuboMensal(df)
+
+        novas_linhas = _linhas_cubo(df.iloc[tocadas])
+        celulas = self.celulas.sub(agregar_linhas(self._linhas(alteradas)), fill_value=0)
+        celulas = celulas.add(agregar_linhas(novas_linhas), fill_value=0)
+        celulas = celulas[celulas['n'] > 0]
+
+        novo = CuboMensal.__new__(CuboMensal)
+        novos_codigos, novo.categorias = _codificar(novas_linhas, self.categorias)
+        novo.codigos = {}
+        for coluna in CHAVES_CUBO:
+            codigos = self.codigos[coluna].copy()
+            codigos[alteradas] = novos_codigos[coluna][:len(alteradas)]
+            novo.codigos[coluna] = np.concatenate([codigos, novos_codigos[coluna][len(alteradas):]])
+        rating = self.rating.copy()
+        rating[alteradas] = novas_linhas['Rating'].to_numpy()[:len(alteradas)]
+        novo.rating = np.concatenate([rating, novas_linhas['Rating'].to_numpy()[len(alteradas):]])
+        novo.hashes = hashes
+        novo.celulas = celulas.astype({'n': int, 'n_rating': int}).sort_index()
+        return novo
+
+
+# ============================================================
+# Consultas usadas pelos gráficos
+# ============================================================
+def contagem_por(celulas, coluna):
+    """Quantidade de análises por valor de ``coluna``, da maior para a menor"""
+    contagem = celulas.groupby(coluna, sort=True)['n'].sum()
+    if coluna in ORDEM_DIMENSOES:
+        ordem = [valor for valor in ORDEM_DIMENSOES[coluna] if valor in contagem.index]
+        contagem = contagem.reindex(ordem + [v for v in contagem.index if v not in ordem])
+    contagem = contagem[contagem > 0]
+    return contagem.sort_values(ascending=False, kind='stable')
+
+
+def evolucao_mensal(celulas):
+    """Volume e rating médio por mês (meses sem data ficam de fora)"""
+    mensal = celulas[celulas['Mes_Ano'] != VAZIO].groupby('Mes_Ano', sort=True)[MEDIDAS_CUBO].sum()
+    mensal['rating_medio'] = mensal['soma_rating'] / mensal['n_rating'].where(mensal['n_rating'] > 0)
+    return mensal.reset_index()
+
+
+def mix_opiniao_mensal(celulas):
+    """Participação (%) de cada opinião agregada por mês"""
+    com_mes = celulas[celulas['Mes_Ano'] != VAZIO]
+    mix = com_mes.pivot_table(index='Mes_Ano', columns='Opiniao_Agregada', values='n', aggfunc='sum', fill_value=0)
+    return mix.div(mix.sum(axis=1), axis=0).mul(100)
@@ -0,0 +1,162 @@
+"""Exportação do recorte filtrado para CSV, XLSX e Parquet, lote a lote.
+
+As linhas saem da vista em lotes (``vista.lotes``) e são gravadas em disco:
+durante a escrita, a memória extra é a de um lote, qualquer que seja o
+tamanho do recorte. O XLSX é escrito pelo modo write-only do openpyxl.
+
+O download pelo painel é outra história: o Streamlit entrega o arquivo a
+partir da memória, então o arquivo pronto inteiro é lido em ``bytes`` e
+fica no armazenamento de mídia da sessão enquanto o botão existir. Por isso
+o ``app.py`` limita o número de linhas do download; recortes maiores saem
+por ``python -m credito exportar``, que grava direto no arquivo de destino
+(``exportar_arquivo``) sem passar pela memória.
+"""
+import codecs
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from credito.tabela import COLUNAS_TABELA
+
+# Coluna na base -> título no arquivo exportado (as mesmas da tabela, e a conclusão opcional)
+COLUNAS_EXPORTACAO = dict(COLUNAS_TABELA)
+COLUNA_CONCLUSAO = {'Conclusao': 'Conclusão'}
+
+TAMANHO_LOTE_EXPORTACAO = 20_000
+
+# Formato -> (rótulo, extensão, tipo MIME)
+FORMATOS = {
+    'csv': ('CSV', 'csv', 'text/csv'),
+    'xlsx': ('Excel', 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'parquet': ('Parquet', 'parquet', 'application/vnd.apache.parquet'),
+}
+
+# Linhas de dados por aba no XLSX (limite do Excel, descontado o cabeçalho)
+LINHAS_POR_ABA_XLSX = 1_048_575
+ABA_EXPORTACAO = 'Análises'
+
+# CSV no padrão do Excel em português: ';' como separador, vírgula decimal e BOM para os acentos
+SEPARADOR_CSV = ';'
+DECIMAL_CSV = ','
+
+
+def colunas_exportacao(com_conclusao=False):
+    """Coluna na base -> título, na ordem do arquivo"""
+    return {**COLUNAS_EXPORTACAO, **(COLUNA_CONCLUSAO if com_conclusao else {})}
+
+
+def _tipar_lote(lote, colunas):
+    """Lote com tipos estáveis entre lotes: texto (None nos vazios), data e rating numéricos"""
+    lote = lote.reindex(columns=list(colunas))
+    for coluna in lote.columns:
+        if coluna == 'Data':
+            lote[coluna] = pd.to_datetime(lote[coluna])
+        elif coluna == 'Rating':
+            lote[coluna] = pd.to_numeric(lote[coluna], errors='coerce').astype(float)
+        else:
+            lote[coluna] = lote[coluna].astype(object).where(lote[coluna].notna(), None)
+    return lote.rename(columns=colunas)
+
+
+def _escrever_csv(lotes, arquivo, colunas):
+    arquivo.write(codecs.BOM_UTF8)
+    cabecalho = True
+    for lote in lotes:
+        lote.to_csv(arquivo, sep=SEPARADOR_CSV, decimal=DECIMAL_CSV, index=False, header=cabecalho,
+                    date_format='%Y-%m-%d', encoding='utf-8')
+        cabecalho = False
+    if cabecalho:
+        arquivo.write((SEPARADOR_CSV.join(colunas.values()) + '\n').encode('utf-8'))
+
+
+def _esquema_parquet(colunas):
+    import pyarrow as pa
+
+    tipos = {'Data': pa.timestamp('ns'), 'Rating': pa.float64()}
+    return pa.schema([(titulo, tipos.get(coluna, pa.string())) for coluna, titulo in colunas.items()])
+
+
+def _escrever_parquet(lotes, arquivo, colunas):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = _esquema_parquet(colunas)
+    with pq.ParquetWriter(arquivo, esquema) as escritor:
+        for lote in lotes:
+            escritor.write_table(pa.Table.from_pandas(lote, schema=esquema, preserve_index=False))
+
+
+def _valor_xlsx(valor, ilegais):
+    if isinstance(valor, str):
+        return ilegais.sub('', valor)
+    if valor is None or valor is pd.NaT or (isinstance(valor, float) and np.isnan(valor)):
+        return None
+    return valor
+
+
+def _escrever_xlsx(lotes, arquivo, colunas):
+    import openpyxl
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    wb = openpyxl.Workbook(write_only=True)
+    aba, linhas_na_aba = None, LINHAS_POR_ABA_XLSX
+    for lote in lotes:
+        for linha in lote.itertuples(index=False, name=None):
+            # Acima do limite do Excel, as linhas continuam numa nova aba
+            if linhas_na_aba == LINHAS_POR_ABA_XLSX:
+                aba = wb.create_sheet(ABA_EXPORTACAO if aba is None else f'{ABA_EXPORTACAO} ({len(wb.worksheets) + 1})')
+                aba.append(list(colunas.values()))
+                linhas_na_aba = 0
+            aba.append([_valor_xlsx(valor, ILLEGAL_CHARACTERS_RE) for valor in linha])
+            linhas_na_aba += 1
+    if aba is None:
+        wb.create_sheet(ABA_EXPORTACAO).append(list(colunas.values()))
+    wb.save(arquivo)
+
+
+_ESCRITORES = {'csv': _escrever_csv, 'xlsx': _escrever_xlsx, 'parquet': _escrever_parquet}
+
+
+def _escritor(formato):
+    if formato not in _ESCRITORES:
+        raise ValueError(f"Formato de exportação deve ser um de {tuple(FORMATOS)}, não '{formato}'")
+    return _ESCRITORES[formato]
+
+
+def _escrever(vista, escritor, arquivo, com_conclusao, tamanho_lote):
+    colunas = colunas_exportacao(com_conclusao)
+    lotes = (_tipar_lote(lote, colunas) for lote in vista.lotes(list(colunas), tamanho_lote))
+    escritor(lotes, arquivo, colunas)
+
+
+def exportar(vista, formato, com_conclusao=False, tamanho_lote=TAMANHO_LOTE_EXPORTACAO):
+    """Arquivo temporário (posicionado no início) com as linhas da vista no ``formato`` pedido"""
+    escritor = _escritor(formato)
+    arquivo = tempfile.TemporaryFile()
+    try:
+        _escrever(vista, escritor, arquivo, com_conclusao, tamanho_lote)
+    except BaseException:
+        arquivo.close()
+        raise
+    arquivo.seek(0)
+    return arquivo
+
+
+def formato_do_caminho(caminho):
+    """Formato de exportação pela extensão de ``caminho`` (None se não for uma das conhecidas)"""
+    extensao = os.path.splitext(caminho)[1].lstrip('.').lower()
+    return next((formato for formato, (_, ext, _) in FORMATOS.items() if ext == extensao), None)
+
+
+def exportar_arquivo(vista, formato, caminho, com_conclusao=False, tamanho_lote=TAMANHO_LOTE_EXPORTACAO):
+    """Grava as linhas da vista direto em ``caminho`` (apagado se a escrita falhar)"""
+    escritor = _escritor(formato)
+    try:
+        with open(caminho, 'wb') as arquivo:
+            _escrever(vista, escritor, arquivo, com_conclusao, tamanho_lote)
+    except BaseException:
+        if os.path.exists(caminho):
+            os.remove(caminho)
+        raise
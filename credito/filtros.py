@@ -0,0 +1,167 @@
+"""Índice de filtros construído uma vez por base de dados.
+
+Guarda, para cada valor de ``Tipo``, ``Opiniao_Agregada`` e ``Faixa_Rating``,
+uma máscara booleana das linhas (bitmap), e um índice das posições ordenadas
+por ``Data`` consultado por busca binária. Os filtros da sidebar viram um
+array de posições de linha, sem copiar o DataFrame.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_INDEXADAS = ['Tipo', 'Opiniao_Agregada', 'Faixa_Rating']
+
+_UM_DIA = np.timedelta64(1, 'D')
+
+
+class IndiceFiltros:
+    """Bitmaps por valor e índice de datas de um DataFrame tratado"""
+
+    def __init__(self, df, colunas=COLUNAS_INDEXADAS):
+        self.n_linhas = len(df)
+        self.bitmaps = {}
+        self.valores = {}
+        for coluna in colunas:
+            if coluna not in df.columns:
+                continue
+            codigos, unicos = pd.factorize(df[coluna], use_na_sentinel=True)
+            self.valores[coluna] = list(unicos)
+            self.bitmaps[coluna] = {
+                valor: codigos == i for i, valor in enumerate(unicos)
+            }
+
+        # Posições ordenadas por data (NaT fica fora do índice)
+        if 'Data' in df.columns:
+            datas = df['Data'].to_numpy(dtype='datetime64[ns]')
+        else:
+            datas = np.full(self.n_linhas, np.datetime64('NaT'), dtype='datetime64[ns]')
+        validas = np.flatnonzero(~np.isnat(datas))
+        ordem = np.argsort(datas[validas], kind='stable')
+        self.posicoes_por_data = validas[ordem]
+        self.datas_ordenadas = datas[self.posicoes_por_data]
+
+        # Hash de cada linha indexada, para atualizações incrementais
+        self.hashes = df['Hash_Linha'].to_numpy() if 'Hash_Linha' in df.columns else None
+
+    def atualizado(self, df, limite=0.5):
+        """Índice para uma nova versão de ``df``, reaproveitando este.
+
+        Compara o hash de cada posição (ver ``credito.incremental``): só as
+        posições com hash diferente e as linhas acrescentadas no fim são
+        reindexadas, então linhas deslocadas por uma inserção no meio contam
+        como alteradas. Se a base encolheu ou mais de ``limite`` das linhas
+        mudou, reconstrói do zero.
+        """
+        if self.hashes is None or 'Hash_Linha' not in df.columns or len(df) < self.n_linhas:
+            return IndiceFiltros(df, list(self.bitmaps))
+        hashes = df['Hash_Linha'].to_numpy()
+        alteradas = np.flatnonzero(hashes[:self.n_linhas] != self.hashes)
+        tocadas = np.concatenate([alteradas, np.arange(self.n_linhas, len(df))])
+        if len(tocadas) == 0:
+            return self
+        if len(tocadas) > limite * len(df):
+            return IndiceFiltros(df, list(self.bitmaps))
+
+        novo = copy.copy(self)
+        novo.n_linhas = len(df)
+        novo.hashes = hashes
+        acrescimo = len(df) - self.n_linhas
+
+        novo.bitmaps, novo.valores = {}, {}
+        for coluna, bitmaps in self.bitmaps.items():
+            bitmaps = {
+                valor: np.concatenate([bitmap, np.zeros(acrescimo, dtype=bool)])
+                for valor, bitmap in bitmaps.items()
+            }
+            for bitmap in bitmaps.values():
+                bitmap[alteradas] = False
+            valores = list(self.valores[coluna])
+            novos_valores = df[coluna].iloc[tocadas]
+            for valor in pd.unique(novos_valores.dropna()):
+                if valor not in bitmaps:
+                    bitmaps[valor] = np.zeros(novo.n_linhas, dtype=bool)
+                    valores.append(valor)
+                bitmaps[valor][tocadas[(novos_valores == valor).to_numpy(dtype=bool)]] = True
+            novo.bitmaps[coluna] = bitmaps
+            novo.valores[coluna] = [valor for valor in valores if bitmaps[valor].any()]
+
+        # Índice de datas: retira as posições alteradas e insere as tocadas em ordem
+        manter = ~np.isin(self.posicoes_por_data, alteradas)
+        posicoes, datas = self.posicoes_por_data[manter], self.datas_ordenadas[manter]
+        datas_tocadas = df['Data'].iloc[tocadas].to_numpy(dtype='datetime64[ns]')
+        validas = ~np.isnat(datas_tocadas)
+        ordem = np.argsort(datas_tocadas[validas], kind='stable')
+        pos_ins, datas_ins = tocadas[validas][ordem], datas_tocadas[validas][ordem]
+        onde = np.searchsorted(datas, datas_ins, side='right')
+        novo.posicoes_por_data = np.insert(posicoes, onde, pos_ins)
+        novo.datas_ordenadas = np.insert(datas, onde, datas_ins)
+        return novo
+
+    @property
+    def tem_datas(self):
+        return len(self.datas_ordenadas) > 0
+
+    def intervalo_datas(self):
+        """Menor e maior data (datetime64) ou None se não houver datas"""
+        if not self.tem_datas:
+            return None
+        return self.datas_ordenadas[0], self.datas_ordenadas[-1]
+
+    def mascara_valor(self, coluna, valor):
+        """Bitmap das linhas em que ``coluna == valor``"""
+        bitmap = self.bitmaps[coluna].get(valor)
+        if bitmap is None:
+            return np.zeros(self.n_linhas, dtype=bool)
+        return bitmap
+
+    def mascara_periodo(self, inicio, fim):
+        """Bitmap das linhas com data entre ``inicio`` e ``fim`` (dias inclusivos)"""
+        inicio = np.datetime64(inicio, 'D')
+        fim = np.datetime64(fim, 'D') + _UM_DIA
+        esq = np.searchsorted(self.datas_ordenadas, inicio, side='left')
+        dir_ = np.searchsorted(self.datas_ordenadas, fim, side='left')
+        mascara = np.zeros(self.n_linhas, dtype=bool)
+        mascara[self.posicoes_por_data[esq:dir_]] = True
+        return mascara
+
+    def contar_periodo(self, inicio, fim):
+        """Número de linhas com data em [inicio, fim) (datetime64[D])"""
+        return int(
+            np.searchsorted(self.datas_ordenadas, fim, side='left')
+            - np.searchsorted(self.datas_ordenadas, inicio, side='left')
+        )
+
+    def periodo_em_meses_inteiros(self, inicio, fim):
+        """Indica se o período não corta nenhum mês com dados.
+
+        Vale quando não há linhas no mês de ``inicio`` antes dele, nem no mês
+        de ``fim`` depois dele; nesse caso o filtro equivale a filtrar meses
+        inteiros (ex.: no cubo mensal).
+        """
+        inicio = np.datetime64(inicio, 'D')
+        fim = np.datetime64(fim, 'D') + _UM_DIA
+        inicio_mes = inicio.astype('datetime64[M]').astype('datetime64[D]')
+        fim_mes = (fim - _UM_DIA).astype('datetime64[M]') + 1
+        return (
+            self.contar_periodo(inicio_mes, inicio) == 0
+            and self.contar_periodo(fim, fim_mes.astype('datetime64[D]')) == 0
+        )
+
+    def mascara(self, selecoes=None, periodo=None):
+        """Combina os filtros num bitmap.
+
+        ``selecoes`` mapeia coluna -> valor; valores None são ignorados.
+        ``periodo`` é uma tupla (inicio, fim) de datas ou None.
+        """
+        mascara = np.ones(self.n_linhas, dtype=bool)
+        for coluna, valor in (selecoes or {}).items():
+            if valor is not None:
+                mascara &= self.mascara_valor(coluna, valor)
+        if periodo is not None:
+            mascara &= self.mascara_periodo(*periodo)
+        return mascara
+
+    def filtrar(self, selecoes=None, periodo=None):
+        """Posições (em ordem crescente) das linhas que passam nos filtros"""
+        return np.flatnonzero(self.mascara(selecoes, periodo))
@@ -0,0 +1,74 @@
+"""Atualização incremental da base tratada a partir da planilha.
+
+A planilha compilada só costuma ganhar linhas novas (com ``ID`` novo). Em vez
+de tratar tudo de novo, só as linhas novas ou editadas (hash diferente) passam
+pelas derivações e são mescladas à base anterior. A base mesclada fica na
+ordem da planilha, igual ao tratamento completo.
+
+A planilha ainda é lida inteira (``pd.read_excel``); o que se economiza são
+as derivações. Quando a planilha só ganha linhas no fim ou tem linhas
+editadas, as posições antigas não mudam e índices e agregados são
+atualizados só nas posições alteradas. Uma linha inserida ou removida no
+meio desloca as seguintes, que passam a contar como alteradas.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from credito.tratamento import (
+    COLUNAS_DERIVADAS, derivar_campos, hash_linhas, normalizar_colunas, tipar_categoricas, tratar_dados
+)
+
+Alteracoes = namedtuple('Alteracoes', ['novas', 'editadas', 'removidas', 'completa'])
+
+
+def _pode_mesclar(anterior, bruto):
+    """A mescla por ID exige IDs únicos e as mesmas colunas de origem"""
+    if anterior is None or 'ID' not in bruto.columns or 'ID' not in anterior.columns:
+        return False
+    if 'Hash_Linha' not in anterior.columns:
+        return False
+    origem_anterior = {c for c in anterior.columns if c not in COLUNAS_DERIVADAS}
+    if origem_anterior != set(bruto.columns):
+        return False
+    return bruto['ID'].notna().all() and bruto['ID'].is_unique and anterior['ID'].is_unique
+
+
+def mesclar_incremental(anterior, df):
+    """Atualiza ``anterior`` (base já tratada) com a planilha crua ``df``.
+
+    Retorna a nova base tratada e um ``Alteracoes`` com as contagens. Se a
+    mescla não for possível (sem coluna ID, IDs repetidos, colunas
+    diferentes), trata a planilha inteira e marca ``completa=True``.
+    """
+    bruto = normalizar_colunas(df)
+    if not _pode_mesclar(anterior, bruto):
+        tratado = tratar_dados(df)
+        return tratado, Alteracoes(len(tratado), 0, 0, True)
+
+    hashes = hash_linhas(bruto)
+    ids_anteriores = pd.Index(anterior['ID'])
+    pos_anterior = ids_anteriores.get_indexer(bruto['ID'])
+    existe = pos_anterior >= 0
+
+    editada = np.zeros(len(bruto), dtype=bool)
+    editada[existe] = anterior['Hash_Linha'].to_numpy()[pos_anterior[existe]] != hashes[existe]
+    nova = ~existe
+    removida = ~ids_anteriores.isin(bruto['ID'])
+
+    alteracoes = Alteracoes(int(nova.sum()), int(editada.sum()), int(removida.sum()), False)
+    if not (alteracoes.novas or alteracoes.editadas or alteracoes.removidas):
+        return anterior, alteracoes
+
+    # Derivações só para as linhas novas ou editadas
+    tocadas = nova | editada
+    derivadas = derivar_campos(bruto[tocadas])
+    derivadas['Hash_Linha'] = hashes[tocadas]
+
+    # Ordem da planilha: linhas intactas vêm da base anterior, as tocadas das derivações
+    posicoes = pos_anterior.copy()
+    posicoes[tocadas] = len(anterior) + np.arange(len(derivadas))
+    mesclado = pd.concat([anterior, derivadas[anterior.columns]], ignore_index=True)
+    mesclado = mesclado.iloc[posicoes].reset_index(drop=True)
+    return tipar_categoricas(mesclado), alteracoes
@@ -0,0 +1,93 @@
+"""Carga de várias planilhas compiladas (ex.: uma por ano e mesa) em paralelo.
+
+Cada arquivo é lido e tratado num processo separado; as partes são
+concatenadas numa única base com as colunas ``Origem_Arquivo`` e
+``Origem_Aba`` indicando de onde veio cada linha. O pandas só é importado
+na leitura: listar e assinar as planilhas não o carrega.
+"""
+import glob
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def listar_planilhas(origem):
+    """Planilhas .xlsx de uma pasta ou de um padrão glob, em ordem alfabética.
+
+    Arquivos temporários do Excel (``~$...``) são ignorados.
+    """
+    if os.path.isdir(origem):
+        padrao = os.path.join(origem, '*.xlsx')
+    else:
+        padrao = origem
+    return sorted(
+        caminho for caminho in glob.glob(padrao)
+        if os.path.isfile(caminho) and not os.path.basename(caminho).startswith('~$')
+    )
+
+
+def assinaturas_planilhas(arquivos):
+    """(caminho, tamanho, mtime) de cada planilha, para chavear caches"""
+    assinaturas = []
+    for arquivo in arquivos:
+        st_arquivo = os.stat(arquivo)
+        assinaturas.append((arquivo, st_arquivo.st_size, st_arquivo.st_mtime_ns))
+    return tuple(assinaturas)
+
+
+def ler_planilha(arquivo, abas=None):
+    """Lê e trata as abas pedidas de um arquivo (executado nos processos filhos).
+
+    Abas ausentes no arquivo são ignoradas; retorna None se nenhuma existir.
+    """
+    import pandas as pd
+
+    from credito.tratamento import ABA_RELATORIOS, tratar_dados
+
+    abas = abas or [ABA_RELATORIOS]
+    with pd.ExcelFile(arquivo) as xls:
+        partes = []
+        for aba in abas:
+            if aba not in xls.sheet_names:
+                continue
+            df = tratar_dados(xls.parse(aba))
+            df['Origem_Arquivo'] = os.path.basename(arquivo)
+            df['Origem_Aba'] = aba
+            partes.append(df)
+    if not partes:
+        return None
+    return pd.concat(partes, ignore_index=True)
+
+
+def carregar_planilhas(arquivos, abas=None, max_processos=None):
+    """Lê e trata várias planilhas em paralelo e concatena o resultado.
+
+    ``arquivos`` é uma lista de caminhos ou uma pasta/padrão glob (ver
+    ``listar_planilhas``). Usa um pool de processos (``spawn``, seguro dentro
+    do servidor do Streamlit, que tem várias threads) com até um processo por
+    núcleo; com um único arquivo, lê no próprio processo.
+    """
+    import pandas as pd
+
+    from credito.tratamento import ABA_RELATORIOS, tipar_categoricas
+
+    if isinstance(arquivos, (str, os.PathLike)):
+        arquivos = listar_planilhas(os.fspath(arquivos))
+    if not arquivos:
+        raise FileNotFoundError("Nenhuma planilha encontrada")
+
+    n_processos = min(len(arquivos), max_processos or os.cpu_count() or 1)
+    if n_processos <= 1:
+        partes = [ler_planilha(arquivo, abas) for arquivo in arquivos]
+    else:
+        contexto = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=n_processos, mp_context=contexto) as pool:
+            partes = list(pool.map(ler_planilha, arquivos, [abas] * len(arquivos)))
+
+    partes = [parte for parte in partes if parte is not None]
+    if not partes:
+        raise ValueError(f"Nenhuma das abas {abas or [ABA_RELATORIOS]} foi encontrada nas planilhas")
+    df = pd.concat(partes, ignore_index=True)
+    df['Origem_Arquivo'] = df['Origem_Arquivo'].astype('category')
+    df['Origem_Aba'] = df['Origem_Aba'].astype('category')
+    return tipar_categoricas(df)
@@ -0,0 +1,103 @@
+"""Medição opcional de tempo e memória por etapa de uma execução do painel.
+
+Cada etapa medida vira um registro (tempo de parede, memória alocada e pico
+de memória durante a etapa, pelo ``tracemalloc``), guardado para o painel de
+depuração e acrescentado como uma linha JSON ao arquivo de log, para
+comparar execuções entre versões publicadas.
+
+O ``tracemalloc`` só fica ligado enquanto alguma etapa está sendo medida:
+as etapas em andamento (de todas as sessões) são contadas sob um lock, a
+primeira liga o rastreamento e a última o desliga. Desativada a medição,
+o processo volta a alocar sem o custo do rastreamento.
+
+As medidas de memória são do processo inteiro, não da sessão: o
+``tracemalloc`` conta as alocações de todas as threads. Quando outras
+etapas correm ao mesmo tempo (``etapas_simultaneas`` > 0, contando a
+etapa que contém a medida, se houver), o pico não é
+zerado no início da etapa e os números incluem o que as outras alocaram;
+leia-os como limite superior.
+"""
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+_lock_log = threading.Lock()
+
+# Etapas medidas em andamento no processo; o tracemalloc fica ligado enquanto > 0
+_lock_rastreio = threading.Lock()
+_etapas_em_andamento = 0
+
+
+def _iniciar_rastreio():
+    """Registra uma etapa em andamento; devolve (memória rastreada no início, outras etapas em andamento)"""
+    global _etapas_em_andamento
+    with _lock_rastreio:
+        outras = _etapas_em_andamento
+        _etapas_em_andamento += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif outras == 0:
+            tracemalloc.reset_peak()
+        memoria, _ = tracemalloc.get_traced_memory()
+        return memoria, outras
+
+
+def _encerrar_rastreio():
+    """Fecha uma etapa; devolve (memória rastreada, pico, outras etapas em andamento) e desliga o rastreio na última"""
+    global _etapas_em_andamento
+    with _lock_rastreio:
+        memoria, pico = tracemalloc.get_traced_memory()
+        _etapas_em_andamento -= 1
+        outras = _etapas_em_andamento
+        if outras == 0:
+            tracemalloc.stop()
+        return memoria, pico, outras
+
+
+class Medidor:
+    """Mede etapas com ``with medidor.etapa('nome'):``; inativo, não custa nada"""
+
+    def __init__(self, ativo=False, arquivo_log=None, contexto=None):
+        self.ativo = ativo
+        self.arquivo_log = arquivo_log
+        self.contexto = dict(contexto or {})
+        self.etapas = []
+
+    @contextmanager
+    def etapa(self, nome):
+        if not self.ativo:
+            yield
+            return
+        memoria_antes, outras_inicio = _iniciar_rastreio()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            memoria_depois, pico, outras_fim = _encerrar_rastreio()
+            self.registrar({
+                'etapa': nome,
+                'segundos': round(segundos, 6),
+                'memoria_alocada': memoria_depois - memoria_antes,
+                'pico_memoria': max(0, pico - memoria_antes),
+                'etapas_simultaneas': max(outras_inicio, outras_fim),
+            })
+
+    def registrar(self, registro):
+        registro = {'momento': datetime.now().isoformat(timespec='milliseconds'), **self.contexto, **registro}
+        self.etapas.append(registro)
+        if self.arquivo_log:
+            gravar_jsonl(self.arquivo_log, registro)
+
+
+def gravar_jsonl(arquivo, registro):
+    """Acrescenta ``registro`` como uma linha JSON (falhas de escrita são ignoradas)"""
+    try:
+        linha = json.dumps(registro, ensure_ascii=False, default=str)
+        with _lock_log, open(arquivo, 'a', encoding='utf-8') as f:
+            f.write(linha + '\n')
+    except OSError:
+        pass
@@ -0,0 +1,74 @@
+"""Cálculo dos KPIs do dashboard numa única passada agrupada.
+
+Funciona com qualquer DataFrame tratado por ``carregar_dados`` (não depende
+do Streamlit) e aceita as posições de linha devolvidas por ``IndiceFiltros``.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class KPIs:
+    """Resultado agregado exibido nos cards de métricas"""
+    total: int
+    empresas: int
+    emissoes: int
+    negativos: int
+    com_rating: int
+    soma_rating: float
+
+    @property
+    def rating_medio(self):
+        return self.soma_rating / self.com_rating if self.com_rating else float('nan')
+
+    @property
+    def pct_negativos(self):
+        return self.negativos / self.total * 100 if self.total else 0.0
+
+
+def _codigos(serie):
+    """Códigos inteiros (-1 = vazio) e categorias de uma coluna"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), list(serie.cat.categories)
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    return codigos, list(unicos)
+
+
+def calcular_kpis(df, linhas=None):
+    """Calcula todos os KPIs agrupando por Tipo x Opinião numa só passada.
+
+    ``linhas`` são posições de linha (ex.: ``IndiceFiltros.filtrar``); se
+    None, usa a base inteira.
+    """
+    cod_tipo, tipos = _codigos(df['Tipo'])
+    cod_op, opinioes = _codigos(df['Opiniao_Agregada'])
+    rating = df['Rating'].to_numpy(dtype=float, na_value=np.nan)
+    if linhas is not None:
+        cod_tipo, cod_op, rating = cod_tipo[linhas], cod_op[linhas], rating[linhas]
+
+    # Grupo = (tipo, opinião), com uma posição extra para valores vazios
+    n_op = len(opinioes) + 1
+    n_grupos = (len(tipos) + 1) * n_op
+    grupo = (cod_tipo.astype(np.int64) + 1) * n_op + (cod_op + 1)
+    tem_rating = ~np.isnan(rating)
+
+    contagem = np.bincount(grupo, minlength=n_grupos).reshape(-1, n_op)
+    com_rating = np.bincount(grupo, weights=tem_rating, minlength=n_grupos)
+    soma_rating = np.bincount(grupo, weights=np.where(tem_rating, rating, 0.0), minlength=n_grupos)
+
+    def por_tipo(valor):
+        return int(contagem[tipos.index(valor) + 1].sum()) if valor in tipos else 0
+
+    def por_opiniao(valor):
+        return int(contagem[:, opinioes.index(valor) + 1].sum()) if valor in opinioes else 0
+
+    return KPIs(
+        total=int(contagem.sum()),
+        empresas=por_tipo('Empresa'),
+        emissoes=por_tipo('Emissão'),
+        negativos=por_opiniao('Negativo'),
+        com_rating=int(com_rating.sum()),
+        soma_rating=float(soma_rating.sum()),
+    )
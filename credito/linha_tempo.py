@@ -0,0 +1,149 @@
+"""Linha do tempo de rating por empresa, com consultas "na data" (as-of).
+
+As análises com empresa e data são ordenadas uma vez por (empresa, data).
+Cada linha guarda também qual é a análise com o rating vigente até ela (a
+última com nota da mesma empresa), de modo que a posição de todas as
+empresas numa data sai de uma única busca binária vetorizada, sem groupby:
+a chave de ordenação é ``codigo_empresa * span + dia``.
+
+A linha do tempo não guarda a base: só arrays compactos, na ordem
+(empresa, data), das colunas que as consultas devolvem (data, rating,
+escala e opinião agregada, estas duas como códigos de categoria). Assim,
+uma linha do tempo em cache não segura na memória a base de um upload já
+descartado. O backend SQLite responde às mesmas consultas direto no banco
+(``credito.banco.LinhaTempoSQLite``).
+"""
+import numpy as np
+import pandas as pd
+
+# Colunas de texto guardadas como códigos de categoria
+COLUNAS_CATEGORIAS = ['Rating_Escala', 'Opiniao_Agregada']
+
+
+def _dia(data):
+    return np.datetime64(pd.Timestamp(data), 'D').astype(np.int64)
+
+
+def ordenar_rebaixamentos(variacoes):
+    """Empresas de ``variacoes`` cujo rating caiu, maiores quedas primeiro"""
+    rebaixadas = variacoes[variacoes['Variacao'] < 0]
+    return rebaixadas.sort_values(['Variacao', 'Empresa'], kind='stable').reset_index(drop=True)
+
+
+class LinhaTempoEmpresas:
+    """Análises de ``df`` (ou só das posições ``linhas``) ordenadas por empresa e data"""
+
+    def __init__(self, df, linhas=None):
+        linhas = np.arange(len(df)) if linhas is None else np.asarray(linhas)
+        datas = df['Data'].to_numpy(dtype='datetime64[ns]')[linhas]
+        empresas = df['Empresa'].iloc[linhas]
+        validas = empresas.notna().to_numpy() & ~np.isnat(datas)
+        linhas, datas = linhas[validas], datas[validas]
+
+        codigos, unicas = pd.factorize(empresas[validas], sort=True)
+        self.empresas = np.asarray(unicas, dtype=object)
+        dias = datas.astype('datetime64[D]').astype(np.int64)
+        # lexsort é estável: no mesmo dia vale a ordem da planilha (a última linha vence)
+        ordem = np.lexsort((dias, codigos))
+        codigos, dias = codigos[ordem], dias[ordem]
+        linhas = linhas[ordem]
+        self.n_analises = len(linhas)
+
+        # Valores das consultas, na ordem (empresa, data)
+        self._datas = datas[ordem]
+        self._rating = df['Rating'].to_numpy(dtype=float, na_value=np.nan)[linhas]
+        self._categorias = {
+            coluna: pd.Categorical(df[coluna].take(linhas)) for coluna in COLUNAS_CATEGORIAS
+        }
+
+        # Chave única (empresa, dia); o dia relativo fica em [0, span - 2] e
+        # as consultas em [-1, span - 1], sem invadir a faixa da empresa vizinha
+        self._dia_minimo = int(dias.min()) if self.n_analises else 0
+        self._span = (int(dias.max()) - self._dia_minimo + 2) if self.n_analises else 2
+        self._chave = codigos.astype(np.int64) * self._span + (dias - self._dia_minimo)
+        self.inicios = np.searchsorted(codigos, np.arange(len(self.empresas)), side='left')
+        self._intervalo = (self._datas.min(), self._datas.max()) if self.n_analises else None
+
+        # Para cada linha, a posição (na ordem) da última análise com rating da
+        # mesma empresa até ela, ou -1
+        indices = np.where(~np.isnan(self._rating), np.arange(self.n_analises), -1)
+        ultimo_rating = np.maximum.accumulate(indices)
+        ultimo_rating[ultimo_rating < self.inicios[codigos]] = -1
+        self._ultimo_rating = ultimo_rating
+
+    @property
+    def nbytes(self):
+        """Bytes dos arrays guardados (sem a base de origem, que não é referenciada)"""
+        arrays = [self._datas, self._rating, self._chave, self.inicios, self._ultimo_rating]
+        categorias = sum(c.codes.nbytes + c.categories.memory_usage(deep=True) for c in self._categorias.values())
+        empresas = sum(len(e) for e in self.empresas) + self.empresas.nbytes
+        return int(sum(a.nbytes for a in arrays) + categorias + empresas)
+
+    def intervalo_datas(self):
+        """Menor e maior data (datetime64) ou None se não houver análises"""
+        return self._intervalo
+
+    def _indices_na_data(self, data):
+        """Índice (na ordem) da última análise de cada empresa até ``data``, inclusive (-1 se nenhuma)"""
+        dia = min(max(_dia(data) - self._dia_minimo, -1), self._span - 1)
+        consulta = np.arange(len(self.empresas), dtype=np.int64) * self._span + dia
+        indices = np.searchsorted(self._chave, consulta, side='right') - 1
+        return np.where(indices >= self.inicios, indices, -1)
+
+    def _ratings_na_data(self, data):
+        """(índices da análise com o rating vigente em ``data``, ratings) por empresa; -1/NaN sem rating"""
+        indices = self._indices_na_data(data)
+        indices_rating = np.where(indices >= 0, self._ultimo_rating[indices], -1)
+        ratings = np.where(indices_rating >= 0, self._rating[indices_rating], np.nan)
+        return indices_rating, ratings
+
+    def _coluna(self, coluna, indices):
+        """Valores de ``coluna`` nas análises ``indices`` (vazio onde o índice é -1)"""
+        tem = indices >= 0
+        posicoes = np.maximum(indices, 0)
+        if coluna == 'Data':
+            return pd.Series(np.where(tem, self._datas[posicoes], np.datetime64('NaT', 'ns')))
+        categorias = self._categorias[coluna]
+        codigos = np.where(tem, categorias.codes[posicoes], -1)
+        return pd.Series(pd.Categorical.from_codes(codigos, categorias.categories)).astype(object)
+
+    def na_data(self, data):
+        """Última análise de cada empresa até ``data``, com o rating vigente (ordem alfabética).
+
+        A opinião é a da análise mais recente; rating, escala e a data do
+        rating vêm da última análise que tinha nota.
+        """
+        indices = self._indices_na_data(data)
+        indices_rating, ratings = self._ratings_na_data(data)
+        tem = indices >= 0
+        indices, indices_rating = indices[tem], indices_rating[tem]
+        return pd.DataFrame({
+            'Empresa': self.empresas[tem],
+            'Data': self._coluna('Data', indices),
+            'Opiniao_Agregada': self._coluna('Opiniao_Agregada', indices),
+            'Rating': ratings[tem],
+            'Rating_Escala': self._coluna('Rating_Escala', indices_rating),
+            'Data_Rating': self._coluna('Data', indices_rating),
+        })
+
+    def variacoes(self, inicio, fim):
+        """Rating vigente de cada empresa em ``inicio`` e em ``fim`` e a variação (empresas com os dois)"""
+        indices_inicio, ratings_inicio = self._ratings_na_data(inicio)
+        indices_fim, ratings_fim = self._ratings_na_data(fim)
+        tem = ~np.isnan(ratings_inicio) & ~np.isnan(ratings_fim)
+        indices_inicio, indices_fim = indices_inicio[tem], indices_fim[tem]
+        return pd.DataFrame({
+            'Empresa': self.empresas[tem],
+            'Rating_Inicio': ratings_inicio[tem],
+            'Rating_Fim': ratings_fim[tem],
+            'Variacao': ratings_fim[tem] - ratings_inicio[tem],
+            'Escala_Inicio': self._coluna('Rating_Escala', indices_inicio),
+            'Escala_Fim': self._coluna('Rating_Escala', indices_fim),
+            'Data_Rating_Fim': self._coluna('Data', indices_fim),
+        })
+
+    def rebaixamentos(self, desde, ate=None):
+        """Empresas cujo rating vigente caiu entre ``desde`` e ``ate`` (padrão: a última data), maiores quedas primeiro"""
+        if ate is None:
+            ate = desde if self._intervalo is None else self._intervalo[1]
+        return ordenar_rebaixamentos(self.variacoes(desde, ate))
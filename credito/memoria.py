@@ -0,0 +1,59 @@
+"""Medição de memória: base compartilhada x o que cada sessão materializa.
+
+A base e os índices são carregados uma vez por processo e lidos por todas as
+sessões; cada sessão guarda só posições de linha e as fatias visíveis. O
+registro abaixo soma o que cada sessão declara ter materializado, para
+acompanhar o custo por sessão com várias pessoas usando o painel.
+"""
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def tamanho_objeto(obj):
+    """Bytes ocupados por DataFrames, Series, arrays e coleções deles (aproximado para o resto)"""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(tamanho_objeto(k) + tamanho_objeto(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(tamanho_objeto(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+def formatar_bytes(n_bytes):
+    """Tamanho legível ('820 KB', '12.3 MB')"""
+    if abs(n_bytes) < 1024 * 1024:
+        return f"{n_bytes / 1024:.0f} KB"
+    if abs(n_bytes) < 1024 ** 3:
+        return f"{n_bytes / 1024 ** 2:.1f} MB"
+    return f"{n_bytes / 1024 ** 3:.2f} GB"
+
+
+class RegistroSessoes:
+    """Memória declarada por sessão; sessões sem atualização dentro do TTL saem da conta"""
+
+    def __init__(self, ttl_segundos=30 * 60, relogio=time.monotonic):
+        self.ttl_segundos = ttl_segundos
+        self._relogio = relogio
+        self._sessoes = {}  # sessão -> (bytes, atualizado_em)
+        self._lock = threading.Lock()
+
+    def registrar(self, sessao, n_bytes):
+        with self._lock:
+            self._sessoes[sessao] = (int(n_bytes), self._relogio())
+
+    def resumo(self):
+        """(número de sessões ativas, bytes somados dessas sessões)"""
+        agora = self._relogio()
+        with self._lock:
+            for sessao in [s for s, (_, em) in self._sessoes.items() if agora - em > self.ttl_segundos]:
+                del self._sessoes[sessao]
+            return len(self._sessoes), sum(n for n, _ in self._sessoes.values())
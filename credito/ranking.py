@@ -0,0 +1,47 @@
+"""Preparação dos dados do gráfico "Rating por Empresa".
+
+Para bases grandes o gráfico mostra só os N maiores/menores ratings,
+opcionalmente agregando as análises de cada empresa.
+"""
+import numpy as np
+
+COLUNAS_RANKING = ['Empresa', 'Rating', 'Opiniao_Agregada', 'Tipo', 'Opiniao', 'Data']
+
+# Agregações por empresa disponíveis
+AGREGACOES_RANKING = {
+    None: 'Sem agregação',
+    'ultimo': 'Último rating',
+    'media': 'Rating médio',
+}
+
+
+def linhas_com_rating(df, linhas):
+    """Posições (dentre ``linhas``) que têm rating"""
+    linhas = np.asarray(linhas)
+    return linhas[df['Rating'].iloc[linhas].notna().to_numpy()]
+
+
+def agregar_por_empresa(dados, agregacao):
+    """Uma linha por empresa: a análise mais recente, com o rating médio se pedido.
+
+    A opinião, o tipo e a data exibidos são sempre os da última análise.
+    """
+    ultimas = dados.sort_values('Data', kind='stable', na_position='first')
+    agregado = ultimas.groupby('Empresa', sort=False, observed=True).tail(1).set_index('Empresa')
+    if agregacao == 'media':
+        agregado['Rating'] = dados.groupby('Empresa', sort=False, observed=True)['Rating'].mean()
+    return agregado.reset_index()[COLUNAS_RANKING]
+
+
+def preparar_ranking(df, linhas, n=None, maiores=True, agregacao=None):
+    """Dados do gráfico em ordem crescente de rating.
+
+    ``n`` limita às ``n`` maiores (``maiores=True``) ou menores notas;
+    ``agregacao`` é uma das chaves de ``AGREGACOES_RANKING``.
+    """
+    dados = df.iloc[linhas_com_rating(df, linhas)][COLUNAS_RANKING]
+    if agregacao is not None:
+        dados = agregar_por_empresa(dados, agregacao)
+    if n is not None and len(dados) > n:
+        dados = dados.nlargest(n, 'Rating', keep='first') if maiores else dados.nsmallest(n, 'Rating', keep='first')
+    return dados.sort_values('Rating', ascending=True, kind='stable')
@@ -0,0 +1,170 @@
+"""Cache colunar (Parquet) gravado ao lado da planilha compilada.
+
+O sidecar guarda o DataFrame já tratado por ``carregar_dados`` e é
+identificado pelo tamanho, mtime e hash do conteúdo da planilha de origem.
+Conferir se ele está em dia não importa o pandas.
+"""
+import hashlib
+import json
+import os
+
+# Incrementar sempre que o tratamento dos dados mudar, para invalidar sidecars antigos
+VERSAO_SIDECAR = 3
+
+_CHAVE_METADADOS = b'credito_fonte'
+
+
+def caminho_sidecar(arquivo):
+    """Caminho do sidecar Parquet correspondente à planilha"""
+    return os.fspath(arquivo) + '.parquet'
+
+
+def assinatura_arquivo(arquivo):
+    """Tamanho e mtime da planilha (usados para invalidar caches)"""
+    st_arquivo = os.stat(arquivo)
+    return st_arquivo.st_size, st_arquivo.st_mtime_ns
+
+
+def hash_arquivo(arquivo, bloco=1 << 20):
+    """SHA-256 do conteúdo da planilha"""
+    h = hashlib.sha256()
+    with open(arquivo, 'rb') as f:
+        for pedaco in iter(lambda: f.read(bloco), b''):
+            h.update(pedaco)
+    return h.hexdigest()
+
+
+def chave_origem(arquivo, sha256=None):
+    """Chave que identifica a versão da planilha gravada no sidecar"""
+    tamanho, mtime_ns = assinatura_arquivo(arquivo)
+    return {
+        'versao': VERSAO_SIDECAR,
+        'tamanho': tamanho,
+        'mtime_ns': mtime_ns,
+        'sha256': sha256 or hash_arquivo(arquivo),
+    }
+
+
+def _ler_chave_sidecar(caminho):
+    import pyarrow.parquet as pq
+
+    metadados = pq.read_schema(caminho).metadata or {}
+    if _CHAVE_METADADOS not in metadados:
+        return None
+    return json.loads(metadados[_CHAVE_METADADOS])
+
+
+def _regravar_chave(caminho, chave):
+    """Troca a chave gravada no sidecar (mesmos dados); falhas são ignoradas"""
+    import pyarrow.parquet as pq
+
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        tabela = pq.read_table(caminho)
+        metadados = dict(tabela.schema.metadata or {})
+        metadados[_CHAVE_METADADOS] = json.dumps(chave).encode()
+        pq.write_table(tabela.replace_schema_metadata(metadados), temporario)
+        os.replace(temporario, caminho)
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def conferir_sidecar(arquivo):
+    """(sidecar em dia?, SHA-256 da planilha se foi calculado, senão None).
+
+    Tamanho e mtime iguais bastam; se só o mtime mudou (ex.: checkout do
+    git), o hash do conteúdo decide. Quando o conteúdo é o mesmo, a chave do
+    sidecar é regravada com o novo mtime, para que as próximas conferências
+    não calculem o hash de novo. O hash devolvido pode ser passado a
+    ``chave_origem`` para não ler a planilha duas vezes.
+    """
+    caminho = caminho_sidecar(arquivo)
+    if not os.path.exists(caminho):
+        return False, None
+    try:
+        chave = _ler_chave_sidecar(caminho)
+    except Exception:
+        return False, None
+    if not chave or chave.get('versao') != VERSAO_SIDECAR:
+        return False, None
+
+    tamanho, mtime_ns = assinatura_arquivo(arquivo)
+    if chave.get('tamanho') != tamanho:
+        return False, None
+    if chave.get('mtime_ns') == mtime_ns:
+        return True, None
+    sha256 = hash_arquivo(arquivo)
+    if chave.get('sha256') != sha256:
+        return False, sha256
+    _regravar_chave(caminho, dict(chave, mtime_ns=mtime_ns))
+    return True, sha256
+
+
+def sidecar_fresco(arquivo):
+    """Indica se o sidecar existe e corresponde à versão atual da planilha (ver ``conferir_sidecar``)"""
+    return conferir_sidecar(arquivo)[0]
+
+
+def ler_sidecar(arquivo, fresco=None):
+    """Retorna o DataFrame do sidecar, ou None se ausente/desatualizado
+
+    ``fresco`` é o resultado de uma conferência já feita (``conferir_sidecar``).
+    """
+    if fresco is None:
+        fresco = sidecar_fresco(arquivo)
+    if not fresco:
+        return None
+    import pandas as pd
+
+    try:
+        return pd.read_parquet(caminho_sidecar(arquivo))
+    except Exception:
+        return None
+
+
+def ler_sidecar_anterior(arquivo):
+    """DataFrame do sidecar mesmo desatualizado (base para a carga incremental).
+
+    Só é descartado se tiver sido gravado por outra versão do tratamento.
+    """
+    caminho = caminho_sidecar(arquivo)
+    if not os.path.exists(caminho):
+        return None
+    import pandas as pd
+
+    try:
+        chave = _ler_chave_sidecar(caminho)
+        if not chave or chave.get('versao') != VERSAO_SIDECAR:
+            return None
+        return pd.read_parquet(caminho)
+    except Exception:
+        return None
+
+
+def gravar_sidecar(arquivo, df, chave=None):
+    """Grava o DataFrame tratado ao lado da planilha.
+
+    ``chave`` deve ser obtida com ``chave_origem`` antes da leitura da
+    planilha, para que uma alteração durante a leitura não fique marcada
+    como fresca. Falhas (pasta somente leitura, colunas com tipos mistos) são ignoradas:
+    o sidecar é só um atalho e a planilha continua sendo a fonte.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    caminho = caminho_sidecar(arquivo)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        chave = chave or chave_origem(arquivo)
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+        metadados = dict(tabela.schema.metadata or {})
+        metadados[_CHAVE_METADADOS] = json.dumps(chave).encode()
+        tabela = tabela.replace_schema_metadata(metadados)
+        pq.write_table(tabela, temporario)
+        os.replace(temporario, caminho)
+        return True
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        return False
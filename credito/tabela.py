@@ -0,0 +1,96 @@
+"""Paginação e ordenação da tabela "Detalhamento das Análises".
+
+A ordenação e o recorte da página são feitos sobre posições de linha; só as
+linhas da página visível são copiadas e formatadas. ``OrdensTabela`` guarda,
+por versão da base, a ordem de todas as linhas por coluna: trocar de página
+só filtra essa ordem pelas linhas do recorte, sem reordenar.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+# Coluna na base -> título exibido na tabela
+COLUNAS_TABELA = {
+    'Empresa': 'Empresa',
+    'Tipo': 'Tipo',
+    'Data': 'Data',
+    'Rating': 'Rating',
+    'Rating_Escala': 'Escala',
+    'Faixa_Rating': 'Faixa',
+    'Opiniao_Agregada': 'Opinião',
+    'Opiniao': 'Opinião Detalhada',
+}
+
+TAMANHOS_PAGINA = [25, 50, 100, 200]
+TAMANHO_PAGINA_PADRAO = 50
+
+
+def total_paginas(n_linhas, tamanho_pagina):
+    return max(1, math.ceil(n_linhas / tamanho_pagina))
+
+
+def ordenar_linhas(df, linhas, coluna=None, crescente=True):
+    """Reordena as posições ``linhas`` pelo valor de ``coluna`` (vazios no fim)"""
+    linhas = np.asarray(linhas)
+    if coluna is None or len(linhas) == 0:
+        return linhas
+    valores = df[coluna].iloc[linhas].reset_index(drop=True)
+    ordem = valores.sort_values(ascending=crescente, kind='stable', na_position='last').index
+    return linhas[ordem.to_numpy()]
+
+
+class OrdensTabela:
+    """Ordem estável de todas as linhas por (coluna, sentido), calculada no primeiro pedido de cada uma"""
+
+    def __init__(self):
+        self._ordens = {}
+
+    def ordem(self, df, coluna, crescente=True):
+        """Posições de todas as linhas de ``df`` ordenadas como em ``ordenar_linhas``"""
+        chave = (coluna, crescente)
+        if chave not in self._ordens:
+            self._ordens[chave] = ordenar_linhas(df, np.arange(len(df)), coluna, crescente)
+        return self._ordens[chave]
+
+    def ordenar(self, df, linhas, coluna=None, crescente=True):
+        """Mesmo resultado de ``ordenar_linhas`` para ``linhas`` em ordem crescente"""
+        linhas = np.asarray(linhas)
+        if coluna is None or len(linhas) == 0:
+            return linhas
+        ordem = self.ordem(df, coluna, crescente)
+        if len(linhas) == len(ordem):
+            return ordem
+        selecionadas = np.zeros(len(ordem), dtype=bool)
+        selecionadas[linhas] = True
+        return ordem[selecionadas[ordem]]
+
+
+def formatar_pagina(df_pagina):
+    """Formata só as linhas visíveis (data, rating inteiro e '-' nos vazios)"""
+    df_tabela = df_pagina[list(COLUNAS_TABELA)].copy()
+    df_tabela['Data'] = df_tabela['Data'].dt.strftime('%d/%m/%Y')
+    df_tabela['Rating'] = [int(x) if pd.notna(x) else '-' for x in df_tabela['Rating']]
+    df_tabela['Rating_Escala'] = df_tabela['Rating_Escala'].astype(object).fillna('-')
+    return df_tabela.rename(columns=COLUNAS_TABELA)
+
+
+def pagina_tabela(df, linhas, pagina=1, tamanho_pagina=TAMANHO_PAGINA_PADRAO,
+                  ordenar_por=None, crescente=True, ordens=None):
+    """DataFrame formatado da página pedida (``pagina`` começa em 1)
+
+    Com ``ordens`` (``OrdensTabela`` da mesma base), a ordenação reaproveita
+    a ordem pré-calculada da coluna.
+    """
+    if ordens is not None:
+        linhas = ordens.ordenar(df, linhas, ordenar_por, crescente)
+    else:
+        linhas = ordenar_linhas(df, linhas, ordenar_por, crescente)
+    pagina = min(max(1, pagina), total_paginas(len(linhas), tamanho_pagina))
+    inicio = (pagina - 1) * tamanho_pagina
+    return formatar_pagina(df.iloc[linhas[inicio:inicio + tamanho_pagina]])
+
+
+def html_tabela(df_tabela):
+    """HTML da página com a classe ``styled-table``"""
+    return df_tabela.to_html(classes='styled-table', index=False, na_rep='-', escape=False)
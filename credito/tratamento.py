@@ -0,0 +1,116 @@
+"""Normalização das colunas da planilha e criação dos campos derivados."""
+import numpy as np
+import pandas as pd
+
+ABA_RELATORIOS = 'Relatórios de Crédito'
+
+# Renomear colunas de forma flexível (mapeia nomes antigos para novos)
+COLUNAS_MAP = {
+    '##': 'ID',
+    'Nome da Empresa na Base': 'Empresa_Base',
+    'Relatórios Enviados': 'Relatorio',
+    'Empresa / Emissão': 'Tipo',
+    'Data de Envio': 'Data',
+    'Rating - X/100': 'Rating',
+    'Rating Escala': 'Rating_Escala',
+    'Opinião - Independente de pontuação de Rating': 'Opiniao',
+    'Conclusão': 'Conclusao'
+}
+
+FAIXAS_RATING = ['Alto (≥80)', 'Médio (65-79)', 'Baixo (<65)', 'Sem Rating']
+OPINIOES_AGREGADAS = ['Positivo', 'Neutro', 'Negativo', 'Atenção', 'Não Avaliado', 'Outros']
+
+# Colunas criadas pelo tratamento (as demais vêm da planilha)
+COLUNAS_DERIVADAS = ['Empresa', 'Faixa_Rating', 'Opiniao_Agregada', 'Mes_Ano', 'Resumo', 'Hash_Linha']
+
+
+def normalizar_colunas(df):
+    """Renomeia as colunas da planilha para os nomes usados no dashboard"""
+    return df.rename(columns=COLUNAS_MAP)
+
+
+def hash_linhas(df):
+    """Hash (uint64) do conteúdo de cada linha, para detectar linhas editadas"""
+    colunas = sorted((c for c in df.columns if c not in COLUNAS_DERIVADAS), key=str)
+    return pd.util.hash_pandas_object(df[colunas], index=False).to_numpy()
+
+
+def tipar_categoricas(df):
+    """Converte as colunas de baixa cardinalidade em categóricas.
+
+    Também serve para reunificar as categorias depois de concatenar partes
+    tratadas separadamente.
+    """
+    for coluna in ['Tipo', 'Rating_Escala']:
+        if coluna in df.columns:
+            df[coluna] = df[coluna].astype(object).astype('category')
+    df['Faixa_Rating'] = pd.Categorical(df['Faixa_Rating'].astype(object), categories=FAIXAS_RATING)
+    df['Opiniao_Agregada'] = pd.Categorical(df['Opiniao_Agregada'].astype(object), categories=OPINIOES_AGREGADAS)
+
+    # Mês/ano com categorias em ordem cronológica
+    mes_ano = df['Mes_Ano'].astype(object)
+    df['Mes_Ano'] = pd.Categorical(mes_ano, categories=sorted(mes_ano.dropna().unique()), ordered=True)
+    return df
+
+
+def derivar_campos(df):
+    """Cria Empresa, Faixa_Rating, Opiniao_Agregada, Mes_Ano e Resumo.
+
+    Espera as colunas já normalizadas; opera de forma vetorizada.
+    """
+    df = df.copy()
+
+    # Preencher nome da empresa quando vazio
+    if 'Relatorio' in df.columns and 'Empresa_Base' in df.columns:
+        df['Empresa'] = df['Relatorio'].fillna(df['Empresa_Base'])
+    elif 'Relatorio' in df.columns:
+        df['Empresa'] = df['Relatorio']
+    else:
+        df['Empresa'] = df.iloc[:, 1].fillna(df.iloc[:, 0])
+
+    # Converter a data uma única vez (datetime64)
+    df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
+    df['Rating'] = pd.to_numeric(df['Rating'], errors='coerce')
+
+    # Criar faixas de rating (intervalos fechados à esquerda: [65, 80) = Médio)
+    faixas = pd.cut(
+        df['Rating'],
+        bins=[-np.inf, 65, 80, np.inf],
+        labels=['Baixo (<65)', 'Médio (65-79)', 'Alto (≥80)'],
+        right=False
+    )
+    df['Faixa_Rating'] = faixas.astype(object).fillna('Sem Rating')
+
+    # Agregar opiniões em categorias principais (a primeira regra que casar vence)
+    op_lower = df['Opiniao'].astype('string').str.lower()
+    regras = [
+        ('Positivo', 'positivo'),
+        ('Negativo', 'negativo|default'),
+        ('Neutro', 'neutro'),
+        ('Atenção', 'atenção|requer'),
+    ]
+    opiniao = np.select(
+        [op_lower.str.contains(padrao, regex=True, na=False).to_numpy(dtype=bool) for _, padrao in regras],
+        [categoria for categoria, _ in regras],
+        default='Outros'
+    )
+    df['Opiniao_Agregada'] = np.where(op_lower.isna().to_numpy(), 'Não Avaliado', opiniao)
+
+    # Extrair mês/ano
+    df['Mes_Ano'] = df['Data'].dt.strftime('%Y-%m')
+
+    # Resumo da conclusão para tooltip
+    conclusao = df['Conclusao'].astype('string')
+    longa = conclusao.str.len().gt(300).fillna(False).astype(bool)
+    df['Resumo'] = conclusao.where(~longa, conclusao.str.slice(0, 300) + '...')
+
+    return tipar_categoricas(df)
+
+
+def tratar_dados(df):
+    """Normaliza colunas e cria os campos derivados"""
+    df = normalizar_colunas(df)
+    hashes = hash_linhas(df)
+    df = derivar_campos(df)
+    df['Hash_Linha'] = hashes
+    return df
@@ -0,0 +1,63 @@
+"""Recorte filtrado da base em memória (backend pandas, o padrão).
+
+``VistaPandas`` junta a base compartilhada e as posições de linha que passam
+nos filtros, e responde às consultas das seções do painel (KPIs, ranking,
+página da tabela, conclusões). ``credito.banco.VistaSQLite`` responde às
+mesmas consultas com SQL.
+"""
+from credito.conclusoes import linhas_com_conclusao
+from credito.cubo import agregar
+from credito.kpis import calcular_kpis
+from credito.ranking import linhas_com_rating, preparar_ranking
+from credito.tabela import TAMANHO_PAGINA_PADRAO, pagina_tabela
+
+
+class VistaPandas:
+    """Linhas ``linhas`` (posições) de um DataFrame tratado
+
+    ``ordens`` (``credito.tabela.OrdensTabela`` da base) é opcional e evita
+    reordenar o recorte a cada página da tabela.
+    """
+
+    def __init__(self, df, linhas, ordens=None):
+        self.df = df
+        self.linhas = linhas
+        self.ordens = ordens
+        self.n_linhas = len(linhas)
+        self._conclusoes = None
+
+    def kpis(self):
+        return calcular_kpis(self.df, self.linhas)
+
+    def celulas(self):
+        """Células do cubo mensal calculadas sobre o recorte"""
+        return agregar(self.df, self.linhas)
+
+    def n_com_rating(self):
+        return len(linhas_com_rating(self.df, self.linhas))
+
+    def ranking(self, n=None, maiores=True, agregacao=None):
+        return preparar_ranking(self.df, self.linhas, n=n, maiores=maiores, agregacao=agregacao)
+
+    def pagina_tabela(self, pagina=1, tamanho_pagina=TAMANHO_PAGINA_PADRAO, ordenar_por=None, crescente=True):
+        return pagina_tabela(self.df, self.linhas, pagina, tamanho_pagina, ordenar_por, crescente, self.ordens)
+
+    def lotes(self, colunas, tamanho_lote):
+        """Linhas do recorte (só ``colunas``), ``tamanho_lote`` por vez"""
+        posicoes_colunas = self.df.columns.get_indexer([c for c in colunas if c in self.df.columns])
+        for inicio in range(0, self.n_linhas, tamanho_lote):
+            yield self.df.iloc[self.linhas[inicio:inicio + tamanho_lote], posicoes_colunas]
+
+    def _linhas_conclusoes(self, texto):
+        # A contagem e a página usam o mesmo resultado: guarda o último
+        if self._conclusoes is None or self._conclusoes[0] != texto:
+            self._conclusoes = (texto, linhas_com_conclusao(self.df, self.linhas, texto))
+        return self._conclusoes[1]
+
+    def contar_conclusoes(self, texto):
+        return len(self._linhas_conclusoes(texto))
+
+    def pagina_conclusoes(self, texto, inicio, quantidade):
+        """(posições, linhas) da página de conclusões"""
+        posicoes = self._linhas_conclusoes(texto)[inicio:inicio + quantidade]
+        return posicoes, self.df.iloc[posicoes]
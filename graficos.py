@@ -0,0 +1,210 @@
+"""Figuras Plotly do Dashboard de Crédito, montadas a partir dos dados agregados.
+
+Não dependem do Streamlit: o ``app.py`` guarda as figuras prontas no cache
+de figuras e os benchmarks medem a montagem delas diretamente.
+"""
+import plotly.express as px
+import plotly.graph_objects as go
+
+from credito.cubo import contagem_por, evolucao_mensal, mix_opiniao_mensal
+
+# Cores do padrão AVIN
+CORES_OPINIAO = {
+    'Positivo': '#4A7C59',      # Verde escuro profissional
+    'Neutro': '#8B7355',        # Dourado AVIN
+    'Negativo': '#A85454',      # Vermelho sóbrio
+    'Atenção': '#C9A227',       # Amarelo mostarda
+    'Não Avaliado': '#9CA3AF',  # Cinza neutro
+    'Outros': '#6B7280'         # Cinza escuro
+}
+CORES_FAIXA = {
+    'Alto (≥80)': '#4A7C59',     # Verde escuro
+    'Médio (65-79)': '#8B7355',  # Dourado AVIN
+    'Baixo (<65)': '#A85454',    # Vermelho sóbrio
+    'Sem Rating': '#D1D5DB'      # Cinza claro
+}
+
+
+def figura_opiniao(celulas):
+    """Rosca da distribuição por opinião"""
+    opiniao_counts = contagem_por(celulas, 'Opiniao_Agregada').reset_index()
+    opiniao_counts.columns = ['Opinião', 'Quantidade']
+    
+    fig_opiniao = px.pie(
+        opiniao_counts,
+        values='Quantidade',
+        names='Opinião',
+        color='Opinião',
+        color_discrete_map=CORES_OPINIAO,
+        hole=0.5
+    )
+    fig_opiniao.update_traces(
+        textposition='outside', 
+        textinfo='percent+label',
+        textfont_size=11,
+        marker=dict(line=dict(color='#FFFFFF', width=2))
+    )
+    fig_opiniao.update_layout(
+        showlegend=False,
+        margin=dict(t=30, b=30, l=30, r=30),
+        height=350,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', color='#2D2D2D')
+    )
+    return fig_opiniao
+
+
+def figura_faixa(celulas):
+    """Barras da distribuição por faixa de rating"""
+    faixa_counts = contagem_por(celulas, 'Faixa_Rating').reset_index()
+    faixa_counts.columns = ['Faixa', 'Quantidade']
+    
+    # Calcular valor máximo do eixo Y (maior valor + 5)
+    max_valor = faixa_counts['Quantidade'].max()
+    eixo_y_max = max_valor + 5
+    
+    fig_faixa = px.bar(
+        faixa_counts,
+        x='Faixa',
+        y='Quantidade',
+        color='Faixa',
+        color_discrete_map=CORES_FAIXA,
+        text='Quantidade'
+    )
+    fig_faixa.update_traces(
+        textposition='outside',
+        textfont_size=12,
+        marker_line_color='#FFFFFF',
+        marker_line_width=1
+    )
+    fig_faixa.update_layout(
+        showlegend=False,
+        xaxis_title="",
+        yaxis_title="",
+        margin=dict(t=30, b=30, l=30, r=30),
+        height=350,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', color='#2D2D2D'),
+        xaxis=dict(showgrid=False, showline=True, linecolor='#E5E7EB'),
+        yaxis=dict(showgrid=True, gridcolor='#F3F4F6', showline=False, range=[0, eixo_y_max])
+    )
+    return fig_faixa
+
+
+def figuras_mensais(celulas):
+    """(volume e rating médio por mês, participação das opiniões por mês); None sem datas"""
+    mensal = evolucao_mensal(celulas)
+    if len(mensal) == 0:
+        return None
+    
+    fig_mensal = go.Figure()
+    fig_mensal.add_trace(go.Bar(
+        x=mensal['Mes_Ano'],
+        y=mensal['n'],
+        name='Análises',
+        marker_color='#D1D5DB'
+    ))
+    fig_mensal.add_trace(go.Scatter(
+        x=mensal['Mes_Ano'],
+        y=mensal['rating_medio'],
+        name='Rating médio',
+        mode='lines+markers',
+        line=dict(color='#8B7355', width=2),
+        yaxis='y2'
+    ))
+    fig_mensal.update_layout(
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=10)),
+        margin=dict(t=30, b=30, l=30, r=30),
+        height=350,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', color='#2D2D2D'),
+        xaxis=dict(type='category', showgrid=False, showline=True, linecolor='#E5E7EB'),
+        yaxis=dict(title='Análises', showgrid=True, gridcolor='#F3F4F6'),
+        yaxis2=dict(title='Rating médio', overlaying='y', side='right', range=[0, 100], showgrid=False)
+    )
+    
+    mix = mix_opiniao_mensal(celulas).reset_index().melt(
+        id_vars='Mes_Ano', var_name='Opinião', value_name='Percentual'
+    )
+    fig_mix = px.bar(
+        mix,
+        x='Mes_Ano',
+        y='Percentual',
+        color='Opinião',
+        color_discrete_map=CORES_OPINIAO
+    )
+    fig_mix.update_layout(
+        barmode='stack',
+        xaxis_title="",
+        yaxis_title="% das análises",
+        legend_title="",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=10)),
+        margin=dict(t=30, b=30, l=30, r=30),
+        height=350,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', color='#2D2D2D'),
+        xaxis=dict(type='category', showgrid=False, showline=True, linecolor='#E5E7EB'),
+        yaxis=dict(showgrid=True, gridcolor='#F3F4F6', range=[0, 100])
+    )
+    return fig_mensal, fig_mix
+
+
+def figura_empresas(df_com_rating, altura_grafico, limite_webgl):
+    """Rating por empresa: barras horizontais, ou pontos WebGL acima de ``limite_webgl``"""
+    if len(df_com_rating) > limite_webgl:
+        # Muitos pontos: trace WebGL em vez de uma barra SVG por linha
+        fig_scatter = px.scatter(
+            df_com_rating,
+            x='Rating',
+            y='Empresa',
+            color='Opiniao_Agregada',
+            color_discrete_map=CORES_OPINIAO,
+            hover_data=['Tipo', 'Opiniao', 'Data'],
+            render_mode='webgl'
+        )
+        fig_scatter.update_traces(marker_size=8)
+    else:
+        fig_scatter = px.bar(
+            df_com_rating,
+            x='Rating',
+            y='Empresa',
+            color='Opiniao_Agregada',
+            color_discrete_map=CORES_OPINIAO,
+            orientation='h',
+            hover_data=['Tipo', 'Opiniao', 'Data']
+        )
+        fig_scatter.update_traces(
+            marker_line_color='#FFFFFF',
+            marker_line_width=1
+        )
+    fig_scatter.update_layout(
+        yaxis_title="",
+        xaxis_title="Rating (0-100)",
+        legend_title="",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1,
+            font=dict(size=10)
+        ),
+        margin=dict(t=50, b=30, l=20, r=20),
+        height=altura_grafico,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', color='#2D2D2D'),
+        xaxis=dict(
+            showgrid=True, 
+            gridcolor='#F3F4F6', 
+            showline=True, 
+            linecolor='#E5E7EB',
+            range=[0, 100]
+        ),
+        yaxis=dict(showgrid=False, showline=False)
+    )
+    return fig_scatter
@@ -0,0 +1,48 @@
+"""Inicia o painel com os caches de dados preenchidos antes da primeira sessão.
+
+    python servidor.py [opções do streamlit run]
+
+Equivale a ``streamlit run app.py`` (as opções são repassadas), mas, no
+mesmo processo, uma thread lê a base da origem do painel (resolvida por
+``credito.carga.candidatas_origem``, como no ``app.py``) e
+monta o índice de filtros, o cubo mensal e a linha do tempo enquanto o
+servidor sobe: o primeiro visitante depois de um deploy não paga a carga.
+Uma sessão que chegue antes do fim espera pelo mesmo cálculo, sem repeti-lo
+(o ``st.cache_resource`` calcula cada chave uma única vez). As bibliotecas
+do painel (pandas, Plotly) também já ficam importadas.
+"""
+import os
+import sys
+import threading
+import time
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+
+def aquecer():
+    inicio = time.perf_counter()
+    try:
+        import caches
+        import graficos  # noqa: F401 (importa o Plotly antes da primeira sessão)
+
+        versao_dados = caches.aquecer()
+    except Exception as e:
+        print(f"Aquecimento falhou (a primeira sessão fará a carga): {e}", file=sys.stderr, flush=True)
+        return
+    if versao_dados is None:
+        print("Aquecimento: nenhuma planilha encontrada", file=sys.stderr, flush=True)
+    else:
+        print(f"Aquecimento: {versao_dados[0]} pronta em {time.perf_counter() - inicio:.1f}s",
+              file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    from streamlit.web import cli
+
+    threading.Thread(target=aquecer, name='aquecimento', daemon=True).start()
+    argv = sys.argv[1:] if argv is None else argv
+    cli.main(args=['run', APP, *argv], prog_name='streamlit')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+"""Fixtures compartilhadas pelos testes."""
+import pandas as pd
+import pytest
+
+from benchmarks.planilha_sintetica import COLUNAS_PLANILHA, gerar_linhas
+
+
+def _planilha(n_linhas, semente=0, primeiro_id=1):
+    """Planilha crua sintética, como lida pelo ``pd.read_excel``"""
+    df = pd.DataFrame(list(gerar_linhas(n_linhas, semente)), columns=COLUNAS_PLANILHA)
+    df['##'] += primeiro_id - 1
+    df['Data de Envio'] = pd.to_datetime(df['Data de Envio'])
+    df['Rating - X/100'] = df['Rating - X/100'].astype(float)
+    return df
+
+
+@pytest.fixture(scope='session')
+def planilha():
+    """Fábrica de planilhas cruas sintéticas: ``planilha(n_linhas, semente=0, primeiro_id=1)``"""
+    return _planilha
@@ -0,0 +1,95 @@
+"""Backend SQLite (``BancoSQLite``, ``VistaSQLite``) contra o backend pandas."""
+from dataclasses import replace
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from credito.banco import BancoSQLite
+from credito.busca import IndiceTexto
+from credito.cubo import contagem_por, evolucao_mensal
+from credito.filtros import IndiceFiltros
+from credito.tabela import OrdensTabela
+from credito.tratamento import tratar_dados
+from credito.vista import VistaPandas
+
+
+@pytest.fixture(scope='module')
+def bases(tmp_path_factory, planilha):
+    df = tratar_dados(planilha(400))
+    banco = BancoSQLite.abrir(str(tmp_path_factory.mktemp('banco') / 'teste.sqlite'), 'teste', lambda: df)
+    return df, banco, IndiceFiltros(df), IndiceTexto(df)
+
+
+def _filtros(indice):
+    inicio, fim = (pd.Timestamp(d).date() for d in indice.intervalo_datas())
+    periodo = (inicio + timedelta(days=500), fim - timedelta(days=400))
+    return [
+        ({}, None, ''),
+        ({'Tipo': 'Empresa'}, None, ''),
+        ({'Opiniao_Agregada': 'Negativo', 'Faixa_Rating': 'Baixo (<65)'}, None, ''),
+        ({'Tipo': 'Emissão'}, periodo, ''),
+        ({}, periodo, 'covenants'),
+        ({}, None, 'alavancagem confort'),
+    ]
+
+
+@pytest.fixture(params=range(6))
+def vistas(request, bases):
+    df, banco, indice, texto = bases
+    selecoes, periodo, busca = _filtros(indice)[request.param]
+    linhas = indice.filtrar(selecoes, periodo)
+    linhas_busca = texto.buscar(busca)
+    if linhas_busca is not None:
+        linhas = np.intersect1d(linhas, linhas_busca, assume_unique=True)
+    return VistaPandas(df, linhas, OrdensTabela()), banco.vista(selecoes, periodo, busca)
+
+
+def test_valores_e_intervalo(bases):
+    _, banco, indice, _ = bases
+    assert banco.valores == indice.valores
+    assert banco.intervalo_datas() == indice.intervalo_datas()
+
+
+def test_kpis(vistas):
+    pandas, sqlite = vistas
+    assert pandas.n_linhas == sqlite.n_linhas
+    assert pandas.n_com_rating() == sqlite.n_com_rating()
+    esperado, obtido = pandas.kpis(), sqlite.kpis()
+    assert replace(obtido, soma_rating=0) == replace(esperado, soma_rating=0)
+    assert obtido.soma_rating == pytest.approx(esperado.soma_rating)
+
+
+def test_celulas(vistas):
+    pandas, sqlite = vistas
+    for coluna in ['Tipo', 'Opiniao_Agregada', 'Faixa_Rating']:
+        pd.testing.assert_series_equal(contagem_por(pandas.celulas(), coluna), contagem_por(sqlite.celulas(), coluna))
+    pd.testing.assert_frame_equal(evolucao_mensal(pandas.celulas()), evolucao_mensal(sqlite.celulas()), check_dtype=False)
+
+
+@pytest.mark.parametrize('argumentos', [
+    {}, {'n': 10}, {'n': 10, 'maiores': False}, {'agregacao': 'ultimo'}, {'n': 5, 'agregacao': 'media'},
+])
+def test_ranking(vistas, argumentos):
+    pandas, sqlite = vistas
+    esperado = pandas.ranking(**argumentos).reset_index(drop=True)
+    obtido = sqlite.ranking(**argumentos).reset_index(drop=True)
+    pd.testing.assert_frame_equal(esperado.astype(str), obtido.astype(str))
+
+
+@pytest.mark.parametrize('ordenar_por', [None, 'Empresa', 'Data', 'Rating', 'Faixa_Rating'])
+@pytest.mark.parametrize('crescente', [True, False])
+def test_pagina_tabela(vistas, ordenar_por, crescente):
+    pandas, sqlite = vistas
+    for pagina in (1, 2):
+        esperado = pandas.pagina_tabela(pagina, 25, ordenar_por, crescente).reset_index(drop=True)
+        obtido = sqlite.pagina_tabela(pagina, 25, ordenar_por, crescente).reset_index(drop=True)
+        pd.testing.assert_frame_equal(esperado.astype(str), obtido.astype(str))
+
+
+def test_conclusoes(vistas):
+    pandas, sqlite = vistas
+    for texto in ['', 'ris', 'COVENANTS']:
+        assert pandas.contar_conclusoes(texto) == sqlite.contar_conclusoes(texto)
+        np.testing.assert_array_equal(pandas.pagina_conclusoes(texto, 5, 20)[0], sqlite.pagina_conclusoes(texto, 5, 20)[0])
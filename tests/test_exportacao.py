@@ -0,0 +1,67 @@
+"""Exportação do recorte filtrado: CSV no padrão do Excel em português e os mesmos dados nos dois backends."""
+import codecs
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from credito.banco import BancoSQLite
+from credito.exportacao import DECIMAL_CSV, SEPARADOR_CSV, colunas_exportacao, exportar, exportar_arquivo
+from credito.filtros import IndiceFiltros
+from credito.tratamento import tratar_dados
+from credito.vista import VistaPandas
+
+
+@pytest.fixture(scope='module')
+def vistas(planilha, tmp_path_factory):
+    df = tratar_dados(planilha(300))
+    banco = BancoSQLite.abrir(str(tmp_path_factory.mktemp('banco') / 'exportacao.sqlite'), 'teste', lambda: df)
+    selecoes = {'Tipo': 'Empresa'}
+    return VistaPandas(df, IndiceFiltros(df).filtrar(selecoes)), banco.vista(selecoes)
+
+
+def _ler_csv(arquivo):
+    conteudo = arquivo.read()
+    assert conteudo.startswith(codecs.BOM_UTF8)
+    return pd.read_csv(io.BytesIO(conteudo), sep=SEPARADOR_CSV, decimal=DECIMAL_CSV, encoding='utf-8-sig', dtype=str)
+
+
+def test_csv_com_virgula_decimal(vistas):
+    pandas, _ = vistas
+    with exportar(pandas, 'csv') as arquivo:
+        texto = arquivo.read().decode('utf-8-sig')
+    ratings = [linha.split(SEPARADOR_CSV)[list(colunas_exportacao()).index('Rating')] for linha in texto.splitlines()[1:]]
+    preenchidos = [r for r in ratings if r]
+    assert preenchidos and all(',' in r and '.' not in r for r in preenchidos)
+
+
+@pytest.mark.parametrize('com_conclusao', [False, True])
+def test_csv_igual_nos_dois_backends(vistas, com_conclusao):
+    pandas, sqlite = vistas
+    with exportar(pandas, 'csv', com_conclusao, tamanho_lote=70) as a, exportar(sqlite, 'csv', com_conclusao, tamanho_lote=70) as b:
+        esperado, obtido = _ler_csv(a), _ler_csv(b)
+    assert list(esperado.columns) == list(colunas_exportacao(com_conclusao).values())
+    assert len(esperado) == pandas.n_linhas
+    pd.testing.assert_frame_equal(esperado, obtido)
+
+
+@pytest.mark.parametrize('formato', ['parquet', 'xlsx'])
+def test_arquivo_com_as_linhas_da_vista(vistas, tmp_path, formato):
+    pandas, sqlite = vistas
+    tabelas = []
+    for vista in (pandas, sqlite):
+        caminho = tmp_path / f'{type(vista).__name__}.{formato}'
+        exportar_arquivo(vista, formato, str(caminho), tamanho_lote=70)
+        tabelas.append(pd.read_parquet(caminho) if formato == 'parquet' else pd.read_excel(caminho))
+    esperado, obtido = tabelas
+    assert len(esperado) == pandas.n_linhas
+    assert np.allclose(esperado['Rating'].fillna(-1), obtido['Rating'].fillna(-1))
+    pd.testing.assert_frame_equal(esperado, obtido)
+
+
+def test_recorte_vazio_tem_cabecalho(vistas):
+    pandas, _ = vistas
+    vazia = VistaPandas(pandas.df, np.array([], dtype=np.int64))
+    with exportar(vazia, 'csv') as arquivo:
+        assert list(_ler_csv(arquivo).columns) == list(colunas_exportacao().values())
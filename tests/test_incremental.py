@@ -0,0 +1,116 @@
+"""Atualização incremental (mescla, índice de filtros e cubo) contra a reconstrução completa."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from credito.cubo import CuboMensal
+from credito.filtros import IndiceFiltros
+from credito.incremental import mesclar_incremental
+from credito.tratamento import tratar_dados
+
+
+def editar(df, posicoes):
+    """Altera rating e opinião das linhas em ``posicoes``"""
+    df = df.copy()
+    rating = df.columns.get_loc('Rating - X/100')
+    opiniao = df.columns.get_loc('Opinião - Independente de pontuação de Rating')
+    df.iloc[posicoes, rating] = np.where(df.iloc[posicoes, rating].isna(), 55.0, 100 - df.iloc[posicoes, rating])
+    df.iloc[posicoes, opiniao] = 'Negativo'
+    return df
+
+
+def remover(df, posicoes):
+    return df.drop(df.index[posicoes]).reset_index(drop=True)
+
+
+def acrescentar(df, novas):
+    """Acrescenta ao fim as linhas de ``novas``, com IDs depois do último"""
+    novas = novas.assign(**{'##': novas['##'] + int(df['##'].max())})
+    return pd.concat([df, novas], ignore_index=True)
+
+
+def inserir(df, novas, posicao):
+    """Insere as linhas de ``novas`` antes de ``posicao``, com IDs depois do último"""
+    novas = novas.assign(**{'##': novas['##'] + int(df['##'].max())})
+    return pd.concat([df.iloc[:posicao], novas, df.iloc[posicao:]], ignore_index=True)
+
+
+# Cada alteração recebe a planilha e a fábrica de planilhas (para as linhas novas)
+ALTERACOES = {
+    'editadas': lambda df, planilha: editar(df, [3, 50, 51, 199]),
+    'removidas': lambda df, planilha: remover(df, [0, 7, 120]),
+    'acrescentadas': lambda df, planilha: acrescentar(df, planilha(25, semente=1)),
+    'editadas_e_acrescentadas': lambda df, planilha: acrescentar(editar(df, [10, 11, 150]), planilha(12, semente=1)),
+    'inseridas': lambda df, planilha: inserir(df, planilha(6, semente=1), 140),
+    'removidas_e_inseridas': lambda df, planilha: inserir(remover(df, [20, 21]), planilha(2, semente=1), 20),
+    'todas': lambda df, planilha: acrescentar(remover(editar(df, [2, 90]), [5, 60]), planilha(8, semente=1)),
+}
+
+
+@pytest.fixture(scope='module')
+def anterior(planilha):
+    bruto = planilha(300)
+    return bruto, tratar_dados(bruto)
+
+
+@pytest.fixture(params=list(ALTERACOES))
+def versoes(request, anterior, planilha):
+    bruto, tratado = anterior
+    novo_bruto = ALTERACOES[request.param](bruto, planilha)
+    mesclado, alteracoes = mesclar_incremental(tratado, novo_bruto)
+    return tratado, novo_bruto, mesclado, alteracoes
+
+
+def test_mescla_igual_ao_tratamento_completo(versoes):
+    _, novo_bruto, mesclado, alteracoes = versoes
+    assert not alteracoes.completa
+    pd.testing.assert_frame_equal(mesclado, tratar_dados(novo_bruto))
+
+
+def test_contagem_de_alteracoes(anterior, planilha):
+    bruto, tratado = anterior
+    _, alteracoes = mesclar_incremental(tratado, ALTERACOES['todas'](bruto, planilha))
+    assert (alteracoes.novas, alteracoes.editadas, alteracoes.removidas) == (8, 2, 2)
+    mesclado, alteracoes = mesclar_incremental(tratado, bruto)
+    assert mesclado is tratado and alteracoes == (0, 0, 0, False)
+
+
+def test_mescla_sem_id_trata_tudo(anterior):
+    bruto, tratado = anterior
+    sem_id = bruto.drop(columns='##')
+    mesclado, alteracoes = mesclar_incremental(tratado, sem_id)
+    assert alteracoes.completa
+    pd.testing.assert_frame_equal(mesclado, tratar_dados(sem_id))
+
+
+def test_indice_atualizado_igual_ao_reconstruido(versoes):
+    tratado, _, mesclado, _ = versoes
+    atualizado = IndiceFiltros(tratado).atualizado(mesclado, limite=1.0)
+    completo = IndiceFiltros(mesclado)
+
+    assert atualizado.n_linhas == completo.n_linhas
+    np.testing.assert_array_equal(atualizado.datas_ordenadas, completo.datas_ordenadas)
+    # No mesmo dia, a ordem das posições não importa para as consultas (viram máscara)
+    np.testing.assert_array_equal(
+        atualizado.posicoes_por_data[np.lexsort((atualizado.posicoes_por_data, atualizado.datas_ordenadas))],
+        completo.posicoes_por_data,
+    )
+    for coluna, valores in completo.valores.items():
+        assert set(atualizado.valores[coluna]) == set(valores)
+        for valor in valores:
+            np.testing.assert_array_equal(atualizado.mascara_valor(coluna, valor), completo.mascara_valor(coluna, valor))
+
+    inicio, fim = completo.intervalo_datas()
+    periodo = (inicio + np.timedelta64(400, 'D'), fim - np.timedelta64(300, 'D'))
+    for selecoes in [{}, {'Tipo': 'Empresa'}, {'Opiniao_Agregada': 'Negativo', 'Faixa_Rating': 'Baixo (<65)'}]:
+        np.testing.assert_array_equal(atualizado.filtrar(selecoes, periodo), completo.filtrar(selecoes, periodo))
+
+
+def test_cubo_atualizado_igual_ao_reconstruido(versoes):
+    tratado, _, mesclado, _ = versoes
+    atualizado = CuboMensal(tratado).atualizado(mesclado, limite=1.0)
+    completo = CuboMensal(mesclado)
+
+    pd.testing.assert_frame_equal(atualizado.celulas, completo.celulas)
+    todas = np.arange(len(mesclado))
+    pd.testing.assert_frame_equal(atualizado._linhas(todas), completo._linhas(todas))
@@ -0,0 +1,91 @@
+"""Linha do tempo de rating: consultas "na data" contra uma referência com groupby e contra o SQLite."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from credito.banco import BancoSQLite
+from credito.linha_tempo import LinhaTempoEmpresas
+from credito.tratamento import tratar_dados
+
+DATAS = ['2018-01-01', '2020-06-15', '2023-03-01', '2030-01-01']
+TIPOS = [None, 'Empresa', 'Emissão']
+
+
+@pytest.fixture(scope='module')
+def df(planilha):
+    bruto = planilha(400)
+    # Duas análises da mesma empresa no mesmo dia: vale a última linha da planilha
+    repetida = bruto.iloc[[10]].assign(**{'##': len(bruto) + 1, 'Rating - X/100': 21.0})
+    return tratar_dados(pd.concat([bruto, repetida], ignore_index=True))
+
+
+@pytest.fixture(scope='module')
+def banco(df, tmp_path_factory):
+    return BancoSQLite.abrir(str(tmp_path_factory.mktemp('banco') / 'linha_tempo.sqlite'), 'teste', lambda: df)
+
+
+def _linhas(df, tipo):
+    return None if tipo is None else np.flatnonzero((df['Tipo'] == tipo).to_numpy())
+
+
+def referencia(df, data, linhas=None):
+    """Última análise de cada empresa até ``data`` e a última com rating, por ordenação e groupby"""
+    d = df if linhas is None else df.iloc[linhas]
+    d = d.assign(pos=np.arange(len(d)), dia=d['Data'].dt.normalize())
+    d = d[d['Empresa'].notna() & d['Data'].notna() & (d['dia'] <= pd.Timestamp(data))]
+    d = d.sort_values(['Empresa', 'dia', 'pos'], kind='stable')
+    ultima = d.groupby('Empresa').tail(1).set_index('Empresa')
+    com_rating = d[d['Rating'].notna()].groupby('Empresa').tail(1).set_index('Empresa')
+    return pd.DataFrame({
+        'Empresa': ultima.index.astype(object),
+        'Data': ultima['Data'].to_numpy(),
+        'Opiniao_Agregada': ultima['Opiniao_Agregada'].astype(object).to_numpy(),
+        'Rating': com_rating['Rating'].reindex(ultima.index).to_numpy(),
+        'Rating_Escala': com_rating['Rating_Escala'].astype(object).reindex(ultima.index).to_numpy(),
+        'Data_Rating': com_rating['Data'].reindex(ultima.index).to_numpy(),
+    }).sort_values('Empresa').reset_index(drop=True)
+
+
+def _comparavel(tabela):
+    """Datas em ns e vazios como None (a base pandas e o banco podem usar unidades diferentes)"""
+    tabela = tabela.astype({c: 'datetime64[ns]' for c in tabela.columns if pd.api.types.is_datetime64_dtype(tabela[c])})
+    return tabela.astype(object).where(tabela.notna(), None)
+
+
+@pytest.mark.parametrize('tipo', TIPOS)
+@pytest.mark.parametrize('data', DATAS)
+def test_na_data_igual_a_referencia(df, tipo, data):
+    obtido = LinhaTempoEmpresas(df, _linhas(df, tipo)).na_data(data)
+    pd.testing.assert_frame_equal(_comparavel(obtido), _comparavel(referencia(df, data, _linhas(df, tipo))))
+
+
+@pytest.mark.parametrize('tipo', TIPOS)
+def test_rebaixamentos_igual_a_referencia(df, tipo):
+    linha_tempo = LinhaTempoEmpresas(df, _linhas(df, tipo))
+    inicio = referencia(df, '2023-01-01', _linhas(df, tipo)).set_index('Empresa')['Rating']
+    fim = referencia(df, '2030-01-01', _linhas(df, tipo)).set_index('Empresa')['Rating']
+    quedas = (fim - inicio).dropna()
+    quedas = quedas[quedas < 0]
+
+    rebaixamentos = linha_tempo.rebaixamentos('2023-01-01', '2030-01-01')
+    assert len(rebaixamentos) > 0
+    assert dict(zip(rebaixamentos['Empresa'], rebaixamentos['Variacao'])) == pytest.approx(quedas.to_dict())
+    assert rebaixamentos['Variacao'].is_monotonic_increasing
+
+
+@pytest.mark.parametrize('tipo', TIPOS)
+def test_sqlite_igual_ao_pandas(df, banco, tipo):
+    pandas, sqlite = LinhaTempoEmpresas(df, _linhas(df, tipo)), banco.linha_tempo(tipo)
+    assert pandas.intervalo_datas() == sqlite.intervalo_datas()
+    for data in DATAS:
+        pd.testing.assert_frame_equal(_comparavel(pandas.na_data(data)), _comparavel(sqlite.na_data(data)))
+    pd.testing.assert_frame_equal(
+        _comparavel(pandas.variacoes('2021-01-01', '2025-06-30')), _comparavel(sqlite.variacoes('2021-01-01', '2025-06-30'))
+    )
+    pd.testing.assert_frame_equal(_comparavel(pandas.rebaixamentos('2022-01-01')), _comparavel(sqlite.rebaixamentos('2022-01-01')))
+
+
+def test_linha_tempo_nao_guarda_a_base(df):
+    linha_tempo = LinhaTempoEmpresas(df)
+    assert not any(v is df for v in vars(linha_tempo).values())
+    assert linha_tempo.nbytes < df.memory_usage(deep=True).sum() / 4
@@ -0,0 +1,61 @@
+"""Conferência do sidecar Parquet quando só o mtime da planilha muda."""
+import hashlib
+import os
+
+import pandas as pd
+import pytest
+
+from credito import sidecar
+from credito.sidecar import chave_origem, conferir_sidecar, gravar_sidecar, ler_sidecar
+
+
+@pytest.fixture
+def planilha(tmp_path):
+    arquivo = tmp_path / 'base.xlsx'
+    arquivo.write_bytes(b'conteudo da planilha')
+    df = pd.DataFrame({'ID': [1, 2], 'Empresa': ['A', 'B']})
+    assert gravar_sidecar(arquivo, df, chave_origem(arquivo))
+    return arquivo, df
+
+
+@pytest.fixture
+def hashes(monkeypatch):
+    """Conta as chamadas de ``hash_arquivo``"""
+    chamadas = []
+    original = sidecar.hash_arquivo
+    monkeypatch.setattr(sidecar, 'hash_arquivo', lambda arquivo: chamadas.append(arquivo) or original(arquivo))
+    return chamadas
+
+
+def _tocar(arquivo):
+    mtime = os.stat(arquivo).st_mtime_ns + 5_000_000_000
+    os.utime(arquivo, ns=(mtime, mtime))
+
+
+def test_mesmo_mtime_nao_calcula_hash(planilha, hashes):
+    arquivo, df = planilha
+    assert conferir_sidecar(arquivo) == (True, None)
+    pd.testing.assert_frame_equal(ler_sidecar(arquivo), df)
+    assert hashes == []
+
+
+def test_mtime_novo_com_mesmo_conteudo_regrava_chave(planilha, hashes):
+    arquivo, df = planilha
+    _tocar(arquivo)
+    assert conferir_sidecar(arquivo) == (True, hashlib.sha256(b'conteudo da planilha').hexdigest())
+    assert len(hashes) == 1
+
+    # A chave regravada tem o mtime novo: a próxima conferência não calcula o hash
+    assert conferir_sidecar(arquivo) == (True, None)
+    assert len(hashes) == 1
+    pd.testing.assert_frame_equal(ler_sidecar(arquivo), df)
+
+
+def test_conteudo_novo_devolve_hash_para_a_chave(planilha, hashes):
+    arquivo, _ = planilha
+    arquivo.write_bytes(b'conteudo da planilhX')
+    _tocar(arquivo)
+    fresco, sha256 = conferir_sidecar(arquivo)
+    assert not fresco and ler_sidecar(arquivo, fresco) is None
+    assert chave_origem(arquivo, sha256=sha256)['sha256'] == sha256
+    assert len(hashes) == 1
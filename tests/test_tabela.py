@@ -0,0 +1,37 @@
+"""Ordens pré-calculadas da tabela (``OrdensTabela``) contra a ordenação do recorte."""
+import numpy as np
+import pytest
+
+from credito.filtros import IndiceFiltros
+from credito.tabela import COLUNAS_TABELA, OrdensTabela, ordenar_linhas
+from credito.tratamento import tratar_dados
+
+
+@pytest.fixture(scope='module')
+def base(planilha):
+    df = tratar_dados(planilha(300))
+    indice = IndiceFiltros(df)
+    recortes = [
+        np.arange(len(df)),
+        indice.filtrar({'Tipo': 'Empresa'}),
+        indice.filtrar({'Opiniao_Agregada': 'Negativo'}),
+        np.array([], dtype=np.int64),
+    ]
+    return df, recortes
+
+
+@pytest.mark.parametrize('coluna', [None, *COLUNAS_TABELA])
+@pytest.mark.parametrize('crescente', [True, False])
+def test_ordenar_igual_a_ordenar_linhas(base, coluna, crescente):
+    df, recortes = base
+    ordens = OrdensTabela()
+    for linhas in recortes:
+        np.testing.assert_array_equal(
+            ordens.ordenar(df, linhas, coluna, crescente), ordenar_linhas(df, linhas, coluna, crescente)
+        )
+
+
+def test_ordem_calculada_uma_vez(base):
+    df, _ = base
+    ordens = OrdensTabela()
+    assert ordens.ordem(df, 'Rating', False) is ordens.ordem(df, 'Rating', False)